@@ -39,7 +39,7 @@ output [WIDTH-1:0] grant;
 input [WIDTH-1:0] base;
 
 wire [2*WIDTH-1:0] double_req = {req,req};
-wire [2*WIDTH-1:0] double_grant = double_req & ~(double_req-base);
+wire [2*WIDTH-1:0] double_grant = double_req & ~(double_req-{{WIDTH{1'b0}},base});
 assign grant = double_grant[WIDTH-1:0] | double_grant[2*WIDTH-1:WIDTH];
 	
 endmodule
\ No newline at end of file
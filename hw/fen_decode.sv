@@ -10,9 +10,13 @@ module fen_decode(
   output reg [3:0]  o_pos_data = 0,
   output reg        o_pos_sop = 0,
   output reg        o_pos_eop = 0,
+  // marks a packet of performance counters on o_pos_data, see below
+  output reg        o_pos_perf = 0,
   output reg        o_wtp = 0,
-  output reg [3:0]  o_castle,
-  output reg [2:0]  o_ep,
+  // castling rights {K, Q, k, q} and ep file 0 for none, else 1-8, as
+  // taken by psudolegal_board
+  output reg [3:0]  o_castle = 0,
+  output reg [3:0]  o_ep = 0,
   output reg [15:0] o_hmcount,
   output reg [15:0] o_fmcount
   );
@@ -20,6 +24,23 @@ module fen_decode(
   // 1st timestep - state machine
   // delay data and valid signal
 
+  // A line starting "?" is a command rather than a FEN. The digit after it,
+  // "1" by default, is the command as psudolegal_board takes it: bit 0
+  // reads the performance counters and bit 1 clears them. A read sends the
+  // counters as a packet on o_pos_data with o_pos_perf high, low nibble of
+  // counter 0 first, 8 nibbles a counter. Either way the command is then
+  // passed on as a one beat packet, for a board behind us to do the same.
+  //   0 cycles
+  //   1 FENs decoded
+  //   2 bytes taken on in_data
+  //   3 idle cycles, with no FEN coming in or going out
+  //   4 output cycles, streaming the squares out after the FEN is in
+  localparam PERF_COUNTERS = 5;
+  localparam [5:0] PERF_BEATS = PERF_COUNTERS * 8;
+  reg [3:0] perf_cmd = 0;
+  reg [5:0] perf_beat = 0;
+  wire [PERF_COUNTERS*32-1:0] perf_snapshot;
+
   localparam [3:0]
       fem_idle       = 4'd0,
       fem_pieces     = 4'd1,
@@ -33,7 +54,9 @@ module fen_decode(
       fem_hmclock    = 4'd9,
       fem_hmclock_sp = 4'd10,
       fem_fmclock    = 4'd11,
-      fem_output     = 4'd12;
+      fem_output     = 4'd12,
+      fem_perf       = 4'd13,
+      fem_perf_output = 4'd14;
 
   wire tok_space = in_data == " ";
   reg [3:0] state = fem_idle;
@@ -49,11 +72,13 @@ module fen_decode(
 
     state <= state;
     if (in_valid & in_sop) begin
-      state <= fem_pieces;
+      state <= in_data == "?" ? fem_perf : fem_pieces;
     end else if (state == fem_output) begin
         if (o_pos_eop) state <= fem_idle;
+    end else if (state == fem_perf_output) begin
+        if (perf_beat > PERF_BEATS) state <= fem_idle;
     end else if (was_valid_eop) begin
-        state <= fem_output;
+        state <= state == fem_perf ? fem_perf_output : fem_output;
     end else if (in_valid) begin
         case (state)
           fem_idle: begin
@@ -178,6 +203,7 @@ module fen_decode(
   wire last_pubffer_cycle = (pbuffer_rdaddr + 1) == pbuffer_wraddr;
   wire last_skip_cycle = rd_bin_skip == rd_skip_count;
   always_ff @(posedge clk) begin
+      o_pos_perf <= 0;
       if (state == fem_output && !o_pos_eop) begin
         pbuffer_rdaddr <= pbuffer_rdaddr + (last_skip_cycle ? 1 : 0);
         rd_skip_count <= !last_skip_cycle ? rd_skip_count + 1 : 0;
@@ -185,6 +211,14 @@ module fen_decode(
         o_pos_data <= {rd_bin_wtp, rd_bin_piece};
         o_pos_sop <= pbuffer_rdaddr == 0 && (rd_skip_count == 0);
         o_pos_eop <= last_pubffer_cycle && last_skip_cycle;
+      end else if (state == fem_perf_output && perf_beat <= PERF_BEATS) begin
+        pbuffer_rdaddr <= 0;
+        rd_skip_count <= 0;
+        o_pos_valid <= 1;
+        o_pos_perf <= perf_beat != PERF_BEATS;
+        o_pos_data <= perf_beat == PERF_BEATS ? perf_cmd : perf_snapshot[{perf_beat, 2'b00} +: 4];
+        o_pos_sop <= perf_beat == 0 || perf_beat == PERF_BEATS;
+        o_pos_eop <= perf_beat >= PERF_BEATS - 1;
       end else begin
         pbuffer_rdaddr <= 0;
         o_pos_valid <= 0;
@@ -195,6 +229,45 @@ module fen_decode(
 
   end
 
+  // performance counters, snapshotted and cleared as a command's line ends
+  wire perf_take = was_valid_eop && state == fem_perf && !(in_valid & in_sop);
+  always_ff @(posedge clk) begin
+    if (in_valid & in_sop) begin
+      perf_cmd <= 4'h1;
+    end else if (in_valid && state == fem_perf) begin
+      perf_cmd <= in_data[3:0];
+    end
+    if (perf_take) begin
+      perf_beat <= perf_cmd[0] ? 6'd0 : PERF_BEATS;
+    end else if (state == fem_perf_output && perf_beat <= PERF_BEATS) begin
+      perf_beat <= perf_beat + 6'd1;
+    end
+  end
+
+  wire [PERF_COUNTERS-1:0] perf_inc = {
+    state == fem_output,
+    state == fem_idle && !in_valid,
+    in_valid,
+    state == fem_output && o_pos_eop,
+    1'b1};
+
+  genvar pc;
+  generate
+    for (pc=0; pc<PERF_COUNTERS; pc=pc+1)
+    begin: perf_counter
+      reg  [31:0] count = 0;
+      reg  [31:0] snapshot = 0;
+      wire [31:0] count_next = count + {31'd0, perf_inc[pc]};
+      always_ff @(posedge clk) begin
+        count <= (perf_take && perf_cmd[1]) ? 32'd0 : count_next;
+        if (perf_take && perf_cmd[0]) begin
+          snapshot <= count_next;
+        end
+      end
+      assign perf_snapshot[pc*32 +: 32] = snapshot;
+    end
+  endgenerate
+
   // handle white to play (wtp)
   always_ff @(posedge clk) begin
     if (state == fem_turn && state_valid) begin
@@ -207,23 +280,20 @@ module fen_decode(
     if (state == fem_pieces) begin
       o_castle[3:0] <= 4'b0;
     end else if (state == fem_castle && state_valid) begin
-      o_castle[0] <= o_castle[0] | state_data == "K";
-      o_castle[1] <= o_castle[1] | state_data == "Q";
-      o_castle[2] <= o_castle[2] | state_data == "k";
-      o_castle[3] <= o_castle[3] | state_data == "q";
+      o_castle[3] <= o_castle[3] | state_data == "K";
+      o_castle[2] <= o_castle[2] | state_data == "Q";
+      o_castle[1] <= o_castle[1] | state_data == "k";
+      o_castle[0] <= o_castle[0] | state_data == "q";
     end
   end
 
-  // handle ep
+  // handle ep, from the file letter only. "a" to "h" are 8'h61 to 8'h68 so
+  // their low nibble is already 1 + file. The rank digit and "-" are ignored
   always_ff @(posedge clk) begin
     if (state == fem_pieces) begin
-      o_ep[2:0] <= 3'b0;
-    end else if (state == fem_ep && state_valid) begin
-      if (state_data == "-") begin
-        o_ep[2:0] <= 3'b0;
-      end else begin
-        o_ep <= state_data[2:0];
-      end
+      o_ep <= 4'b0;
+    end else if (state == fem_ep && state_valid && state_data >= "a" && state_data <= "h") begin
+      o_ep <= state_data[3:0];
     end
   end
 
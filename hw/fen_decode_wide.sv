@@ -0,0 +1,167 @@
+module fen_decode_wide #(
+        parameter BYTES = 4
+  ) (
+  input logic clk,
+  // FEN text BYTES at a time, lowest lane first. Only lanes with in_keep
+  // set carry text, in order, so a word may be partly or wholly empty.
+  input logic [8*BYTES-1:0] in_data,
+  input logic [BYTES-1:0]   in_keep,
+  input logic in_valid,
+  input logic in_sop,
+  input logic in_eop,
+
+  // as for fen_decode
+  output reg        o_pos_valid = 0,
+  output reg [3:0]  o_pos_data = 0,
+  output reg        o_pos_sop = 0,
+  output reg        o_pos_eop = 0,
+  output reg        o_wtp = 0,
+  output reg [3:0]  o_castle = 0,
+  output reg [3:0]  o_ep = 0,
+  output reg [15:0] o_hmcount = 0,
+  output reg [15:0] o_fmcount = 0
+  );
+
+  // FEN fields, in the order they come, separated by single spaces
+  localparam [2:0]
+      field_pieces  = 3'd0,
+      field_turn    = 3'd1,
+      field_castle  = 3'd2,
+      field_ep      = 3'd3,
+      field_hmclock = 3'd4,
+      field_fmclock = 3'd5;
+
+  // Every lane is decoded at once. A lane's field is the field the word
+  // starts in plus the spaces in the lanes below it, and its pbuffer slot
+  // is the write address plus the pieces and skips below it. The counters
+  // take each digit in lane order, as ascii_int_to_bin does one per cycle.
+  reg [2:0] field = 0;
+  reg [6:0] pbuffer_wraddr = 0;
+
+  reg [6:0] pbuffer [64-1:0];
+  reg [BYTES-1:0] lane_wr;
+  reg [7*BYTES-1:0] lane_entry;
+  reg [7*BYTES-1:0] lane_addr;
+  reg [2:0]  next_field;
+  reg [6:0]  next_wraddr;
+  reg        next_wtp;
+  reg [3:0]  next_castle;
+  reg [3:0]  next_ep;
+  reg [15:0] next_hmcount;
+  reg [15:0] next_fmcount;
+
+  // board piece codes from a lower case piece letter
+  function automatic logic [2:0] piece_code(input logic [7:0] p);
+    case (p)
+      "k": piece_code = 3'h1;
+      "q": piece_code = 3'h2;
+      "r": piece_code = 3'h3;
+      "b": piece_code = 3'h4;
+      "n": piece_code = 3'h5;
+      "p": piece_code = 3'h6;
+      default: piece_code = 3'h0;
+    endcase
+  endfunction
+
+  reg [7:0] c;
+  reg [2:0] lane_field;
+  integer j;
+  always_comb begin
+    next_field = in_sop ? field_pieces : field;
+    next_wraddr = in_sop ? 7'd0 : pbuffer_wraddr;
+    next_wtp = o_wtp;
+    next_castle = in_sop ? 4'b0 : o_castle;
+    next_ep = in_sop ? 4'b0 : o_ep;
+    next_hmcount = in_sop ? 16'd0 : o_hmcount;
+    next_fmcount = in_sop ? 16'd0 : o_fmcount;
+    lane_wr = 0;
+    lane_entry = 0;
+    lane_addr = 0;
+    for (j = 0; j < BYTES; j = j + 1) begin
+      c = in_data[j*8 +: 8];
+      lane_field = next_field;
+      if (in_keep[j]) begin
+        if (c == " ") begin
+          next_field = next_field + 3'd1;
+        end else begin
+          case (lane_field)
+            field_pieces: begin
+              // {white, piece, repeat} as fen_decode's pbuffer, "/" left out
+              if (c >= "1" && c <= "8") begin
+                lane_wr[j] = 1;
+                lane_entry[j*7 +: 7] = {4'b0, c[2:0] - 3'd1};
+              end else if (c != "/") begin
+                lane_wr[j] = 1;
+                lane_entry[j*7 +: 7] = {c[5] == 1'b0, piece_code(c | 8'h20), 3'b0};
+              end
+              lane_addr[j*7 +: 7] = next_wraddr;
+              next_wraddr = next_wraddr + {6'b0, lane_wr[j]};
+            end
+            field_turn: next_wtp = c == "w";
+            field_castle: begin
+              next_castle = next_castle | {c == "K", c == "Q", c == "k", c == "q"};
+            end
+            field_ep: begin
+              if (c >= "a" && c <= "h") next_ep = c[3:0];
+            end
+            field_hmclock: next_hmcount = next_hmcount * 16'd10 + {12'b0, c[3:0]};
+            field_fmclock: next_fmcount = next_fmcount * 16'd10 + {12'b0, c[3:0]};
+            default: begin
+            end
+          endcase
+        end
+      end
+    end
+  end
+
+  reg draining = 0;
+  integer w;
+  always_ff @(posedge clk) begin
+    if (in_valid) begin
+      field <= next_field;
+      pbuffer_wraddr <= next_wraddr;
+      o_wtp <= next_wtp;
+      o_castle <= next_castle;
+      o_ep <= next_ep;
+      o_hmcount <= next_hmcount;
+      o_fmcount <= next_fmcount;
+      for (w = 0; w < BYTES; w = w + 1)
+        if (lane_wr[w]) pbuffer[lane_addr[w*7 +: 6]] <= lane_entry[w*7 +: 7];
+    end
+
+    if (in_valid && in_eop) begin
+      draining <= 1;
+    end else if (o_pos_eop) begin
+      draining <= 0;
+    end
+  end
+
+  // write output squares by draining from pbuffer[pbuffer_rdaddr], exactly
+  // as fen_decode does
+  reg  [6:0] pbuffer_rdaddr = 0;
+  wire [2:0] rd_bin_skip;
+  wire [2:0] rd_bin_piece;
+  wire       rd_bin_wtp;
+  reg [2:0]  rd_skip_count = 0;
+  assign {rd_bin_wtp, rd_bin_piece, rd_bin_skip} = pbuffer[pbuffer_rdaddr[5:0]];
+
+  wire last_pbuffer_cycle = (pbuffer_rdaddr + 1) == pbuffer_wraddr;
+  wire last_skip_cycle = rd_bin_skip == rd_skip_count;
+  always_ff @(posedge clk) begin
+      if (draining && !o_pos_eop) begin
+        pbuffer_rdaddr <= pbuffer_rdaddr + (last_skip_cycle ? 7'd1 : 7'd0);
+        rd_skip_count <= !last_skip_cycle ? rd_skip_count + 3'd1 : 3'd0;
+        o_pos_valid <= 1;
+        o_pos_data <= {rd_bin_wtp, rd_bin_piece};
+        o_pos_sop <= pbuffer_rdaddr == 0 && (rd_skip_count == 0);
+        o_pos_eop <= last_pbuffer_cycle && last_skip_cycle;
+      end else begin
+        pbuffer_rdaddr <= 0;
+        o_pos_valid <= 0;
+        o_pos_eop <= 0;
+        o_pos_sop <= 0;
+        rd_skip_count <= 0;
+      end
+  end
+
+endmodule
@@ -0,0 +1,95 @@
+module fen_movegen(
+  input logic clk,
+
+  // FEN text, a byte per cycle framed by in_sop/in_eop as for fen_decode.
+  // A new FEN may start once the previous one's o_uci_eop is out. A "?"
+  // line reads or clears the performance counters, see fen_decode.
+  input logic [7:0]  in_data,
+  input logic        in_valid,
+  input logic        in_sop,
+  input logic        in_eop,
+  // 0: pseudo-legal moves, 1: legal moves only
+  input logic        in_legal,
+
+  // moves as from psudolegal_board
+  output wire        o_uci_valid,
+  output wire [20:0] o_uci_data,
+  output wire        o_uci_sop,
+  output wire        o_uci_eop,
+  output wire        o_in_check
+  );
+
+  // fen_decode streams the squares out in the board's serial load order
+  // once the whole FEN is in, with the side to play, castling rights and ep
+  // file already settled, so the board takes them with the last square and
+  // is started by it.
+  wire        pos_valid;
+  wire [3:0]  pos_data;
+  wire        pos_sop;
+  wire        pos_eop;
+  wire        pos_perf;
+  wire        wtp;
+  wire [3:0]  castle;
+  wire [3:0]  ep;
+
+  fen_decode fen_decode (
+    .clk(clk),
+    .in_data(in_data),
+    .in_valid(in_valid),
+    .in_sop(in_sop),
+    .in_eop(in_eop),
+    .o_pos_valid(pos_valid),
+    .o_pos_data(pos_data),
+    .o_pos_sop(pos_sop),
+    .o_pos_eop(pos_eop),
+    .o_pos_perf(pos_perf),
+    .o_wtp(wtp),
+    .o_castle(castle),
+    .o_ep(ep),
+    .o_hmcount(),
+    .o_fmcount()
+  );
+
+  // fen_decode's counters go out on o_uci_data, a nibble a word, ahead of
+  // the command it passes on to the board, which then sends its own. The
+  // command is a one beat packet, so only a FEN's last square has eop
+  // without sop and starts the board
+  wire        uci_valid;
+  wire [20:0] uci_data;
+  wire        uci_sop;
+  wire        uci_eop;
+  assign o_uci_valid = pos_perf ? pos_valid : uci_valid;
+  assign o_uci_data = pos_perf ? {17'd0, pos_data} : uci_data;
+  assign o_uci_sop = pos_perf ? pos_sop : uci_sop;
+  assign o_uci_eop = pos_perf ? pos_eop : uci_eop;
+
+  psudolegal_board board (
+    .clk(clk),
+    .in_pos_valid(pos_valid & !pos_perf),
+    .in_pos_data(pos_data),
+    .in_pos_sop(pos_sop),
+    .in_pos_eop(pos_eop),
+    .in_wtp(wtp),
+    .in_castle(castle),
+    .in_ep(ep),
+    .in_legal(in_legal),
+    .in_order(1'b0),
+    .in_make(1'b0),
+    .in_make_data(21'b0),
+    .in_unmake(1'b0),
+    .start(pos_valid & pos_eop & !pos_sop & !pos_perf),
+    .o_uci_valid(uci_valid),
+    .o_uci_data(uci_data),
+    .o_uci_sop(uci_sop),
+    .o_uci_eop(uci_eop),
+    .o_uci_keep(),
+    .o_uci_delta(),
+    .in_uci_ready(1'b1),
+    .o_pos_ready(),
+    .o_shadow_ready(),
+    .o_in_check(o_in_check),
+    .o_eval(),
+    .o_hash()
+  );
+
+endmodule
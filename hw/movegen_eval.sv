@@ -0,0 +1,36 @@
+module movegen_eval(
+  // a move in the o_uci_data fields, and who makes it. ep marks a pawn
+  // taking en passant, which takes from beside its destination
+  input logic        white,
+  input logic [2:0]  piece,
+  input logic [5:0]  from_rf,
+  input logic [5:0]  to_rf,
+  input logic [2:0]  takes,
+  input logic [2:0]  promote,
+  input logic        ep,
+
+  // change in material and piece-square score for the side moving
+  output logic signed [15:0] delta
+  );
+
+  // promote codes 4-7 are queen, rook, knight, bishop
+  wire [2:0] promote_piece = promote[1] ? (promote[0] ? 3'h4 : 3'h5) : (promote[0] ? 3'h3 : 3'h2);
+  wire [2:0] new_piece = promote[2] ? promote_piece : piece;
+
+  // castling also moves the rook, from the corner to beside the king
+  wire castling = piece == 3'h1 && from_rf[2:0] == 3'd4 && (to_rf[2:0] == 3'd6 || to_rf[2:0] == 3'd2);
+  wire [2:0] rook = castling ? 3'h3 : 3'h0;
+  wire [5:0] rook_from = {from_rf[5:3], to_rf[2] ? 3'd7 : 3'd0};
+  wire [5:0] rook_to = {from_rf[5:3], to_rf[2] ? 3'd5 : 3'd3};
+  wire [5:0] taken_rf = ep ? {from_rf[5:3], to_rf[2:0]} : to_rf;
+
+  wire signed [15:0] arrive, leave, taken, rook_arrive, rook_leave;
+  movegen_pst pst_arrive(.white(white), .piece(new_piece), .rankfile(to_rf), .score(arrive));
+  movegen_pst pst_leave(.white(white), .piece(piece), .rankfile(from_rf), .score(leave));
+  movegen_pst pst_taken(.white(!white), .piece(takes), .rankfile(taken_rf), .score(taken));
+  movegen_pst pst_rook_arrive(.white(white), .piece(rook), .rankfile(rook_to), .score(rook_arrive));
+  movegen_pst pst_rook_leave(.white(white), .piece(rook), .rankfile(rook_from), .score(rook_leave));
+
+  assign delta = arrive - leave + taken + rook_arrive - rook_leave;
+
+endmodule
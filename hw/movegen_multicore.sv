@@ -0,0 +1,177 @@
+module movegen_multicore #(
+        parameter CORES = 2,
+        parameter TAG_WIDTH = 8,
+        parameter FIFO_DEPTH_LOG2 = 9
+  ) (
+  input logic clk,
+
+  // positions in the psudolegal_board serial format, one after another on a
+  // single bus. A position may only begin (in_pos_sop) while o_pos_ready is
+  // high. in_legal and in_pos_tag are taken with in_pos_sop, in_wtp,
+  // in_castle and in_ep with in_pos_eop, which also starts the board.
+  input logic        in_pos_valid,
+  input logic [3:0]  in_pos_data,
+  input logic        in_pos_sop,
+  input logic        in_pos_eop,
+  input logic        in_wtp,
+  input logic [3:0]  in_castle,
+  input logic [3:0]  in_ep,
+  input logic        in_legal,
+  input logic [TAG_WIDTH-1:0] in_pos_tag,
+  output wire        o_pos_ready,
+
+  // the move lists of every core merged into one stream, a whole list at a
+  // time, each word with the tag its position came in with. As for
+  // psudolegal_board, a position without moves is an o_uci_eop on its own.
+  // o_in_check is valid with o_uci_eop.
+  output reg                 o_uci_valid = 0,
+  output reg [20:0]          o_uci_data = 0,
+  output reg                 o_uci_sop = 0,
+  output reg                 o_uci_eop = 0,
+  output reg [TAG_WIDTH-1:0] o_uci_tag = 0,
+  output reg                 o_in_check = 0
+  );
+
+  // longest move list a core can write, plus the entry for its eop
+  localparam MAX_LIST = 256;
+  localparam ENTRY_WIDTH = 4 + TAG_WIDTH + 21;
+
+  // Dispatch. Positions go to an idle core, round robin from the core after
+  // the last one used. A core is busy from the in_pos_sop it is given until
+  // its o_uci_eop, and is only idle again if its output FIFO has room for
+  // another full move list, so the cores never need to be held up.
+  wire [CORES-1:0] busy;
+  wire [CORES-1:0] room;
+  wire [CORES-1:0] idle = ~busy & room;
+  reg  [CORES-1:0] load_base = 1;
+  reg  [CORES-1:0] load_sel = 0;
+  wire [CORES-1:0] load_grant;
+  arbiter #(.WIDTH(CORES)) arbiter_load (
+    .base(load_base),
+    .req(idle),
+    .grant(load_grant)
+  );
+  wire dispatch = in_pos_valid & in_pos_sop;
+  wire [CORES-1:0] load_cur = dispatch ? load_grant : load_sel;
+  wire [2*CORES-1:0] load_rotate = {load_grant, load_grant} << 1;
+  assign o_pos_ready = |idle;
+
+  always @(posedge clk) begin
+    if (dispatch) begin
+      load_sel <= load_grant;
+      load_base <= load_rotate[2*CORES-1:CORES];
+    end
+  end
+
+  wire [CORES-1:0] fifo_valid;
+  wire [CORES-1:0] fifo_pop;
+  wire [CORES*ENTRY_WIDTH-1:0] fifo_data;
+
+  genvar k;
+  generate
+    for (k=0; k<CORES; k=k+1)
+    begin: core
+      // held for the core while it generates
+      reg                 legal = 0;
+      reg [TAG_WIDTH-1:0] tag = 0;
+      reg                 loaded = 0;
+
+      wire        uci_valid, uci_sop, uci_eop, in_check;
+      wire [20:0] uci_data;
+      wire [FIFO_DEPTH_LOG2:0] free;
+
+      always @(posedge clk) begin
+        if (dispatch & load_grant[k]) begin
+          legal <= in_legal;
+          tag <= in_pos_tag;
+          loaded <= 1;
+        end else if (uci_eop) begin
+          loaded <= 0;
+        end
+      end
+
+      psudolegal_board board (
+        .clk(clk),
+        .in_pos_valid(in_pos_valid & load_cur[k]),
+        .in_pos_data(in_pos_data),
+        .in_pos_sop(in_pos_sop),
+        .in_pos_eop(in_pos_eop),
+        .in_wtp(in_wtp),
+        .in_castle(in_castle),
+        .in_ep(in_ep),
+        .in_legal(legal),
+        .in_order(1'b0),
+        .in_make(1'b0),
+        .in_make_data(21'b0),
+        .in_unmake(1'b0),
+        .start(in_pos_valid & in_pos_eop & load_cur[k]),
+        .o_uci_valid(uci_valid),
+        .o_uci_data(uci_data),
+        .o_uci_sop(uci_sop),
+        .o_uci_eop(uci_eop),
+        .o_uci_keep(),
+        .o_uci_delta(),
+        .in_uci_ready(1'b1),
+        .o_pos_ready(),
+        .o_shadow_ready(),
+        .o_in_check(in_check),
+        .o_eval(),
+        .o_hash()
+      );
+
+      stream_fifo #(.WIDTH(ENTRY_WIDTH), .DEPTH_LOG2(FIFO_DEPTH_LOG2)) fifo (
+        .clk(clk),
+        .in_valid(uci_valid | uci_eop),
+        .in_data({in_check, uci_sop, uci_eop, uci_valid, tag, uci_data}),
+        .free(free),
+        .out_valid(fifo_valid[k]),
+        .out_data(fifo_data[k*ENTRY_WIDTH +: ENTRY_WIDTH]),
+        .out_ready(fifo_pop[k])
+      );
+      assign busy[k] = loaded;
+      assign room[k] = free >= MAX_LIST;
+    end
+  endgenerate
+
+  // Merge. Whole move lists are forwarded one at a time, the next list
+  // picked round robin from the FIFOs holding output once the current one
+  // reaches its eop.
+  reg  [CORES-1:0] out_sel = 0;  // FIFO mid-list, 0 between lists
+  reg  [CORES-1:0] out_base = 1;
+  wire [CORES-1:0] out_grant;
+  arbiter #(.WIDTH(CORES)) arbiter_out (
+    .base(out_base),
+    .req(fifo_valid),
+    .grant(out_grant)
+  );
+  wire [CORES-1:0] out_cur = |out_sel ? out_sel : out_grant;
+  assign fifo_pop = out_cur & fifo_valid;
+  wire [2*CORES-1:0] out_rotate = {out_cur, out_cur} << 1;
+
+  reg [ENTRY_WIDTH-1:0] entry;
+  integer c;
+  always_comb begin
+    entry = 0;
+    for (c = 0; c < CORES; c = c + 1)
+      entry = entry | (fifo_pop[c] ? fifo_data[c*ENTRY_WIDTH +: ENTRY_WIDTH] : {ENTRY_WIDTH{1'b0}});
+  end
+  wire entry_valid = |fifo_pop;
+  wire entry_eop = entry[TAG_WIDTH+22];
+
+  always @(posedge clk) begin
+    if (entry_valid) begin
+      out_sel <= entry_eop ? {CORES{1'b0}} : out_cur;
+      if (entry_eop) begin
+        out_base <= out_rotate[2*CORES-1:CORES];
+      end
+    end
+
+    o_uci_data  <= entry[20:0];
+    o_uci_tag   <= entry[21 +: TAG_WIDTH];
+    o_uci_valid <= entry_valid & entry[TAG_WIDTH+21];
+    o_uci_eop   <= entry_valid & entry_eop;
+    o_uci_sop   <= entry_valid & entry[TAG_WIDTH+23];
+    o_in_check  <= entry[TAG_WIDTH+24];
+  end
+
+endmodule
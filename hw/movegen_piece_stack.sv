@@ -8,7 +8,14 @@ module movegen_piece_stack #(
 
     input logic [WIDTH-1:0]  in_data,
     input logic              load,
-    output reg  [WIDTH-1:0]  out_data = 0
+    output reg  [WIDTH-1:0]  out_data = 0,
+
+    // make/unmake edits: set rewrites this entry, pull takes the entry
+    // above when one below is removed, closing the gap
+    input logic [WIDTH-1:0]  in_set_data,
+    input logic              set,
+    input logic [WIDTH-1:0]  in_pull_data,
+    input logic              pull
   );
 
   always @(posedge clk) begin
@@ -16,6 +23,10 @@ module movegen_piece_stack #(
       out_data <= 0;
     end else if (load) begin
       out_data <= in_data;
+    end else if (pull) begin
+      out_data <= in_pull_data;
+    end else if (set) begin
+      out_data <= in_set_data;
     end
   end
 
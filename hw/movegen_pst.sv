@@ -0,0 +1,93 @@
+module movegen_pst(
+  // a piece, coloured as in_pos_data, on a rank/file square
+  input logic        white,
+  input logic [2:0]  piece,
+  input logic [5:0]  rankfile,
+  // its material and piece-square score for the side that owns it, 0 for
+  // an empty square
+  output logic signed [15:0] score
+  );
+
+  // Piece-square tables from white's side, laid out as usually printed with
+  // a8 first. The first entry written is the top byte, so the entry for a
+  // square sits at {rank, ~file}, as in the board's serial chain. Black
+  // reads them with the rank mirrored.
+  localparam [64*8-1:0] PST_KING = {
+    -8'sd30, -8'sd40, -8'sd40, -8'sd50, -8'sd50, -8'sd40, -8'sd40, -8'sd30,
+    -8'sd30, -8'sd40, -8'sd40, -8'sd50, -8'sd50, -8'sd40, -8'sd40, -8'sd30,
+    -8'sd30, -8'sd40, -8'sd40, -8'sd50, -8'sd50, -8'sd40, -8'sd40, -8'sd30,
+    -8'sd30, -8'sd40, -8'sd40, -8'sd50, -8'sd50, -8'sd40, -8'sd40, -8'sd30,
+    -8'sd20, -8'sd30, -8'sd30, -8'sd40, -8'sd40, -8'sd30, -8'sd30, -8'sd20,
+    -8'sd10, -8'sd20, -8'sd20, -8'sd20, -8'sd20, -8'sd20, -8'sd20, -8'sd10,
+     8'sd20,  8'sd20,   8'sd0,   8'sd0,   8'sd0,   8'sd0,  8'sd20,  8'sd20,
+     8'sd20,  8'sd30,  8'sd10,   8'sd0,   8'sd0,  8'sd10,  8'sd30,  8'sd20
+  };
+  localparam [64*8-1:0] PST_QUEEN = {
+    -8'sd20, -8'sd10, -8'sd10,  -8'sd5,  -8'sd5, -8'sd10, -8'sd10, -8'sd20,
+    -8'sd10,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0, -8'sd10,
+    -8'sd10,   8'sd0,   8'sd5,   8'sd5,   8'sd5,   8'sd5,   8'sd0, -8'sd10,
+     -8'sd5,   8'sd0,   8'sd5,   8'sd5,   8'sd5,   8'sd5,   8'sd0,  -8'sd5,
+      8'sd0,   8'sd0,   8'sd5,   8'sd5,   8'sd5,   8'sd5,   8'sd0,  -8'sd5,
+    -8'sd10,   8'sd5,   8'sd5,   8'sd5,   8'sd5,   8'sd5,   8'sd0, -8'sd10,
+    -8'sd10,   8'sd0,   8'sd5,   8'sd0,   8'sd0,   8'sd0,   8'sd0, -8'sd10,
+    -8'sd20, -8'sd10, -8'sd10,  -8'sd5,  -8'sd5, -8'sd10, -8'sd10, -8'sd20
+  };
+  localparam [64*8-1:0] PST_ROOK = {
+      8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,
+      8'sd5,  8'sd10,  8'sd10,  8'sd10,  8'sd10,  8'sd10,  8'sd10,   8'sd5,
+     -8'sd5,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,  -8'sd5,
+     -8'sd5,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,  -8'sd5,
+     -8'sd5,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,  -8'sd5,
+     -8'sd5,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,  -8'sd5,
+     -8'sd5,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,  -8'sd5,
+      8'sd0,   8'sd0,   8'sd0,   8'sd5,   8'sd5,   8'sd0,   8'sd0,   8'sd0
+  };
+  localparam [64*8-1:0] PST_BISHOP = {
+    -8'sd20, -8'sd10, -8'sd10, -8'sd10, -8'sd10, -8'sd10, -8'sd10, -8'sd20,
+    -8'sd10,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0, -8'sd10,
+    -8'sd10,   8'sd0,   8'sd5,  8'sd10,  8'sd10,   8'sd5,   8'sd0, -8'sd10,
+    -8'sd10,   8'sd5,   8'sd5,  8'sd10,  8'sd10,   8'sd5,   8'sd5, -8'sd10,
+    -8'sd10,   8'sd0,  8'sd10,  8'sd10,  8'sd10,  8'sd10,   8'sd0, -8'sd10,
+    -8'sd10,  8'sd10,  8'sd10,  8'sd10,  8'sd10,  8'sd10,  8'sd10, -8'sd10,
+    -8'sd10,   8'sd5,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd5, -8'sd10,
+    -8'sd20, -8'sd10, -8'sd10, -8'sd10, -8'sd10, -8'sd10, -8'sd10, -8'sd20
+  };
+  localparam [64*8-1:0] PST_KNIGHT = {
+    -8'sd50, -8'sd40, -8'sd30, -8'sd30, -8'sd30, -8'sd30, -8'sd40, -8'sd50,
+    -8'sd40, -8'sd20,   8'sd0,   8'sd0,   8'sd0,   8'sd0, -8'sd20, -8'sd40,
+    -8'sd30,   8'sd0,  8'sd10,  8'sd15,  8'sd15,  8'sd10,   8'sd0, -8'sd30,
+    -8'sd30,   8'sd5,  8'sd15,  8'sd20,  8'sd20,  8'sd15,   8'sd5, -8'sd30,
+    -8'sd30,   8'sd0,  8'sd15,  8'sd20,  8'sd20,  8'sd15,   8'sd0, -8'sd30,
+    -8'sd30,   8'sd5,  8'sd10,  8'sd15,  8'sd15,  8'sd10,   8'sd5, -8'sd30,
+    -8'sd40, -8'sd20,   8'sd0,   8'sd5,   8'sd5,   8'sd0, -8'sd20, -8'sd40,
+    -8'sd50, -8'sd40, -8'sd30, -8'sd30, -8'sd30, -8'sd30, -8'sd40, -8'sd50
+  };
+  localparam [64*8-1:0] PST_PAWN = {
+      8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,
+     8'sd50,  8'sd50,  8'sd50,  8'sd50,  8'sd50,  8'sd50,  8'sd50,  8'sd50,
+     8'sd10,  8'sd10,  8'sd20,  8'sd30,  8'sd30,  8'sd20,  8'sd10,  8'sd10,
+      8'sd5,   8'sd5,  8'sd10,  8'sd25,  8'sd25,  8'sd10,   8'sd5,   8'sd5,
+      8'sd0,   8'sd0,   8'sd0,  8'sd20,  8'sd20,   8'sd0,   8'sd0,   8'sd0,
+      8'sd5,  -8'sd5, -8'sd10,   8'sd0,   8'sd0, -8'sd10,  -8'sd5,   8'sd5,
+      8'sd5,  8'sd10,  8'sd10, -8'sd20, -8'sd20,  8'sd10,  8'sd10,   8'sd5,
+      8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0,   8'sd0
+  };
+
+
+  wire [5:0] index = {white ? rankfile[5:3] : ~rankfile[5:3], ~rankfile[2:0]};
+  reg [7:0]  table_score;
+  reg [15:0] value;
+  always_comb begin
+    case (piece)
+      3'h1: begin table_score = PST_KING[index*8 +: 8];   value = 16'd0;   end
+      3'h2: begin table_score = PST_QUEEN[index*8 +: 8];  value = 16'd900; end
+      3'h3: begin table_score = PST_ROOK[index*8 +: 8];   value = 16'd500; end
+      3'h4: begin table_score = PST_BISHOP[index*8 +: 8]; value = 16'd330; end
+      3'h5: begin table_score = PST_KNIGHT[index*8 +: 8]; value = 16'd320; end
+      3'h6: begin table_score = PST_PAWN[index*8 +: 8];   value = 16'd100; end
+      default: begin table_score = 8'd0; value = 16'd0; end
+    endcase
+  end
+  assign score = $signed(value) + {{8{table_score[7]}}, table_score};
+
+endmodule
@@ -9,9 +9,16 @@ module movegen_square #(
   input logic [3:0]  in_pos_data,
   output wire  [3:0] out_pos_data,
 
+  // make/unmake writes the square in place, outside of the serial load
+  input logic        i_set,
+  input logic [3:0]  i_set_data,
+
   input logic        i_ep_file,
   input logic [3:0]  i_castle_rights,
 
+  // the pawn, slide and castle rays ripple square to square within one cycle,
+  // to Verilator each board-wide bus looks like a signal feeding itself.
+  /* verilator lint_off UNOPTFLAT */
   // pawn moves
   output        o_pn,
   output        o_ps,
@@ -84,30 +91,52 @@ module movegen_square #(
   output        o_castle_w,
   input logic   i_castle_e,
   input logic   i_castle_w,
-
+  /* verilator lint_on UNOPTFLAT */
 
   // control signals
   input logic   emit_move,
   output        target_square,
   input logic   load_attackers,
+  input logic   load_checkers,
+
+  // legal move mode, with the board-wide check state and the lines the
+  // moving piece is pinned to. {anti-diagonal, diagonal, rank, file} axes
+  input logic        legal,
+  input logic  [3:0] i_allow,
+  input logic        i_in_check,
+  input logic        i_double_check,
+  input logic  [7:0] i_checker_rays,
+  input logic        i_ep_checker,
+  output             o_checker,
+  output       [7:0] o_checker_rays,
+  output       [3:0] o_pin_axes,
 
   input logic   wtp
   );
 
+  // slider rays arriving here by the direction they travel in, paired up
+  // by axis: N S, E W, NE SW, NW SE
+  wire [7:0] slide_in = {i_sse, i_snw, i_sne, i_ssw, i_se, i_sw, i_sn, i_ss};
+  wire knight_in = i_nsse | i_nssw | i_nnne | i_nnnw | i_neen | i_nees | i_nwwn | i_nwws;
+  wire pawn_diag_in = i_pne | i_pse | i_psw | i_pnw;
+
   // serial data clock through
   reg [3:0] pos = 0;
   reg       is_attacked = 0;
+  reg [7:0] attack_ray = 0;  // opponent slider rays reaching this square
 
   always @(posedge clk) begin
     if (in_pos_valid) begin
       pos <= in_pos_data;
+    end else if (i_set) begin
+      pos <= i_set_data;
     end
 
     if (load_attackers) begin
-      is_attacked <=  i_pne | i_pse | i_psw | i_pnw |
+      is_attacked <=  pawn_diag_in |
                       i_kn | i_kne | i_ke | i_kse | i_ks | i_ksw | i_kw | i_knw |
-                      i_ss | i_sn | i_sw | i_se | i_ssw | i_snw | i_sne | i_sse |
-                      i_nsse | i_nssw | i_nnne | i_nnnw | i_neen | i_nees | i_nwwn | i_nwws;
+                      |slide_in | knight_in;
+      attack_ray <= slide_in;
     end
 
   end
@@ -124,25 +153,57 @@ module movegen_square #(
   //  K Q R B N P
   //  1 2 3 4 5 6   +0 black (lower case)
   //  9 A B C D E   +8 white (upper case)
-  assign p_king   = piece == 3'h1;
-  assign p_queen  = piece == 3'h2;
-  assign p_rook   = piece == 3'h3;
-  assign p_bishop = piece == 3'h4;
-  assign p_knight = piece == 3'h5;
+  wire p_king   = piece == 3'h1;
+  wire p_queen  = piece == 3'h2;
+  wire p_rook   = piece == 3'h3;
+  wire p_bishop = piece == 3'h4;
+  wire p_knight = piece == 3'h5;
+  wire p_pawn   = piece == 3'h6;
 
   wire p_white_pawn = pos == 4'hE;
   wire p_black_pawn = pos == 4'h6;
 
+  // during load_checkers our king sends every kind of ray out of its own
+  // square, so the opponent pieces they reach with the matching move are
+  // those giving check. Our pieces reached by the king's ray from one side
+  // and an opponent slider's ray from the other are pinned to that axis.
+  reg [7:0] king_ray = 0;
+  reg       is_checker = 0;
+  reg [3:0] pin_axes = 0;
+  wire [7:0] attack_ray_back = {attack_ray[6], attack_ray[7], attack_ray[4], attack_ray[5],
+                                attack_ray[2], attack_ray[3], attack_ray[0], attack_ray[1]};
+  wire [7:0] pin_rays = slide_in & attack_ray_back;
+
+  always @(posedge clk) begin
+    if (load_checkers) begin
+      king_ray <= slide_in;
+      is_checker <= sq_oppos & (
+                      (|slide_in[3:0] & (p_queen | p_rook)) |
+                      (|slide_in[7:4] & (p_queen | p_bishop)) |
+                      (knight_in & p_knight) |
+                      (pawn_diag_in & p_pawn));
+      pin_axes <= {4{sq_play}} & {|pin_rays[7:6], |pin_rays[5:4], |pin_rays[3:2], |pin_rays[1:0]};
+    end
+  end
+  assign o_checker = is_checker;
+  assign o_checker_rays = is_checker ? king_ray : 8'h0;
+  assign o_pin_axes = pin_axes;
+
   wire emit_attack = sq_oppos & load_attackers;
+  wire emit_king_rays = sq_play & p_king & load_checkers;
+
+  // opponent slider rays carry on through our king while attacks are loaded,
+  // so the king cannot step back along the line it is checked on
+  wire slide_pass = sq_empty | (load_attackers & sq_play & p_king);
 
   // pawn moves out (direction depends on colour!)
   wire pn = (emit_move & p_white_pawn);
   assign o_pn  = pn || (RANK == 3 & i_ps & sq_empty);   // pn | double-move
-  assign o_pne_nw = pn || (emit_attack & p_white_pawn); // pn | attackers
+  assign o_pne_nw = pn || (emit_attack & p_white_pawn) || (emit_king_rays & wtp); // pn | attackers | king
 
   wire ps = (emit_move & p_black_pawn);
   assign o_ps  = ps || (RANK == 6 & i_pn & sq_empty);   // ps | double-move
-  assign o_pse_sw = ps || (emit_attack & p_black_pawn); // ps | attackers
+  assign o_pse_sw = ps || (emit_attack & p_black_pawn) || (emit_king_rays & !wtp); // ps | attackers | king
 
   // king moves out
   wire k = (emit_move || emit_attack) & p_king;
@@ -156,19 +217,19 @@ module movegen_square #(
   assign o_knw = k;
 
   // sliders out, with combinatorial pass thru if empty
-  wire slide_hver = (emit_move || emit_attack) & (p_queen | p_rook);
-  wire slide_diag = (emit_move || emit_attack) & (p_queen | p_bishop);
-  assign o_sn  = slide_hver | (sq_empty & i_ss);
-  assign o_ss  = slide_hver | (sq_empty & i_sn);
-  assign o_se  = slide_hver | (sq_empty & i_sw);
-  assign o_sw  = slide_hver | (sq_empty & i_se);
-  assign o_sne = slide_diag | (sq_empty & i_ssw);
-  assign o_sse = slide_diag | (sq_empty & i_snw);
-  assign o_ssw = slide_diag | (sq_empty & i_sne);
-  assign o_snw = slide_diag | (sq_empty & i_sse);
+  wire slide_hver = ((emit_move || emit_attack) & (p_queen | p_rook)) | emit_king_rays;
+  wire slide_diag = ((emit_move || emit_attack) & (p_queen | p_bishop)) | emit_king_rays;
+  assign o_sn  = slide_hver | (slide_pass & i_ss);
+  assign o_ss  = slide_hver | (slide_pass & i_sn);
+  assign o_se  = slide_hver | (slide_pass & i_sw);
+  assign o_sw  = slide_hver | (slide_pass & i_se);
+  assign o_sne = slide_diag | (slide_pass & i_ssw);
+  assign o_sse = slide_diag | (slide_pass & i_snw);
+  assign o_ssw = slide_diag | (slide_pass & i_sne);
+  assign o_snw = slide_diag | (slide_pass & i_sse);
 
   // knight out
-  wire n = (emit_move || emit_attack) & p_knight;
+  wire n = ((emit_move || emit_attack) & p_knight) | emit_king_rays;
   assign o_nnne = n;
   assign o_nnnw = n;
   assign o_nssw = n;
@@ -210,18 +271,28 @@ module movegen_square #(
     end
   endgenerate
 
+  // legal mode: moves other than the king's must take the checker or block
+  // its ray to the king, and a pinned piece keeps to the axis it is pinned
+  // along (i_allow is all ones otherwise). The king must not move onto an
+  // attacked square.
+  wire evade = !legal | !i_in_check |
+               (!i_double_check & (is_checker | |(king_ray & i_checker_rays)));
+  wire king_safe = !legal | !is_attacked;
+  wire pawn_diag = ((i_pse | i_pnw) & i_allow[2]) | ((i_psw | i_pne) & i_allow[3]);
+
   // pieces moving here
-  assign pawn_move = (i_pn | i_ps) & sq_empty;
-  assign pawn_take = (i_pne | i_pse | i_psw | i_pnw) & sq_oppos;
+  wire pawn_move = (i_pn | i_ps) & i_allow[0] & sq_empty & evade;
+  wire pawn_take = pawn_diag & sq_oppos & evade;
   // if  wtp, ep indicates a black move, RANK == 6 is the ep capture square
   // if !wtp, ep indicates a white move, RANK == 3 is the ep capture square
-  assign pawn_ep   = (((i_pne | i_pnw) && sq_empty && RANK == 3) |
-                      ((i_pse | i_psw) && sq_empty && RANK == 6))
-                    && i_ep_file;
+  // the ep capture also gets out of check from the pawn it takes
+  wire pawn_ep   = (((i_pne | i_pnw) && sq_empty && RANK == 3) |
+                    ((i_pse | i_psw) && sq_empty && RANK == 6))
+                  && pawn_diag && i_ep_file && (evade | (!i_double_check & i_ep_checker));
 
-  assign king_move = (i_kn | i_kne | i_ke | i_kse | i_ks | i_ksw | i_kw | i_knw) & (sq_empty | sq_oppos);
-  assign slide_move = (i_ss | i_sn | i_sw | i_se | i_ssw | i_snw | i_sne | i_sse) & (sq_empty | sq_oppos);
-  assign knight_move = (i_nsse | i_nssw | i_nnne | i_nnnw | i_neen | i_nees | i_nwwn | i_nwws) & (sq_empty | sq_oppos);
+  wire king_move = (i_kn | i_kne | i_ke | i_kse | i_ks | i_ksw | i_kw | i_knw) & (sq_empty | sq_oppos) & king_safe;
+  wire slide_move = |(slide_in & {{2{i_allow[3]}}, {2{i_allow[2]}}, {2{i_allow[1]}}, {2{i_allow[0]}}}) & (sq_empty | sq_oppos) & evade;
+  wire knight_move = knight_in & &i_allow & (sq_empty | sq_oppos) & evade;
   assign target_square = pawn_move || pawn_take || pawn_ep || knight_move || slide_move || king_move || castle_move;
 
 endmodule
@@ -0,0 +1,816 @@
+module movegen_zobrist_key(
+  // index into the Polyglot key array:
+  //   64 * (2 * piece + white) + 8 * rank + file, pieces from pawn 0 to king 5
+  //   768 + castling right, K Q k q
+  //   772 + en passant file
+  //   780 white to play
+  input logic [9:0]  index,
+  output logic [63:0] key
+  );
+
+  // The Polyglot opening book keys, as in python-chess's
+  // chess.polyglot.POLYGLOT_RANDOM_ARRAY, so the hash matches its
+  // zobrist_hash() and Polyglot books.
+  always_comb begin
+    case (index)
+      // black pawn, a1 to h8
+      10'd0: key = 64'h9D39247E33776D41;
+      10'd1: key = 64'h2AF7398005AAA5C7;
+      10'd2: key = 64'h44DB015024623547;
+      10'd3: key = 64'h9C15F73E62A76AE2;
+      10'd4: key = 64'h75834465489C0C89;
+      10'd5: key = 64'h3290AC3A203001BF;
+      10'd6: key = 64'h0FBBAD1F61042279;
+      10'd7: key = 64'hE83A908FF2FB60CA;
+      10'd8: key = 64'h0D7E765D58755C10;
+      10'd9: key = 64'h1A083822CEAFE02D;
+      10'd10: key = 64'h9605D5F0E25EC3B0;
+      10'd11: key = 64'hD021FF5CD13A2ED5;
+      10'd12: key = 64'h40BDF15D4A672E32;
+      10'd13: key = 64'h011355146FD56395;
+      10'd14: key = 64'h5DB4832046F3D9E5;
+      10'd15: key = 64'h239F8B2D7FF719CC;
+      10'd16: key = 64'h05D1A1AE85B49AA1;
+      10'd17: key = 64'h679F848F6E8FC971;
+      10'd18: key = 64'h7449BBFF801FED0B;
+      10'd19: key = 64'h7D11CDB1C3B7ADF0;
+      10'd20: key = 64'h82C7709E781EB7CC;
+      10'd21: key = 64'hF3218F1C9510786C;
+      10'd22: key = 64'h331478F3AF51BBE6;
+      10'd23: key = 64'h4BB38DE5E7219443;
+      10'd24: key = 64'hAA649C6EBCFD50FC;
+      10'd25: key = 64'h8DBD98A352AFD40B;
+      10'd26: key = 64'h87D2074B81D79217;
+      10'd27: key = 64'h19F3C751D3E92AE1;
+      10'd28: key = 64'hB4AB30F062B19ABF;
+      10'd29: key = 64'h7B0500AC42047AC4;
+      10'd30: key = 64'hC9452CA81A09D85D;
+      10'd31: key = 64'h24AA6C514DA27500;
+      10'd32: key = 64'h4C9F34427501B447;
+      10'd33: key = 64'h14A68FD73C910841;
+      10'd34: key = 64'hA71B9B83461CBD93;
+      10'd35: key = 64'h03488B95B0F1850F;
+      10'd36: key = 64'h637B2B34FF93C040;
+      10'd37: key = 64'h09D1BC9A3DD90A94;
+      10'd38: key = 64'h3575668334A1DD3B;
+      10'd39: key = 64'h735E2B97A4C45A23;
+      10'd40: key = 64'h18727070F1BD400B;
+      10'd41: key = 64'h1FCBACD259BF02E7;
+      10'd42: key = 64'hD310A7C2CE9B6555;
+      10'd43: key = 64'hBF983FE0FE5D8244;
+      10'd44: key = 64'h9F74D14F7454A824;
+      10'd45: key = 64'h51EBDC4AB9BA3035;
+      10'd46: key = 64'h5C82C505DB9AB0FA;
+      10'd47: key = 64'hFCF7FE8A3430B241;
+      10'd48: key = 64'h3253A729B9BA3DDE;
+      10'd49: key = 64'h8C74C368081B3075;
+      10'd50: key = 64'hB9BC6C87167C33E7;
+      10'd51: key = 64'h7EF48F2B83024E20;
+      10'd52: key = 64'h11D505D4C351BD7F;
+      10'd53: key = 64'h6568FCA92C76A243;
+      10'd54: key = 64'h4DE0B0F40F32A7B8;
+      10'd55: key = 64'h96D693460CC37E5D;
+      10'd56: key = 64'h42E240CB63689F2F;
+      10'd57: key = 64'h6D2BDCDAE2919661;
+      10'd58: key = 64'h42880B0236E4D951;
+      10'd59: key = 64'h5F0F4A5898171BB6;
+      10'd60: key = 64'h39F890F579F92F88;
+      10'd61: key = 64'h93C5B5F47356388B;
+      10'd62: key = 64'h63DC359D8D231B78;
+      10'd63: key = 64'hEC16CA8AEA98AD76;
+      // white pawn, a1 to h8
+      10'd64: key = 64'h5355F900C2A82DC7;
+      10'd65: key = 64'h07FB9F855A997142;
+      10'd66: key = 64'h5093417AA8A7ED5E;
+      10'd67: key = 64'h7BCBC38DA25A7F3C;
+      10'd68: key = 64'h19FC8A768CF4B6D4;
+      10'd69: key = 64'h637A7780DECFC0D9;
+      10'd70: key = 64'h8249A47AEE0E41F7;
+      10'd71: key = 64'h79AD695501E7D1E8;
+      10'd72: key = 64'h14ACBAF4777D5776;
+      10'd73: key = 64'hF145B6BECCDEA195;
+      10'd74: key = 64'hDABF2AC8201752FC;
+      10'd75: key = 64'h24C3C94DF9C8D3F6;
+      10'd76: key = 64'hBB6E2924F03912EA;
+      10'd77: key = 64'h0CE26C0B95C980D9;
+      10'd78: key = 64'hA49CD132BFBF7CC4;
+      10'd79: key = 64'hE99D662AF4243939;
+      10'd80: key = 64'h27E6AD7891165C3F;
+      10'd81: key = 64'h8535F040B9744FF1;
+      10'd82: key = 64'h54B3F4FA5F40D873;
+      10'd83: key = 64'h72B12C32127FED2B;
+      10'd84: key = 64'hEE954D3C7B411F47;
+      10'd85: key = 64'h9A85AC909A24EAA1;
+      10'd86: key = 64'h70AC4CD9F04F21F5;
+      10'd87: key = 64'hF9B89D3E99A075C2;
+      10'd88: key = 64'h87B3E2B2B5C907B1;
+      10'd89: key = 64'hA366E5B8C54F48B8;
+      10'd90: key = 64'hAE4A9346CC3F7CF2;
+      10'd91: key = 64'h1920C04D47267BBD;
+      10'd92: key = 64'h87BF02C6B49E2AE9;
+      10'd93: key = 64'h092237AC237F3859;
+      10'd94: key = 64'hFF07F64EF8ED14D0;
+      10'd95: key = 64'h8DE8DCA9F03CC54E;
+      10'd96: key = 64'h9C1633264DB49C89;
+      10'd97: key = 64'hB3F22C3D0B0B38ED;
+      10'd98: key = 64'h390E5FB44D01144B;
+      10'd99: key = 64'h5BFEA5B4712768E9;
+      10'd100: key = 64'h1E1032911FA78984;
+      10'd101: key = 64'h9A74ACB964E78CB3;
+      10'd102: key = 64'h4F80F7A035DAFB04;
+      10'd103: key = 64'h6304D09A0B3738C4;
+      10'd104: key = 64'h2171E64683023A08;
+      10'd105: key = 64'h5B9B63EB9CEFF80C;
+      10'd106: key = 64'h506AACF489889342;
+      10'd107: key = 64'h1881AFC9A3A701D6;
+      10'd108: key = 64'h6503080440750644;
+      10'd109: key = 64'hDFD395339CDBF4A7;
+      10'd110: key = 64'hEF927DBCF00C20F2;
+      10'd111: key = 64'h7B32F7D1E03680EC;
+      10'd112: key = 64'hB9FD7620E7316243;
+      10'd113: key = 64'h05A7E8A57DB91B77;
+      10'd114: key = 64'hB5889C6E15630A75;
+      10'd115: key = 64'h4A750A09CE9573F7;
+      10'd116: key = 64'hCF464CEC899A2F8A;
+      10'd117: key = 64'hF538639CE705B824;
+      10'd118: key = 64'h3C79A0FF5580EF7F;
+      10'd119: key = 64'hEDE6C87F8477609D;
+      10'd120: key = 64'h799E81F05BC93F31;
+      10'd121: key = 64'h86536B8CF3428A8C;
+      10'd122: key = 64'h97D7374C60087B73;
+      10'd123: key = 64'hA246637CFF328532;
+      10'd124: key = 64'h043FCAE60CC0EBA0;
+      10'd125: key = 64'h920E449535DD359E;
+      10'd126: key = 64'h70EB093B15B290CC;
+      10'd127: key = 64'h73A1921916591CBD;
+      // black knight, a1 to h8
+      10'd128: key = 64'h56436C9FE1A1AA8D;
+      10'd129: key = 64'hEFAC4B70633B8F81;
+      10'd130: key = 64'hBB215798D45DF7AF;
+      10'd131: key = 64'h45F20042F24F1768;
+      10'd132: key = 64'h930F80F4E8EB7462;
+      10'd133: key = 64'hFF6712FFCFD75EA1;
+      10'd134: key = 64'hAE623FD67468AA70;
+      10'd135: key = 64'hDD2C5BC84BC8D8FC;
+      10'd136: key = 64'h7EED120D54CF2DD9;
+      10'd137: key = 64'h22FE545401165F1C;
+      10'd138: key = 64'hC91800E98FB99929;
+      10'd139: key = 64'h808BD68E6AC10365;
+      10'd140: key = 64'hDEC468145B7605F6;
+      10'd141: key = 64'h1BEDE3A3AEF53302;
+      10'd142: key = 64'h43539603D6C55602;
+      10'd143: key = 64'hAA969B5C691CCB7A;
+      10'd144: key = 64'hA87832D392EFEE56;
+      10'd145: key = 64'h65942C7B3C7E11AE;
+      10'd146: key = 64'hDED2D633CAD004F6;
+      10'd147: key = 64'h21F08570F420E565;
+      10'd148: key = 64'hB415938D7DA94E3C;
+      10'd149: key = 64'h91B859E59ECB6350;
+      10'd150: key = 64'h10CFF333E0ED804A;
+      10'd151: key = 64'h28AED140BE0BB7DD;
+      10'd152: key = 64'hC5CC1D89724FA456;
+      10'd153: key = 64'h5648F680F11A2741;
+      10'd154: key = 64'h2D255069F0B7DAB3;
+      10'd155: key = 64'h9BC5A38EF729ABD4;
+      10'd156: key = 64'hEF2F054308F6A2BC;
+      10'd157: key = 64'hAF2042F5CC5C2858;
+      10'd158: key = 64'h480412BAB7F5BE2A;
+      10'd159: key = 64'hAEF3AF4A563DFE43;
+      10'd160: key = 64'h19AFE59AE451497F;
+      10'd161: key = 64'h52593803DFF1E840;
+      10'd162: key = 64'hF4F076E65F2CE6F0;
+      10'd163: key = 64'h11379625747D5AF3;
+      10'd164: key = 64'hBCE5D2248682C115;
+      10'd165: key = 64'h9DA4243DE836994F;
+      10'd166: key = 64'h066F70B33FE09017;
+      10'd167: key = 64'h4DC4DE189B671A1C;
+      10'd168: key = 64'h51039AB7712457C3;
+      10'd169: key = 64'hC07A3F80C31FB4B4;
+      10'd170: key = 64'hB46EE9C5E64A6E7C;
+      10'd171: key = 64'hB3819A42ABE61C87;
+      10'd172: key = 64'h21A007933A522A20;
+      10'd173: key = 64'h2DF16F761598AA4F;
+      10'd174: key = 64'h763C4A1371B368FD;
+      10'd175: key = 64'hF793C46702E086A0;
+      10'd176: key = 64'hD7288E012AEB8D31;
+      10'd177: key = 64'hDE336A2A4BC1C44B;
+      10'd178: key = 64'h0BF692B38D079F23;
+      10'd179: key = 64'h2C604A7A177326B3;
+      10'd180: key = 64'h4850E73E03EB6064;
+      10'd181: key = 64'hCFC447F1E53C8E1B;
+      10'd182: key = 64'hB05CA3F564268D99;
+      10'd183: key = 64'h9AE182C8BC9474E8;
+      10'd184: key = 64'hA4FC4BD4FC5558CA;
+      10'd185: key = 64'hE755178D58FC4E76;
+      10'd186: key = 64'h69B97DB1A4C03DFE;
+      10'd187: key = 64'hF9B5B7C4ACC67C96;
+      10'd188: key = 64'hFC6A82D64B8655FB;
+      10'd189: key = 64'h9C684CB6C4D24417;
+      10'd190: key = 64'h8EC97D2917456ED0;
+      10'd191: key = 64'h6703DF9D2924E97E;
+      // white knight, a1 to h8
+      10'd192: key = 64'hC547F57E42A7444E;
+      10'd193: key = 64'h78E37644E7CAD29E;
+      10'd194: key = 64'hFE9A44E9362F05FA;
+      10'd195: key = 64'h08BD35CC38336615;
+      10'd196: key = 64'h9315E5EB3A129ACE;
+      10'd197: key = 64'h94061B871E04DF75;
+      10'd198: key = 64'hDF1D9F9D784BA010;
+      10'd199: key = 64'h3BBA57B68871B59D;
+      10'd200: key = 64'hD2B7ADEEDED1F73F;
+      10'd201: key = 64'hF7A255D83BC373F8;
+      10'd202: key = 64'hD7F4F2448C0CEB81;
+      10'd203: key = 64'hD95BE88CD210FFA7;
+      10'd204: key = 64'h336F52F8FF4728E7;
+      10'd205: key = 64'hA74049DAC312AC71;
+      10'd206: key = 64'hA2F61BB6E437FDB5;
+      10'd207: key = 64'h4F2A5CB07F6A35B3;
+      10'd208: key = 64'h87D380BDA5BF7859;
+      10'd209: key = 64'h16B9F7E06C453A21;
+      10'd210: key = 64'h7BA2484C8A0FD54E;
+      10'd211: key = 64'hF3A678CAD9A2E38C;
+      10'd212: key = 64'h39B0BF7DDE437BA2;
+      10'd213: key = 64'hFCAF55C1BF8A4424;
+      10'd214: key = 64'h18FCF680573FA594;
+      10'd215: key = 64'h4C0563B89F495AC3;
+      10'd216: key = 64'h40E087931A00930D;
+      10'd217: key = 64'h8CFFA9412EB642C1;
+      10'd218: key = 64'h68CA39053261169F;
+      10'd219: key = 64'h7A1EE967D27579E2;
+      10'd220: key = 64'h9D1D60E5076F5B6F;
+      10'd221: key = 64'h3810E399B6F65BA2;
+      10'd222: key = 64'h32095B6D4AB5F9B1;
+      10'd223: key = 64'h35CAB62109DD038A;
+      10'd224: key = 64'hA90B24499FCFAFB1;
+      10'd225: key = 64'h77A225A07CC2C6BD;
+      10'd226: key = 64'h513E5E634C70E331;
+      10'd227: key = 64'h4361C0CA3F692F12;
+      10'd228: key = 64'hD941ACA44B20A45B;
+      10'd229: key = 64'h528F7C8602C5807B;
+      10'd230: key = 64'h52AB92BEB9613989;
+      10'd231: key = 64'h9D1DFA2EFC557F73;
+      10'd232: key = 64'h722FF175F572C348;
+      10'd233: key = 64'h1D1260A51107FE97;
+      10'd234: key = 64'h7A249A57EC0C9BA2;
+      10'd235: key = 64'h04208FE9E8F7F2D6;
+      10'd236: key = 64'h5A110C6058B920A0;
+      10'd237: key = 64'h0CD9A497658A5698;
+      10'd238: key = 64'h56FD23C8F9715A4C;
+      10'd239: key = 64'h284C847B9D887AAE;
+      10'd240: key = 64'h04FEABFBBDB619CB;
+      10'd241: key = 64'h742E1E651C60BA83;
+      10'd242: key = 64'h9A9632E65904AD3C;
+      10'd243: key = 64'h881B82A13B51B9E2;
+      10'd244: key = 64'h506E6744CD974924;
+      10'd245: key = 64'hB0183DB56FFC6A79;
+      10'd246: key = 64'h0ED9B915C66ED37E;
+      10'd247: key = 64'h5E11E86D5873D484;
+      10'd248: key = 64'hF678647E3519AC6E;
+      10'd249: key = 64'h1B85D488D0F20CC5;
+      10'd250: key = 64'hDAB9FE6525D89021;
+      10'd251: key = 64'h0D151D86ADB73615;
+      10'd252: key = 64'hA865A54EDCC0F019;
+      10'd253: key = 64'h93C42566AEF98FFB;
+      10'd254: key = 64'h99E7AFEABE000731;
+      10'd255: key = 64'h48CBFF086DDF285A;
+      // black bishop, a1 to h8
+      10'd256: key = 64'h7F9B6AF1EBF78BAF;
+      10'd257: key = 64'h58627E1A149BBA21;
+      10'd258: key = 64'h2CD16E2ABD791E33;
+      10'd259: key = 64'hD363EFF5F0977996;
+      10'd260: key = 64'h0CE2A38C344A6EED;
+      10'd261: key = 64'h1A804AADB9CFA741;
+      10'd262: key = 64'h907F30421D78C5DE;
+      10'd263: key = 64'h501F65EDB3034D07;
+      10'd264: key = 64'h37624AE5A48FA6E9;
+      10'd265: key = 64'h957BAF61700CFF4E;
+      10'd266: key = 64'h3A6C27934E31188A;
+      10'd267: key = 64'hD49503536ABCA345;
+      10'd268: key = 64'h088E049589C432E0;
+      10'd269: key = 64'hF943AEE7FEBF21B8;
+      10'd270: key = 64'h6C3B8E3E336139D3;
+      10'd271: key = 64'h364F6FFA464EE52E;
+      10'd272: key = 64'hD60F6DCEDC314222;
+      10'd273: key = 64'h56963B0DCA418FC0;
+      10'd274: key = 64'h16F50EDF91E513AF;
+      10'd275: key = 64'hEF1955914B609F93;
+      10'd276: key = 64'h565601C0364E3228;
+      10'd277: key = 64'hECB53939887E8175;
+      10'd278: key = 64'hBAC7A9A18531294B;
+      10'd279: key = 64'hB344C470397BBA52;
+      10'd280: key = 64'h65D34954DAF3CEBD;
+      10'd281: key = 64'hB4B81B3FA97511E2;
+      10'd282: key = 64'hB422061193D6F6A7;
+      10'd283: key = 64'h071582401C38434D;
+      10'd284: key = 64'h7A13F18BBEDC4FF5;
+      10'd285: key = 64'hBC4097B116C524D2;
+      10'd286: key = 64'h59B97885E2F2EA28;
+      10'd287: key = 64'h99170A5DC3115544;
+      10'd288: key = 64'h6F423357E7C6A9F9;
+      10'd289: key = 64'h325928EE6E6F8794;
+      10'd290: key = 64'hD0E4366228B03343;
+      10'd291: key = 64'h565C31F7DE89EA27;
+      10'd292: key = 64'h30F5611484119414;
+      10'd293: key = 64'hD873DB391292ED4F;
+      10'd294: key = 64'h7BD94E1D8E17DEBC;
+      10'd295: key = 64'hC7D9F16864A76E94;
+      10'd296: key = 64'h947AE053EE56E63C;
+      10'd297: key = 64'hC8C93882F9475F5F;
+      10'd298: key = 64'h3A9BF55BA91F81CA;
+      10'd299: key = 64'hD9A11FBB3D9808E4;
+      10'd300: key = 64'h0FD22063EDC29FCA;
+      10'd301: key = 64'hB3F256D8ACA0B0B9;
+      10'd302: key = 64'hB03031A8B4516E84;
+      10'd303: key = 64'h35DD37D5871448AF;
+      10'd304: key = 64'hE9F6082B05542E4E;
+      10'd305: key = 64'hEBFAFA33D7254B59;
+      10'd306: key = 64'h9255ABB50D532280;
+      10'd307: key = 64'hB9AB4CE57F2D34F3;
+      10'd308: key = 64'h693501D628297551;
+      10'd309: key = 64'hC62C58F97DD949BF;
+      10'd310: key = 64'hCD454F8F19C5126A;
+      10'd311: key = 64'hBBE83F4ECC2BDECB;
+      10'd312: key = 64'hDC842B7E2819E230;
+      10'd313: key = 64'hBA89142E007503B8;
+      10'd314: key = 64'hA3BC941D0A5061CB;
+      10'd315: key = 64'hE9F6760E32CD8021;
+      10'd316: key = 64'h09C7E552BC76492F;
+      10'd317: key = 64'h852F54934DA55CC9;
+      10'd318: key = 64'h8107FCCF064FCF56;
+      10'd319: key = 64'h098954D51FFF6580;
+      // white bishop, a1 to h8
+      10'd320: key = 64'h23B70EDB1955C4BF;
+      10'd321: key = 64'hC330DE426430F69D;
+      10'd322: key = 64'h4715ED43E8A45C0A;
+      10'd323: key = 64'hA8D7E4DAB780A08D;
+      10'd324: key = 64'h0572B974F03CE0BB;
+      10'd325: key = 64'hB57D2E985E1419C7;
+      10'd326: key = 64'hE8D9ECBE2CF3D73F;
+      10'd327: key = 64'h2FE4B17170E59750;
+      10'd328: key = 64'h11317BA87905E790;
+      10'd329: key = 64'h7FBF21EC8A1F45EC;
+      10'd330: key = 64'h1725CABFCB045B00;
+      10'd331: key = 64'h964E915CD5E2B207;
+      10'd332: key = 64'h3E2B8BCBF016D66D;
+      10'd333: key = 64'hBE7444E39328A0AC;
+      10'd334: key = 64'hF85B2B4FBCDE44B7;
+      10'd335: key = 64'h49353FEA39BA63B1;
+      10'd336: key = 64'h1DD01AAFCD53486A;
+      10'd337: key = 64'h1FCA8A92FD719F85;
+      10'd338: key = 64'hFC7C95D827357AFA;
+      10'd339: key = 64'h18A6A990C8B35EBD;
+      10'd340: key = 64'hCCCB7005C6B9C28D;
+      10'd341: key = 64'h3BDBB92C43B17F26;
+      10'd342: key = 64'hAA70B5B4F89695A2;
+      10'd343: key = 64'hE94C39A54A98307F;
+      10'd344: key = 64'hB7A0B174CFF6F36E;
+      10'd345: key = 64'hD4DBA84729AF48AD;
+      10'd346: key = 64'h2E18BC1AD9704A68;
+      10'd347: key = 64'h2DE0966DAF2F8B1C;
+      10'd348: key = 64'hB9C11D5B1E43A07E;
+      10'd349: key = 64'h64972D68DEE33360;
+      10'd350: key = 64'h94628D38D0C20584;
+      10'd351: key = 64'hDBC0D2B6AB90A559;
+      10'd352: key = 64'hD2733C4335C6A72F;
+      10'd353: key = 64'h7E75D99D94A70F4D;
+      10'd354: key = 64'h6CED1983376FA72B;
+      10'd355: key = 64'h97FCAACBF030BC24;
+      10'd356: key = 64'h7B77497B32503B12;
+      10'd357: key = 64'h8547EDDFB81CCB94;
+      10'd358: key = 64'h79999CDFF70902CB;
+      10'd359: key = 64'hCFFE1939438E9B24;
+      10'd360: key = 64'h829626E3892D95D7;
+      10'd361: key = 64'h92FAE24291F2B3F1;
+      10'd362: key = 64'h63E22C147B9C3403;
+      10'd363: key = 64'hC678B6D860284A1C;
+      10'd364: key = 64'h5873888850659AE7;
+      10'd365: key = 64'h0981DCD296A8736D;
+      10'd366: key = 64'h9F65789A6509A440;
+      10'd367: key = 64'h9FF38FED72E9052F;
+      10'd368: key = 64'hE479EE5B9930578C;
+      10'd369: key = 64'hE7F28ECD2D49EECD;
+      10'd370: key = 64'h56C074A581EA17FE;
+      10'd371: key = 64'h5544F7D774B14AEF;
+      10'd372: key = 64'h7B3F0195FC6F290F;
+      10'd373: key = 64'h12153635B2C0CF57;
+      10'd374: key = 64'h7F5126DBBA5E0CA7;
+      10'd375: key = 64'h7A76956C3EAFB413;
+      10'd376: key = 64'h3D5774A11D31AB39;
+      10'd377: key = 64'h8A1B083821F40CB4;
+      10'd378: key = 64'h7B4A38E32537DF62;
+      10'd379: key = 64'h950113646D1D6E03;
+      10'd380: key = 64'h4DA8979A0041E8A9;
+      10'd381: key = 64'h3BC36E078F7515D7;
+      10'd382: key = 64'h5D0A12F27AD310D1;
+      10'd383: key = 64'h7F9D1A2E1EBE1327;
+      // black rook, a1 to h8
+      10'd384: key = 64'hDA3A361B1C5157B1;
+      10'd385: key = 64'hDCDD7D20903D0C25;
+      10'd386: key = 64'h36833336D068F707;
+      10'd387: key = 64'hCE68341F79893389;
+      10'd388: key = 64'hAB9090168DD05F34;
+      10'd389: key = 64'h43954B3252DC25E5;
+      10'd390: key = 64'hB438C2B67F98E5E9;
+      10'd391: key = 64'h10DCD78E3851A492;
+      10'd392: key = 64'hDBC27AB5447822BF;
+      10'd393: key = 64'h9B3CDB65F82CA382;
+      10'd394: key = 64'hB67B7896167B4C84;
+      10'd395: key = 64'hBFCED1B0048EAC50;
+      10'd396: key = 64'hA9119B60369FFEBD;
+      10'd397: key = 64'h1FFF7AC80904BF45;
+      10'd398: key = 64'hAC12FB171817EEE7;
+      10'd399: key = 64'hAF08DA9177DDA93D;
+      10'd400: key = 64'h1B0CAB936E65C744;
+      10'd401: key = 64'hB559EB1D04E5E932;
+      10'd402: key = 64'hC37B45B3F8D6F2BA;
+      10'd403: key = 64'hC3A9DC228CAAC9E9;
+      10'd404: key = 64'hF3B8B6675A6507FF;
+      10'd405: key = 64'h9FC477DE4ED681DA;
+      10'd406: key = 64'h67378D8ECCEF96CB;
+      10'd407: key = 64'h6DD856D94D259236;
+      10'd408: key = 64'hA319CE15B0B4DB31;
+      10'd409: key = 64'h073973751F12DD5E;
+      10'd410: key = 64'h8A8E849EB32781A5;
+      10'd411: key = 64'hE1925C71285279F5;
+      10'd412: key = 64'h74C04BF1790C0EFE;
+      10'd413: key = 64'h4DDA48153C94938A;
+      10'd414: key = 64'h9D266D6A1CC0542C;
+      10'd415: key = 64'h7440FB816508C4FE;
+      10'd416: key = 64'h13328503DF48229F;
+      10'd417: key = 64'hD6BF7BAEE43CAC40;
+      10'd418: key = 64'h4838D65F6EF6748F;
+      10'd419: key = 64'h1E152328F3318DEA;
+      10'd420: key = 64'h8F8419A348F296BF;
+      10'd421: key = 64'h72C8834A5957B511;
+      10'd422: key = 64'hD7A023A73260B45C;
+      10'd423: key = 64'h94EBC8ABCFB56DAE;
+      10'd424: key = 64'h9FC10D0F989993E0;
+      10'd425: key = 64'hDE68A2355B93CAE6;
+      10'd426: key = 64'hA44CFE79AE538BBE;
+      10'd427: key = 64'h9D1D84FCCE371425;
+      10'd428: key = 64'h51D2B1AB2DDFB636;
+      10'd429: key = 64'h2FD7E4B9E72CD38C;
+      10'd430: key = 64'h65CA5B96B7552210;
+      10'd431: key = 64'hDD69A0D8AB3B546D;
+      10'd432: key = 64'h604D51B25FBF70E2;
+      10'd433: key = 64'h73AA8A564FB7AC9E;
+      10'd434: key = 64'h1A8C1E992B941148;
+      10'd435: key = 64'hAAC40A2703D9BEA0;
+      10'd436: key = 64'h764DBEAE7FA4F3A6;
+      10'd437: key = 64'h1E99B96E70A9BE8B;
+      10'd438: key = 64'h2C5E9DEB57EF4743;
+      10'd439: key = 64'h3A938FEE32D29981;
+      10'd440: key = 64'h26E6DB8FFDF5ADFE;
+      10'd441: key = 64'h469356C504EC9F9D;
+      10'd442: key = 64'hC8763C5B08D1908C;
+      10'd443: key = 64'h3F6C6AF859D80055;
+      10'd444: key = 64'h7F7CC39420A3A545;
+      10'd445: key = 64'h9BFB227EBDF4C5CE;
+      10'd446: key = 64'h89039D79D6FC5C5C;
+      10'd447: key = 64'h8FE88B57305E2AB6;
+      // white rook, a1 to h8
+      10'd448: key = 64'hA09E8C8C35AB96DE;
+      10'd449: key = 64'hFA7E393983325753;
+      10'd450: key = 64'hD6B6D0ECC617C699;
+      10'd451: key = 64'hDFEA21EA9E7557E3;
+      10'd452: key = 64'hB67C1FA481680AF8;
+      10'd453: key = 64'hCA1E3785A9E724E5;
+      10'd454: key = 64'h1CFC8BED0D681639;
+      10'd455: key = 64'hD18D8549D140CAEA;
+      10'd456: key = 64'h4ED0FE7E9DC91335;
+      10'd457: key = 64'hE4DBF0634473F5D2;
+      10'd458: key = 64'h1761F93A44D5AEFE;
+      10'd459: key = 64'h53898E4C3910DA55;
+      10'd460: key = 64'h734DE8181F6EC39A;
+      10'd461: key = 64'h2680B122BAA28D97;
+      10'd462: key = 64'h298AF231C85BAFAB;
+      10'd463: key = 64'h7983EED3740847D5;
+      10'd464: key = 64'h66C1A2A1A60CD889;
+      10'd465: key = 64'h9E17E49642A3E4C1;
+      10'd466: key = 64'hEDB454E7BADC0805;
+      10'd467: key = 64'h50B704CAB602C329;
+      10'd468: key = 64'h4CC317FB9CDDD023;
+      10'd469: key = 64'h66B4835D9EAFEA22;
+      10'd470: key = 64'h219B97E26FFC81BD;
+      10'd471: key = 64'h261E4E4C0A333A9D;
+      10'd472: key = 64'h1FE2CCA76517DB90;
+      10'd473: key = 64'hD7504DFA8816EDBB;
+      10'd474: key = 64'hB9571FA04DC089C8;
+      10'd475: key = 64'h1DDC0325259B27DE;
+      10'd476: key = 64'hCF3F4688801EB9AA;
+      10'd477: key = 64'hF4F5D05C10CAB243;
+      10'd478: key = 64'h38B6525C21A42B0E;
+      10'd479: key = 64'h36F60E2BA4FA6800;
+      10'd480: key = 64'hEB3593803173E0CE;
+      10'd481: key = 64'h9C4CD6257C5A3603;
+      10'd482: key = 64'hAF0C317D32ADAA8A;
+      10'd483: key = 64'h258E5A80C7204C4B;
+      10'd484: key = 64'h8B889D624D44885D;
+      10'd485: key = 64'hF4D14597E660F855;
+      10'd486: key = 64'hD4347F66EC8941C3;
+      10'd487: key = 64'hE699ED85B0DFB40D;
+      10'd488: key = 64'h2472F6207C2D0484;
+      10'd489: key = 64'hC2A1E7B5B459AEB5;
+      10'd490: key = 64'hAB4F6451CC1D45EC;
+      10'd491: key = 64'h63767572AE3D6174;
+      10'd492: key = 64'hA59E0BD101731A28;
+      10'd493: key = 64'h116D0016CB948F09;
+      10'd494: key = 64'h2CF9C8CA052F6E9F;
+      10'd495: key = 64'h0B090A7560A968E3;
+      10'd496: key = 64'hABEEDDB2DDE06FF1;
+      10'd497: key = 64'h58EFC10B06A2068D;
+      10'd498: key = 64'hC6E57A78FBD986E0;
+      10'd499: key = 64'h2EAB8CA63CE802D7;
+      10'd500: key = 64'h14A195640116F336;
+      10'd501: key = 64'h7C0828DD624EC390;
+      10'd502: key = 64'hD74BBE77E6116AC7;
+      10'd503: key = 64'h804456AF10F5FB53;
+      10'd504: key = 64'hEBE9EA2ADF4321C7;
+      10'd505: key = 64'h03219A39EE587A30;
+      10'd506: key = 64'h49787FEF17AF9924;
+      10'd507: key = 64'hA1E9300CD8520548;
+      10'd508: key = 64'h5B45E522E4B1B4EF;
+      10'd509: key = 64'hB49C3B3995091A36;
+      10'd510: key = 64'hD4490AD526F14431;
+      10'd511: key = 64'h12A8F216AF9418C2;
+      // black queen, a1 to h8
+      10'd512: key = 64'h001F837CC7350524;
+      10'd513: key = 64'h1877B51E57A764D5;
+      10'd514: key = 64'hA2853B80F17F58EE;
+      10'd515: key = 64'h993E1DE72D36D310;
+      10'd516: key = 64'hB3598080CE64A656;
+      10'd517: key = 64'h252F59CF0D9F04BB;
+      10'd518: key = 64'hD23C8E176D113600;
+      10'd519: key = 64'h1BDA0492E7E4586E;
+      10'd520: key = 64'h21E0BD5026C619BF;
+      10'd521: key = 64'h3B097ADAF088F94E;
+      10'd522: key = 64'h8D14DEDB30BE846E;
+      10'd523: key = 64'hF95CFFA23AF5F6F4;
+      10'd524: key = 64'h3871700761B3F743;
+      10'd525: key = 64'hCA672B91E9E4FA16;
+      10'd526: key = 64'h64C8E531BFF53B55;
+      10'd527: key = 64'h241260ED4AD1E87D;
+      10'd528: key = 64'h106C09B972D2E822;
+      10'd529: key = 64'h7FBA195410E5CA30;
+      10'd530: key = 64'h7884D9BC6CB569D8;
+      10'd531: key = 64'h0647DFEDCD894A29;
+      10'd532: key = 64'h63573FF03E224774;
+      10'd533: key = 64'h4FC8E9560F91B123;
+      10'd534: key = 64'h1DB956E450275779;
+      10'd535: key = 64'hB8D91274B9E9D4FB;
+      10'd536: key = 64'hA2EBEE47E2FBFCE1;
+      10'd537: key = 64'hD9F1F30CCD97FB09;
+      10'd538: key = 64'hEFED53D75FD64E6B;
+      10'd539: key = 64'h2E6D02C36017F67F;
+      10'd540: key = 64'hA9AA4D20DB084E9B;
+      10'd541: key = 64'hB64BE8D8B25396C1;
+      10'd542: key = 64'h70CB6AF7C2D5BCF0;
+      10'd543: key = 64'h98F076A4F7A2322E;
+      10'd544: key = 64'hBF84470805E69B5F;
+      10'd545: key = 64'h94C3251F06F90CF3;
+      10'd546: key = 64'h3E003E616A6591E9;
+      10'd547: key = 64'hB925A6CD0421AFF3;
+      10'd548: key = 64'h61BDD1307C66E300;
+      10'd549: key = 64'hBF8D5108E27E0D48;
+      10'd550: key = 64'h240AB57A8B888B20;
+      10'd551: key = 64'hFC87614BAF287E07;
+      10'd552: key = 64'hEF02CDD06FFDB432;
+      10'd553: key = 64'hA1082C0466DF6C0A;
+      10'd554: key = 64'h8215E577001332C8;
+      10'd555: key = 64'hD39BB9C3A48DB6CF;
+      10'd556: key = 64'h2738259634305C14;
+      10'd557: key = 64'h61CF4F94C97DF93D;
+      10'd558: key = 64'h1B6BACA2AE4E125B;
+      10'd559: key = 64'h758F450C88572E0B;
+      10'd560: key = 64'h959F587D507A8359;
+      10'd561: key = 64'hB063E962E045F54D;
+      10'd562: key = 64'h60E8ED72C0DFF5D1;
+      10'd563: key = 64'h7B64978555326F9F;
+      10'd564: key = 64'hFD080D236DA814BA;
+      10'd565: key = 64'h8C90FD9B083F4558;
+      10'd566: key = 64'h106F72FE81E2C590;
+      10'd567: key = 64'h7976033A39F7D952;
+      10'd568: key = 64'hA4EC0132764CA04B;
+      10'd569: key = 64'h733EA705FAE4FA77;
+      10'd570: key = 64'hB4D8F77BC3E56167;
+      10'd571: key = 64'h9E21F4F903B33FD9;
+      10'd572: key = 64'h9D765E419FB69F6D;
+      10'd573: key = 64'hD30C088BA61EA5EF;
+      10'd574: key = 64'h5D94337FBFAF7F5B;
+      10'd575: key = 64'h1A4E4822EB4D7A59;
+      // white queen, a1 to h8
+      10'd576: key = 64'h6FFE73E81B637FB3;
+      10'd577: key = 64'hDDF957BC36D8B9CA;
+      10'd578: key = 64'h64D0E29EEA8838B3;
+      10'd579: key = 64'h08DD9BDFD96B9F63;
+      10'd580: key = 64'h087E79E5A57D1D13;
+      10'd581: key = 64'hE328E230E3E2B3FB;
+      10'd582: key = 64'h1C2559E30F0946BE;
+      10'd583: key = 64'h720BF5F26F4D2EAA;
+      10'd584: key = 64'hB0774D261CC609DB;
+      10'd585: key = 64'h443F64EC5A371195;
+      10'd586: key = 64'h4112CF68649A260E;
+      10'd587: key = 64'hD813F2FAB7F5C5CA;
+      10'd588: key = 64'h660D3257380841EE;
+      10'd589: key = 64'h59AC2C7873F910A3;
+      10'd590: key = 64'hE846963877671A17;
+      10'd591: key = 64'h93B633ABFA3469F8;
+      10'd592: key = 64'hC0C0F5A60EF4CDCF;
+      10'd593: key = 64'hCAF21ECD4377B28C;
+      10'd594: key = 64'h57277707199B8175;
+      10'd595: key = 64'h506C11B9D90E8B1D;
+      10'd596: key = 64'hD83CC2687A19255F;
+      10'd597: key = 64'h4A29C6465A314CD1;
+      10'd598: key = 64'hED2DF21216235097;
+      10'd599: key = 64'hB5635C95FF7296E2;
+      10'd600: key = 64'h22AF003AB672E811;
+      10'd601: key = 64'h52E762596BF68235;
+      10'd602: key = 64'h9AEBA33AC6ECC6B0;
+      10'd603: key = 64'h944F6DE09134DFB6;
+      10'd604: key = 64'h6C47BEC883A7DE39;
+      10'd605: key = 64'h6AD047C430A12104;
+      10'd606: key = 64'hA5B1CFDBA0AB4067;
+      10'd607: key = 64'h7C45D833AFF07862;
+      10'd608: key = 64'h5092EF950A16DA0B;
+      10'd609: key = 64'h9338E69C052B8E7B;
+      10'd610: key = 64'h455A4B4CFE30E3F5;
+      10'd611: key = 64'h6B02E63195AD0CF8;
+      10'd612: key = 64'h6B17B224BAD6BF27;
+      10'd613: key = 64'hD1E0CCD25BB9C169;
+      10'd614: key = 64'hDE0C89A556B9AE70;
+      10'd615: key = 64'h50065E535A213CF6;
+      10'd616: key = 64'h9C1169FA2777B874;
+      10'd617: key = 64'h78EDEFD694AF1EED;
+      10'd618: key = 64'h6DC93D9526A50E68;
+      10'd619: key = 64'hEE97F453F06791ED;
+      10'd620: key = 64'h32AB0EDB696703D3;
+      10'd621: key = 64'h3A6853C7E70757A7;
+      10'd622: key = 64'h31865CED6120F37D;
+      10'd623: key = 64'h67FEF95D92607890;
+      10'd624: key = 64'h1F2B1D1F15F6DC9C;
+      10'd625: key = 64'hB69E38A8965C6B65;
+      10'd626: key = 64'hAA9119FF184CCCF4;
+      10'd627: key = 64'hF43C732873F24C13;
+      10'd628: key = 64'hFB4A3D794A9A80D2;
+      10'd629: key = 64'h3550C2321FD6109C;
+      10'd630: key = 64'h371F77E76BB8417E;
+      10'd631: key = 64'h6BFA9AAE5EC05779;
+      10'd632: key = 64'hCD04F3FF001A4778;
+      10'd633: key = 64'hE3273522064480CA;
+      10'd634: key = 64'h9F91508BFFCFC14A;
+      10'd635: key = 64'h049A7F41061A9E60;
+      10'd636: key = 64'hFCB6BE43A9F2FE9B;
+      10'd637: key = 64'h08DE8A1C7797DA9B;
+      10'd638: key = 64'h8F9887E6078735A1;
+      10'd639: key = 64'hB5B4071DBFC73A66;
+      // black king, a1 to h8
+      10'd640: key = 64'h230E343DFBA08D33;
+      10'd641: key = 64'h43ED7F5A0FAE657D;
+      10'd642: key = 64'h3A88A0FBBCB05C63;
+      10'd643: key = 64'h21874B8B4D2DBC4F;
+      10'd644: key = 64'h1BDEA12E35F6A8C9;
+      10'd645: key = 64'h53C065C6C8E63528;
+      10'd646: key = 64'hE34A1D250E7A8D6B;
+      10'd647: key = 64'hD6B04D3B7651DD7E;
+      10'd648: key = 64'h5E90277E7CB39E2D;
+      10'd649: key = 64'h2C046F22062DC67D;
+      10'd650: key = 64'hB10BB459132D0A26;
+      10'd651: key = 64'h3FA9DDFB67E2F199;
+      10'd652: key = 64'h0E09B88E1914F7AF;
+      10'd653: key = 64'h10E8B35AF3EEAB37;
+      10'd654: key = 64'h9EEDECA8E272B933;
+      10'd655: key = 64'hD4C718BC4AE8AE5F;
+      10'd656: key = 64'h81536D601170FC20;
+      10'd657: key = 64'h91B534F885818A06;
+      10'd658: key = 64'hEC8177F83F900978;
+      10'd659: key = 64'h190E714FADA5156E;
+      10'd660: key = 64'hB592BF39B0364963;
+      10'd661: key = 64'h89C350C893AE7DC1;
+      10'd662: key = 64'hAC042E70F8B383F2;
+      10'd663: key = 64'hB49B52E587A1EE60;
+      10'd664: key = 64'hFB152FE3FF26DA89;
+      10'd665: key = 64'h3E666E6F69AE2C15;
+      10'd666: key = 64'h3B544EBE544C19F9;
+      10'd667: key = 64'hE805A1E290CF2456;
+      10'd668: key = 64'h24B33C9D7ED25117;
+      10'd669: key = 64'hE74733427B72F0C1;
+      10'd670: key = 64'h0A804D18B7097475;
+      10'd671: key = 64'h57E3306D881EDB4F;
+      10'd672: key = 64'h4AE7D6A36EB5DBCB;
+      10'd673: key = 64'h2D8D5432157064C8;
+      10'd674: key = 64'hD1E649DE1E7F268B;
+      10'd675: key = 64'h8A328A1CEDFE552C;
+      10'd676: key = 64'h07A3AEC79624C7DA;
+      10'd677: key = 64'h84547DDC3E203C94;
+      10'd678: key = 64'h990A98FD5071D263;
+      10'd679: key = 64'h1A4FF12616EEFC89;
+      10'd680: key = 64'hF6F7FD1431714200;
+      10'd681: key = 64'h30C05B1BA332F41C;
+      10'd682: key = 64'h8D2636B81555A786;
+      10'd683: key = 64'h46C9FEB55D120902;
+      10'd684: key = 64'hCCEC0A73B49C9921;
+      10'd685: key = 64'h4E9D2827355FC492;
+      10'd686: key = 64'h19EBB029435DCB0F;
+      10'd687: key = 64'h4659D2B743848A2C;
+      10'd688: key = 64'h963EF2C96B33BE31;
+      10'd689: key = 64'h74F85198B05A2E7D;
+      10'd690: key = 64'h5A0F544DD2B1FB18;
+      10'd691: key = 64'h03727073C2E134B1;
+      10'd692: key = 64'hC7F6AA2DE59AEA61;
+      10'd693: key = 64'h352787BAA0D7C22F;
+      10'd694: key = 64'h9853EAB63B5E0B35;
+      10'd695: key = 64'hABBDCDD7ED5C0860;
+      10'd696: key = 64'hCF05DAF5AC8D77B0;
+      10'd697: key = 64'h49CAD48CEBF4A71E;
+      10'd698: key = 64'h7A4C10EC2158C4A6;
+      10'd699: key = 64'hD9E92AA246BF719E;
+      10'd700: key = 64'h13AE978D09FE5557;
+      10'd701: key = 64'h730499AF921549FF;
+      10'd702: key = 64'h4E4B705B92903BA4;
+      10'd703: key = 64'hFF577222C14F0A3A;
+      // white king, a1 to h8
+      10'd704: key = 64'h55B6344CF97AAFAE;
+      10'd705: key = 64'hB862225B055B6960;
+      10'd706: key = 64'hCAC09AFBDDD2CDB4;
+      10'd707: key = 64'hDAF8E9829FE96B5F;
+      10'd708: key = 64'hB5FDFC5D3132C498;
+      10'd709: key = 64'h310CB380DB6F7503;
+      10'd710: key = 64'hE87FBB46217A360E;
+      10'd711: key = 64'h2102AE466EBB1148;
+      10'd712: key = 64'hF8549E1A3AA5E00D;
+      10'd713: key = 64'h07A69AFDCC42261A;
+      10'd714: key = 64'hC4C118BFE78FEAAE;
+      10'd715: key = 64'hF9F4892ED96BD438;
+      10'd716: key = 64'h1AF3DBE25D8F45DA;
+      10'd717: key = 64'hF5B4B0B0D2DEEEB4;
+      10'd718: key = 64'h962ACEEFA82E1C84;
+      10'd719: key = 64'h046E3ECAAF453CE9;
+      10'd720: key = 64'hF05D129681949A4C;
+      10'd721: key = 64'h964781CE734B3C84;
+      10'd722: key = 64'h9C2ED44081CE5FBD;
+      10'd723: key = 64'h522E23F3925E319E;
+      10'd724: key = 64'h177E00F9FC32F791;
+      10'd725: key = 64'h2BC60A63A6F3B3F2;
+      10'd726: key = 64'h222BBFAE61725606;
+      10'd727: key = 64'h486289DDCC3D6780;
+      10'd728: key = 64'h7DC7785B8EFDFC80;
+      10'd729: key = 64'h8AF38731C02BA980;
+      10'd730: key = 64'h1FAB64EA29A2DDF7;
+      10'd731: key = 64'hE4D9429322CD065A;
+      10'd732: key = 64'h9DA058C67844F20C;
+      10'd733: key = 64'h24C0E332B70019B0;
+      10'd734: key = 64'h233003B5A6CFE6AD;
+      10'd735: key = 64'hD586BD01C5C217F6;
+      10'd736: key = 64'h5E5637885F29BC2B;
+      10'd737: key = 64'h7EBA726D8C94094B;
+      10'd738: key = 64'h0A56A5F0BFE39272;
+      10'd739: key = 64'hD79476A84EE20D06;
+      10'd740: key = 64'h9E4C1269BAA4BF37;
+      10'd741: key = 64'h17EFEE45B0DEE640;
+      10'd742: key = 64'h1D95B0A5FCF90BC6;
+      10'd743: key = 64'h93CBE0B699C2585D;
+      10'd744: key = 64'h65FA4F227A2B6D79;
+      10'd745: key = 64'hD5F9E858292504D5;
+      10'd746: key = 64'hC2B5A03F71471A6F;
+      10'd747: key = 64'h59300222B4561E00;
+      10'd748: key = 64'hCE2F8642CA0712DC;
+      10'd749: key = 64'h7CA9723FBB2E8988;
+      10'd750: key = 64'h2785338347F2BA08;
+      10'd751: key = 64'hC61BB3A141E50E8C;
+      10'd752: key = 64'h150F361DAB9DEC26;
+      10'd753: key = 64'h9F6A419D382595F4;
+      10'd754: key = 64'h64A53DC924FE7AC9;
+      10'd755: key = 64'h142DE49FFF7A7C3D;
+      10'd756: key = 64'h0C335248857FA9E7;
+      10'd757: key = 64'h0A9C32D5EAE45305;
+      10'd758: key = 64'hE6C42178C4BBB92E;
+      10'd759: key = 64'h71F1CE2490D20B07;
+      10'd760: key = 64'hF1BCC3D275AFE51A;
+      10'd761: key = 64'hE728E8C83C334074;
+      10'd762: key = 64'h96FBF83A12884624;
+      10'd763: key = 64'h81A1549FD6573DA5;
+      10'd764: key = 64'h5FA7867CAF35E149;
+      10'd765: key = 64'h56986E2EF3ED091B;
+      10'd766: key = 64'h917F1DD5F8886C61;
+      10'd767: key = 64'hD20D8C88C8FFE65F;
+      // castling rights K, Q, k, q
+      10'd768: key = 64'h31D71DCE64B2C310;
+      10'd769: key = 64'hF165B587DF898190;
+      10'd770: key = 64'hA57E6339DD2CF3A0;
+      10'd771: key = 64'h1EF6E6DBB1961EC9;
+      // en passant file a to h
+      10'd772: key = 64'h70CC73D90BC26E24;
+      10'd773: key = 64'hE21A6B35DF0C3AD7;
+      10'd774: key = 64'h003A93D8B2806962;
+      10'd775: key = 64'h1C99DED33CB890A1;
+      10'd776: key = 64'hCF3145DE0ADD4289;
+      10'd777: key = 64'hD0E4427A5514FB72;
+      10'd778: key = 64'h77C621CC9FB3A483;
+      10'd779: key = 64'h67A34DAC4356550B;
+      // white to play
+      10'd780: key = 64'hF8D626AAAF278509;
+      default: key = 64'h0;
+    endcase
+  end
+
+endmodule
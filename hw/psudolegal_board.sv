@@ -1,14 +1,55 @@
 
-module psudolegal_board(
+module psudolegal_board #(
+        // squares a slider ray crosses in a cycle: 8 ripples the whole board
+        // combinationally, 4, 2 or 1 register the rays every 4, 2 or 1 ranks
+        // (files for east and west) at a cost of 1, 3 or 7 cycles a piece
+        parameter SLIDE_SEGMENT = 8,
+        // moves output a cycle, 1 to 4, in lanes of o_uci_data and
+        // o_uci_delta, lane 0 in the low bits
+        parameter LANES = 1,
+        // log2 entries of the output FIFO, which gives o_uci_* ready/valid
+        // flow control through in_uci_ready. 0 leaves the FIFO out, and the
+        // moves come out as generated with in_uci_ready ignored. The FIFO
+        // needs at least 4 entries, OUT_FIFO_DEPTH_LOG2 of 2
+        parameter OUT_FIFO_DEPTH_LOG2 = 0,
+        // 1 adds a shadow board and piece stacks. Positions then load into
+        // the shadow while the board generates, and start swaps the shadow
+        // in, generating from the cycle after
+        parameter PING_PONG = 0
+  ) (
   input logic clk,
 
   input logic        in_pos_valid,
   input logic [3:0]  in_pos_data,
+  input logic        in_pos_sop,
   input logic        in_pos_eop,
+  // a one beat packet, in_pos_sop with in_pos_eop, is a command rather than
+  // a position. in_pos_data bit 0 reads the performance counters out on
+  // o_uci_data, bit 1 clears them, and a read is taken, as a position is,
+  // while o_pos_ready
+  // in_wtp, in_castle and in_ep are taken with in_pos_eop, after which the
+  // board keeps them, and make/unmake update them. With PING_PONG a
+  // position loads into the shadow board while o_shadow_ready, and is taken
+  // over by the next start. A start with none loaded generates the board's
+  // own again
   input logic        in_wtp,
   input logic [3:0]  in_castle,
   // 9 values: 0, and files 1-8. Max value is 4'b1000
   input logic [3:0]  in_ep,
+  // 0: pseudo-legal moves, 1: legal moves only. Held while generating
+  input logic        in_legal,
+  // 0: moves by piece in stack order, 1: captures first, most valuable
+  // victim then least valuable attacker, then promotions, then quiet
+  // moves. Held while generating
+  input logic        in_order,
+
+  // play a move on the loaded position in place of a 64 cycle reload.
+  // in_make_data is in the o_uci_data format, only promote, from and to
+  // are used. in_unmake takes back the last move made, at most 16 deep.
+  // Either may be strobed between move lists, and along with start.
+  input logic        in_make,
+  input logic [20:0] in_make_data,
+  input logic        in_unmake,
 
   // moves ouput in 21-bit UCI format: {promote, piece, from_rf, takes, to_rf}
   //  uci_move_promote 000  {0: no promotion, 4: queen, 5: bishop, 6: rook, 7: knight}
@@ -19,36 +60,321 @@ module psudolegal_board(
   //  uci_move_to_r    000  rank 0-7
   //  uci_move_to_f    000  file 0-7
   input logic       start,
-  output reg        o_uci_valid = 0,
-  output reg [20:0] o_uci_data = 0,
-  output reg        o_uci_sop = 0,
-  output reg        o_uci_eop = 0
+  output wire       o_uci_valid,
+  output wire [LANES*21-1:0] o_uci_data,
+  // lanes holding a move, filled from lane 0. A cycle only carries the
+  // moves of one piece, so its last may leave lanes empty
+  output wire [LANES-1:0] o_uci_keep,
+  output wire       o_uci_sop,
+  output wire       o_uci_eop,
+  // change in material and piece-square score for the side moving, with
+  // each o_uci_data move
+  output wire signed [LANES*16-1:0] o_uci_delta,
+  // with the output FIFO, a move or eop is taken in a cycle in_uci_ready is
+  // high, and held until then. Generation stalls while the FIFO is full
+  input logic       in_uci_ready,
+  // the board is not generating, so takes a new position, make or unmake.
+  // Low from start to the last move, which with the output FIFO may be
+  // some time before that move is taken from o_uci_data, and while a
+  // counter read goes out
+  output wire       o_pos_ready,
+  // with PING_PONG, the shadow board takes a position: high until one has
+  // loaded, then again from the cycle after the start that swaps it in.
+  // Without, the same as o_pos_ready
+  output wire       o_shadow_ready,
+  // side to play is in check, valid from the first move until the next start.
+  // With the output FIFO, the moves of one position may still be queued
+  // when the next start comes
+  output reg        o_in_check = 0,
+  // material and piece-square score for the side to play, valid as o_in_check
+  output reg signed [15:0] o_eval = 0,
+  // Zobrist hash of the position with the Polyglot keys, valid as o_in_check
+  output reg [63:0] o_hash = 0
   );
 
 
-  // pack and register uci_move output
-  wire [2:0] uci_move_promote;
+  // commands leave the board, piece stacks and position state alone
+  wire pos_cmd = in_pos_valid & in_pos_sop & in_pos_eop;
+  wire pos_load = in_pos_valid & !pos_cmd;
+  // with PING_PONG positions load into the shadow board, else the board
+  wire board_load = pos_load & (PING_PONG == 0);
+  wire shadow_load = pos_load & (PING_PONG != 0);
+  wire perf_read = pos_cmd & in_pos_data[0];
+  wire perf_clear = pos_cmd & in_pos_data[1];
+
+  // pack and register uci_move output, the piece moving, and per lane its
+  // destination, capture and promotion
   wire [2:0] uci_move_piece;
   wire [2:0] uci_move_from_r;
   wire [2:0] uci_move_from_f;
-  wire [2:0] uci_move_takes;
-  wire [2:0] uci_move_to_r;
-  wire [2:0] uci_move_to_f;
 
   // track the current rank/file from incoming serial form
   wire [5:0] in_pos_rf;
   movegen_rankfile movegen_rankfile (
     .clk(clk),
-    .in_pos_valid( in_pos_valid ),
+    .in_pos_valid( pos_load ),
     .in_pos_sop(in_pos_sop),
 //  .in_pos_data(in_pos_data),
     .out_rankfile(in_pos_rf)
   );
 
+  // position state, loaded with the position and updated by make/unmake
+  reg       pos_wtp = 0;
+  reg [3:0] pos_castle = 0;
+  reg [3:0] pos_ep = 0;
+
+  // the shadow position, with the score and hash folded in as it loads. It
+  // is swapped in the cycle after start, and setup begins then
+  reg            shadow_full = 0;
+  reg            shadow_wtp = 0;
+  reg [3:0]      shadow_castle = 0;
+  reg [3:0]      shadow_ep = 0;
+  reg [64*4-1:0] shadow_pos = 0;
+  reg            start_q = 0;
+  wire           swap = start_q & shadow_full;
+  wire           setup_start = PING_PONG != 0 ? start_q : start;
+
+  // serial pos interconnect
+  wire [(65*4)-1:0]pos_interconnect; // 64 squares plus unused final square output
+  assign pos_interconnect[3:0] = in_pos_data;
+  // square contents by {rank, ~file}, in the order of the serial chain
+  wire [64*4-1:0] board_pos = pos_interconnect[4 +: 64*4];
+
+  // make/unmake. A move changes at most four squares: from, to, and either
+  // the rook when castling or the pawn taken en passant. All four are
+  // written in the one cycle, and the piece stacks are edited to match: the
+  // mover's entries are rewritten where they stand, a captured piece is
+  // removed from the opponent's stack, which closes up behind it, and is
+  // pushed back onto it by unmake. Each make pushes an undo record of
+  // {ep, castle, captured piece, move} with the moving piece filled in.
+  localparam UNDO_DEPTH_LOG2 = 4;
+  reg [32:0] undo [0:(1<<UNDO_DEPTH_LOG2)-1];
+  reg [UNDO_DEPTH_LOG2-1:0] undo_ptr = 0;
+  wire [32:0] undo_top = undo[undo_ptr - 1'b1];
+
+  wire [20:0] mv = in_unmake ? undo_top[20:0] : in_make_data;
+  wire [2:0] mv_from_f = mv[14:12];
+  wire [2:0] mv_from_r = mv[11:9];
+  wire [2:0] mv_to_f = mv[5:3];
+  wire [2:0] mv_to_r = mv[2:0];
+  wire [5:0] mv_from = {mv_from_r, mv_from_f};
+  wire [5:0] mv_to = {mv_to_r, mv_to_f};
+  wire [3:0] from_pos = board_pos[{mv_from_r, ~mv_from_f, 2'b00} +: 4];
+  wire [3:0] to_pos = board_pos[{mv_to_r, ~mv_to_f, 2'b00} +: 4];
+
+  wire       mover = in_unmake ? !pos_wtp : pos_wtp;
+  wire [2:0] mv_piece = in_unmake ? undo_top[17:15] : from_pos[2:0];
+  wire [3:0] captured = in_unmake ? undo_top[24:21] : to_pos;
+  wire [3:0] ep_before = in_unmake ? undo_top[32:29] : pos_ep;
+  // promote codes 4-7 are queen, rook, knight, bishop
+  wire [2:0] promote_piece = mv[19] ? (mv[18] ? 3'h4 : 3'h5) : (mv[18] ? 3'h3 : 3'h2);
+  wire [2:0] new_piece = mv[20] ? promote_piece : mv_piece;
+
+  wire castling = mv_piece == 3'h1 && mv_from_f == 3'd4 && (mv_to_f == 3'd6 || mv_to_f == 3'd2);
+  wire [5:0] rook_from = {mv_from_r, mv_to_f[2] ? 3'd7 : 3'd0};
+  wire [5:0] rook_to = {mv_from_r, mv_to_f[2] ? 3'd5 : 3'd3};
+  wire ep_capture = mv_piece == 3'h6 && mv_from_f != mv_to_f &&
+                    ep_before == {1'b0, mv_to_f} + 4'd1 && mv_to_r == (mover ? 3'd5 : 3'd2);
+  wire [5:0] ep_square = {mv_from_r, mv_to_f};
+  wire takes = |captured[2:0] | ep_capture;
+
+  // the squares written, and what with
+  wire       editing = in_make | in_unmake;
+  wire [5:0] edit_sq [0:3];
+  wire [3:0] edit_data [0:3];
+  wire [3:0] edit_en = {editing & castling, editing & (castling | ep_capture), editing, editing};
+  assign edit_sq[0] = mv_from;
+  assign edit_data[0] = in_make ? 4'h0 : {mover, mv_piece};
+  assign edit_sq[1] = mv_to;
+  assign edit_data[1] = in_make ? {mover, new_piece} : (ep_capture ? 4'h0 : captured);
+  assign edit_sq[2] = castling ? rook_from : ep_square;
+  assign edit_data[2] = in_make ? 4'h0 : (castling ? {mover, 3'h3} : {!mover, 3'h6});
+  assign edit_sq[3] = rook_to;
+  assign edit_data[3] = in_make ? {mover, 3'h3} : 4'h0;
+
+  reg [63:0] set_sq;
+  reg [64*4-1:0] set_data_sq;
+  integer es, ew;
+  always_comb begin
+    set_sq = 0;
+    set_data_sq = 0;
+    for (es = 0; es < 64; es = es + 1)
+      for (ew = 0; ew < 4; ew = ew + 1)
+        if (edit_en[ew] && edit_sq[ew] == es[5:0]) begin
+          set_sq[es] = 1;
+          set_data_sq[es*4 +: 4] = set_data_sq[es*4 +: 4] | edit_data[ew];
+        end
+    if (swap) begin
+      set_sq = {64{1'b1}};
+      for (es = 0; es < 64; es = es + 1)
+        set_data_sq[es*4 +: 4] = shadow_pos[{es[5:3], ~es[2:0], 2'b00} +: 4];
+    end
+  end
+
+  // piece stack edits, entries are {occupied, piece, rank, file}. The
+  // mover's piece, and rook when castling, are moved to their new square
+  wire [5:0] piece_sq = in_make ? mv_from : mv_to;
+  wire [9:0] piece_entry = {1'b1, in_make ? new_piece : mv_piece, in_make ? mv_to : mv_from};
+  wire [5:0] rook_sq = in_make ? rook_from : rook_to;
+  wire [9:0] rook_entry = {1'b1, 3'h3, in_make ? rook_to : rook_from};
+  wire [5:0] taken_sq = ep_capture ? ep_square : mv_to;
+  wire [9:0] restore_entry = {1'b1, ep_capture ? 3'h6 : captured[2:0], taken_sq};
+  wire remove_taken = in_make & takes;
+  wire restore_taken = in_unmake & takes;
+
+  // castling rights {K, Q, k, q} given up by a move from or to a square
+  function automatic logic [3:0] castle_lost(input logic [5:0] rf);
+    castle_lost = {rf == 6'o07 || rf == 6'o04, rf == 6'o00 || rf == 6'o04,
+                   rf == 6'o77 || rf == 6'o74, rf == 6'o70 || rf == 6'o74};
+  endfunction
+
+  wire [3:0] castle_after = pos_castle & ~(castle_lost(mv_from) | castle_lost(mv_to));
+  wire double_push = mv_piece == 3'h6 && (mv_from_r == 3'd1 && mv_to_r == 3'd3 || mv_from_r == 3'd6 && mv_to_r == 3'd4);
+
+  // the score from white's side, summed over the squares as they load and
+  // moved on by the change each make or unmake makes
+  wire signed [15:0] load_score;
+  wire signed [15:0] mv_delta;
+  reg  signed [15:0] eval_white = 0;
+  reg  signed [15:0] shadow_eval = 0;
+  wire signed [15:0] load_eval = (in_pos_sop ? 16'sd0 : (PING_PONG != 0 ? shadow_eval : eval_white)) +
+                                 (in_pos_data[3] ? load_score : -load_score);
+  movegen_pst load_pst (
+    .white(in_pos_data[3]),
+    .piece(in_pos_data[2:0]),
+    .rankfile(in_pos_rf),
+    .score(load_score)
+  );
+  movegen_eval mv_eval (
+    .white(mover),
+    .piece(mv_piece),
+    .from_rf(mv_from),
+    .to_rf(mv_to),
+    .takes(ep_capture ? 3'h6 : captured[2:0]),
+    .promote(mv[20:18]),
+    .ep(ep_capture),
+    .delta(mv_delta)
+  );
+  wire signed [15:0] mv_delta_white = mover ? mv_delta : -mv_delta;
+
+  always_ff @(posedge clk) begin
+    if (board_load) begin
+      eval_white <= load_eval;
+    end else if (swap) begin
+      eval_white <= shadow_eval;
+    end else if (in_make) begin
+      eval_white <= eval_white + mv_delta_white;
+    end else if (in_unmake) begin
+      eval_white <= eval_white - mv_delta_white;
+    end
+    if (shadow_load) begin
+      shadow_eval <= load_eval;
+    end
+  end
+
+  // Zobrist hash of the pieces, folded in as the squares load. A make or
+  // unmake folds in the keys of the pieces it moves, takes or puts back:
+  // the mover at both ends, then the piece taken or the castling rook's two
+  // squares. The side to play, castling and ep keys are added at the end.
+  function automatic logic [9:0] zobrist_index(input logic white, input logic [2:0] piece, input logic [5:0] rf);
+    zobrist_index = {3'd6 - piece, white, rf};
+  endfunction
+
+  wire [9:0]  zobrist_index_sq [0:3];
+  wire [3:0]  zobrist_en;
+  wire [63:0] zobrist_sq_key [0:3];
+  assign zobrist_index_sq[0] = board_load ? zobrist_index(in_pos_data[3], in_pos_data[2:0], in_pos_rf)
+                                            : zobrist_index(mover, mv_piece, mv_from);
+  assign zobrist_index_sq[1] = zobrist_index(mover, new_piece, mv_to);
+  assign zobrist_index_sq[2] = castling ? zobrist_index(mover, 3'h3, rook_from)
+                                        : zobrist_index(!mover, ep_capture ? 3'h6 : captured[2:0], taken_sq);
+  assign zobrist_index_sq[3] = zobrist_index(mover, 3'h3, rook_to);
+  assign zobrist_en = {castling, castling | takes, 2'b11} & (board_load ? {3'b000, |in_pos_data[2:0]} : 4'hF);
+
+  reg [63:0] hash_pieces = 0;
+  wire [63:0] hash_edit = zobrist_sq_key[0] ^ zobrist_sq_key[1] ^ zobrist_sq_key[2] ^ zobrist_sq_key[3];
+  genvar zk;
+  generate
+    for (zk=0; zk<4; zk=zk+1)
+    begin: zobrist_sq
+      wire [63:0] key;
+      movegen_zobrist_key zobrist_key(.index(zobrist_index_sq[zk]), .key(key));
+      assign zobrist_sq_key[zk] = zobrist_en[zk] ? key : 64'd0;
+    end
+  endgenerate
+
+  // the shadow hash has its own key, so a make or unmake can go along with
+  // a shadow load
+  reg [63:0] shadow_hash = 0;
+  wire [63:0] shadow_sq_key;
+  generate
+    if (PING_PONG != 0)
+    begin: shadow_zobrist
+      wire [63:0] key;
+      movegen_zobrist_key zobrist_key(.index(zobrist_index(in_pos_data[3], in_pos_data[2:0], in_pos_rf)), .key(key));
+      assign shadow_sq_key = |in_pos_data[2:0] ? key : 64'd0;
+    end else begin: no_shadow_zobrist
+      assign shadow_sq_key = 64'd0;
+    end
+  endgenerate
+
+  always_ff @(posedge clk) begin
+    if (board_load) begin
+      hash_pieces <= (in_pos_sop ? 64'd0 : hash_pieces) ^ zobrist_sq_key[0];
+    end else if (swap) begin
+      hash_pieces <= shadow_hash;
+    end else if (editing) begin
+      hash_pieces <= hash_pieces ^ hash_edit;
+    end
+    if (shadow_load) begin
+      shadow_hash <= (in_pos_sop ? 64'd0 : shadow_hash) ^ shadow_sq_key;
+    end
+  end
+
+  always_ff @(posedge clk) begin
+    start_q <= start;
+    if (shadow_load) begin
+      shadow_pos <= {shadow_pos[0 +: 63*4], in_pos_data};
+    end
+    if (shadow_load && in_pos_eop) begin
+      shadow_full <= 1;
+      shadow_wtp <= in_wtp;
+      shadow_castle <= in_castle;
+      shadow_ep <= in_ep;
+    end else if (swap) begin
+      shadow_full <= 0;
+    end
+  end
+
+  always_ff @(posedge clk) begin
+    if (board_load && in_pos_eop) begin
+      pos_wtp <= in_wtp;
+      pos_castle <= in_castle;
+      pos_ep <= in_ep;
+      undo_ptr <= 0;
+    end else if (swap) begin
+      pos_wtp <= shadow_wtp;
+      pos_castle <= shadow_castle;
+      pos_ep <= shadow_ep;
+      undo_ptr <= 0;
+    end else if (in_make) begin
+      undo[undo_ptr] <= {pos_ep, pos_castle, captured, mv[20:18], mv_piece, mv[14:0]};
+      undo_ptr <= undo_ptr + 1'b1;
+      pos_wtp <= !pos_wtp;
+      pos_castle <= castle_after;
+      pos_ep <= double_push ? {1'b0, mv_from_f} + 4'd1 : 4'd0;
+    end else if (in_unmake) begin
+      undo_ptr <= undo_ptr - 1'b1;
+      pos_wtp <= !pos_wtp;
+      pos_castle <= undo_top[28:25];
+      pos_ep <= undo_top[32:29];
+    end
+  end
+
   // expand en passant square. we will ignore the bottom output bit
   wire [8:0] in_ep_onehot_z0;
   onehot_from_bin #(.WIDTH(9)) onehot_from_bin_ep(
-    .in(in_ep),
+    .in(pos_ep),
     .out(in_ep_onehot_z0)
   );
   wire [7:0] ep_file = in_ep_onehot_z0[8:1];
@@ -60,7 +386,7 @@ module psudolegal_board(
   // Each slot in the stack has a presence bit 'full' and a load path to the entry below.
   // When a push occurs, all populated slots shift downards.
   //
-  // Both piece stacks can parallel load (depending on in_wtp) into the move-stack,
+  // Both piece stacks can parallel load (depending on pos_wtp) into the move-stack,
   // which shifts the contents up one-by-one as moves are generated. Loading into
   // the move_stack does not affect the contents of the white/black stacks.
   //
@@ -86,46 +412,237 @@ module psudolegal_board(
   // when we support board make/unmake move
   wire load_pieces;
   wire next_piece;
-  wire in_pos_black = in_pos_valid && in_pos_data[3] == 1'b0 && |in_pos_data[2:0];
-  wire in_pos_white = in_pos_valid && in_pos_data[3] == 1'b1 && |in_pos_data[2:0];
+  wire next_pass;
+  wire square_done;
+  wire in_pos_black = board_load && in_pos_data[3] == 1'b0 && |in_pos_data[2:0];
+  wire in_pos_white = board_load && in_pos_data[3] == 1'b1 && |in_pos_data[2:0];
+  // unmake pushes a captured piece back the same way as the serial load
+  wire push_black = in_pos_black | (restore_taken & mover);
+  wire push_white = in_pos_white | (restore_taken & !mover);
+  wire [9:0] push_entry = board_load ? { 1'b1, in_pos_data[2:0], in_pos_rf} : restore_entry;
   wire [17*10-1:0] stack_interconnect_white;
   wire [17*10-1:0] stack_interconnect_black; // {occupied(1), pos_data(3), in_pos_rf(6)}
   wire [16*10-1:0] stack_interconnect_to_play;
   wire [16*10-1:0] stack_interconnect_to_play_o;
-  assign stack_interconnect_black[9:0] = { 1'b1, in_pos_data[2:0], in_pos_rf};
-  assign stack_interconnect_white[9:0] = { 1'b1, in_pos_data[2:0], in_pos_rf};
-  assign stack_interconnect_to_play = load_pieces ? (in_wtp ? stack_interconnect_white[10 +: 16*10] : stack_interconnect_black[10 +: 16*10]) : {10'b0, stack_interconnect_to_play_o[10 +: 15*10]};
+  assign stack_interconnect_black[9:0] = push_entry;
+  assign stack_interconnect_white[9:0] = push_entry;
+  // each entry's neighbour above, which it pulls in when a capture is removed
+  wire [16*10-1:0] stack_above_white = {10'b0, stack_interconnect_white[20 +: 15*10]};
+  wire [16*10-1:0] stack_above_black = {10'b0, stack_interconnect_black[20 +: 15*10]};
+
+  // the shadow stacks, pushed from the serial load as the board's are
+  // without PING_PONG, and copied into them by the swap
+  wire [16*10-1:0] shadow_white, shadow_black;
+  genvar sh;
+  generate
+    if (PING_PONG != 0)
+    begin: shadow_stack
+      wire shadow_push_black = shadow_load && in_pos_data[3] == 1'b0 && |in_pos_data[2:0];
+      wire shadow_push_white = shadow_load && in_pos_data[3] == 1'b1 && |in_pos_data[2:0];
+      wire [17*10-1:0] white, black;
+      assign white[9:0] = { 1'b1, in_pos_data[2:0], in_pos_rf};
+      assign black[9:0] = { 1'b1, in_pos_data[2:0], in_pos_rf};
+      for (sh=0; sh<16; sh=sh+1)
+      begin: item
+        movegen_piece_stack #(.POSITION(sh)) movegen_piece_white (
+          .clk(clk),
+          .clear(shadow_load & in_pos_sop & (sh > 0 || !shadow_push_white)),
+          .in_data(white[sh*10 +: 10]),
+          .out_data(white[(sh+1)*10 +: 10]),
+          .load(shadow_push_white & white[sh*10+9]),
+          .in_set_data(10'b0),
+          .set(1'b0),
+          .in_pull_data(10'b0),
+          .pull(1'b0)
+          );
+
+        movegen_piece_stack #(.POSITION(sh)) movegen_piece_black (
+          .clk(clk),
+          .clear(shadow_load & in_pos_sop & (sh > 0 || !shadow_push_black)),
+          .in_data(black[sh*10 +: 10]),
+          .out_data(black[(sh+1)*10 +: 10]),
+          .load(shadow_push_black & black[sh*10+9]),
+          .in_set_data(10'b0),
+          .set(1'b0),
+          .in_pull_data(10'b0),
+          .pull(1'b0)
+          );
+      end
+      assign shadow_white = white[10 +: 16*10];
+      assign shadow_black = black[10 +: 16*10];
+    end else begin: no_shadow_stack
+      assign shadow_white = 0;
+      assign shadow_black = 0;
+    end
+  endgenerate
+
+  // per entry edits. Squares are unique within a stack so at most one entry
+  // matches each edit, and every entry from a removed one up pulls down.
+  // The swap sets every entry from the shadow stacks
+  wire [15:0] set_white, set_black, taken_white, taken_black;
+  wire [16*10-1:0] set_entry_white, set_entry_black;
+  genvar se;
+  generate
+    for (se=0; se<16; se=se+1)
+    begin: stack_edit
+      wire [9:0] white = stack_interconnect_white[(se+1)*10 +: 10];
+      wire [9:0] black = stack_interconnect_black[(se+1)*10 +: 10];
+      wire white_rook = castling && white[9] && white[5:0] == rook_sq;
+      wire black_rook = castling && black[9] && black[5:0] == rook_sq;
+      assign set_white[se] = swap || editing && mover && white[9] && (white[5:0] == piece_sq || white_rook);
+      assign set_black[se] = swap || editing && !mover && black[9] && (black[5:0] == piece_sq || black_rook);
+      assign set_entry_white[se*10 +: 10] = swap ? shadow_white[se*10 +: 10] : white_rook ? rook_entry : piece_entry;
+      assign set_entry_black[se*10 +: 10] = swap ? shadow_black[se*10 +: 10] : black_rook ? rook_entry : piece_entry;
+      assign taken_white[se] = remove_taken && !mover && white[9] && white[5:0] == taken_sq;
+      assign taken_black[se] = remove_taken && mover && black[9] && black[5:0] == taken_sq;
+    end
+  endgenerate
+  wire [15:0] pull_white = ~(taken_white - 16'd1);
+  wire [15:0] pull_black = ~(taken_black - 16'd1);
+  wire [16*10-1:0] stack_to_play = pos_wtp ? stack_interconnect_white[10 +: 16*10] : stack_interconnect_black[10 +: 16*10];
+
+  // pieces with nowhere to go are left out of the move stack, so cost no
+  // cycles. A piece is blocked when every square next to it along the lines
+  // it moves on, or a knight's move away, is off the board or holds one of
+  // ours. A pawn is blocked when the square ahead is taken and it has
+  // nothing to capture, en passant included.
+  function automatic logic own_piece(input logic [64*4-1:0] pos, input logic wtp, input integer r, input integer f);
+    logic [3:0] p;
+    own_piece = 1;
+    if (r >= 0 && r < 8 && f >= 0 && f < 8) begin
+      p = pos[{r[2:0], ~f[2:0], 2'b00} +: 4];
+      own_piece = |p[2:0] && p[3] == wtp;
+    end
+  endfunction
+
+  function automatic logic opponent_piece(input logic [64*4-1:0] pos, input logic wtp, input integer r, input integer f);
+    logic [3:0] p;
+    opponent_piece = 0;
+    if (r >= 0 && r < 8 && f >= 0 && f < 8) begin
+      p = pos[{r[2:0], ~f[2:0], 2'b00} +: 4];
+      opponent_piece = |p[2:0] && p[3] != wtp;
+    end
+  endfunction
+
+  reg [63:0] blocked_sq;
+  reg [7:0]  king_ring;   // N, NE, E, SE, S, SW, W, NW
+  reg [7:0]  knight_ring;
+  reg [3:0]  blocked_pos;
+  integer bs, br, bf, bp;
+  always_comb begin
+    for (bs = 0; bs < 64; bs = bs + 1) begin
+      br = bs / 8;
+      bf = bs % 8;
+      bp = pos_wtp ? br + 1 : br - 1;
+      king_ring = {own_piece(board_pos, pos_wtp, br+1, bf),   own_piece(board_pos, pos_wtp, br+1, bf+1),
+                   own_piece(board_pos, pos_wtp, br,   bf+1), own_piece(board_pos, pos_wtp, br-1, bf+1),
+                   own_piece(board_pos, pos_wtp, br-1, bf),   own_piece(board_pos, pos_wtp, br-1, bf-1),
+                   own_piece(board_pos, pos_wtp, br,   bf-1), own_piece(board_pos, pos_wtp, br+1, bf-1)};
+      knight_ring = {own_piece(board_pos, pos_wtp, br+2, bf+1), own_piece(board_pos, pos_wtp, br+2, bf-1),
+                     own_piece(board_pos, pos_wtp, br-2, bf+1), own_piece(board_pos, pos_wtp, br-2, bf-1),
+                     own_piece(board_pos, pos_wtp, br+1, bf+2), own_piece(board_pos, pos_wtp, br-1, bf+2),
+                     own_piece(board_pos, pos_wtp, br+1, bf-2), own_piece(board_pos, pos_wtp, br-1, bf-2)};
+      blocked_pos = board_pos[{bs[5:3], ~bs[2:0], 2'b00} +: 4];
+      case (blocked_pos[2:0])
+        3'h1, 3'h2: blocked_sq[bs] = &king_ring;
+        3'h3:       blocked_sq[bs] = king_ring[7] & king_ring[5] & king_ring[3] & king_ring[1];
+        3'h4:       blocked_sq[bs] = king_ring[6] & king_ring[4] & king_ring[2] & king_ring[0];
+        3'h5:       blocked_sq[bs] = &knight_ring;
+        3'h6:       blocked_sq[bs] = !(|pos_ep) &&
+                                     (own_piece(board_pos, pos_wtp, bp, bf) || opponent_piece(board_pos, pos_wtp, bp, bf)) &&
+                                     !opponent_piece(board_pos, pos_wtp, bp, bf-1) && !opponent_piece(board_pos, pos_wtp, bp, bf+1);
+        default:    blocked_sq[bs] = 0;
+      endcase
+    end
+  end
+
+  // the move stack is loaded with the pieces that can move, closed up in
+  // stack order. For in_order they are sorted least valuable piece first,
+  // pawns to king, so each pass reaches a victim from its cheapest attacker.
+  // Each entry's slot is the count of entries sorting ahead of it.
+  reg [16*10-1:0] stack_sorted;
+  reg [15:0] stack_moving;
+  reg [15:0] stack_blocked;   // pieces left out, for the perf counters
+  reg [3:0] sort_key [0:15];
+  reg [4:0] sort_slot [0:15];
+  integer se_a, se_b;
+  always_comb begin
+    for (se_a = 0; se_a < 16; se_a = se_a + 1) begin
+      stack_moving[se_a] = stack_to_play[se_a*10+9] && !blocked_sq[stack_to_play[se_a*10 +: 6]];
+      stack_blocked[se_a] = stack_to_play[se_a*10+9] && !stack_moving[se_a];
+      sort_key[se_a] = {!stack_moving[se_a], in_order ? 3'd7 - stack_to_play[se_a*10+6 +: 3] : 3'd0};
+    end
+    stack_sorted = 0;
+    for (se_a = 0; se_a < 16; se_a = se_a + 1) begin
+      sort_slot[se_a] = 0;
+      for (se_b = 0; se_b < 16; se_b = se_b + 1)
+        if (sort_key[se_b] < sort_key[se_a] || (sort_key[se_b] == sort_key[se_a] && se_b < se_a))
+          sort_slot[se_a] = sort_slot[se_a] + 5'd1;
+    end
+    for (se_a = 0; se_a < 16; se_a = se_a + 1)
+      for (se_b = 0; se_b < 16; se_b = se_b + 1)
+        if (sort_slot[se_b] == se_a[4:0])
+          stack_sorted[se_a*10 +: 10] = {stack_moving[se_b], stack_to_play[se_b*10 +: 9]};
+  end
+
+  assign stack_interconnect_to_play = load_pieces ? stack_sorted : {10'b0, stack_interconnect_to_play_o[10 +: 15*10]};
 
   // small shift register to run through some setup before
-  // we can generate moves - latching which squares are under attack
+  // we can generate moves - latching which squares are under attack.
+  // With registered slider rays each step is held, and each piece's
+  // destinations are waited for, until the rays have crossed the board.
+  // a ray crosses 8 / SLIDE_SEGMENT segments, which only fit the board
+  // evenly, and so only settle in SLIDE_LATENCY cycles, for 1, 2, 4 or 8
+  localparam SLIDE_LATENCY = 8 / SLIDE_SEGMENT - 1;
+  generate
+    if (SLIDE_SEGMENT != 1 && SLIDE_SEGMENT != 2 && SLIDE_SEGMENT != 4 && SLIDE_SEGMENT != 8)
+    begin: slide_segment_check
+      $error("psudolegal_board: SLIDE_SEGMENT must be 1, 2, 4 or 8, not %0d", SLIDE_SEGMENT);
+    end
+  endgenerate
   reg load_attackers = 0;
   reg load_checkers = 0;
   reg start_moves = 0;
+  reg [2:0] ray_wait = 0;
+  wire rays_settled = ray_wait == 0;
   always @(posedge clk) begin
-    load_attackers <= start;
-    load_checkers <= load_attackers;
-    start_moves <= load_checkers;
+    load_attackers <= setup_start | (load_attackers & !rays_settled);
+    load_checkers <= (load_attackers & rays_settled) | (load_checkers & !rays_settled);
+    start_moves <= load_checkers & rays_settled;
+    if (setup_start || (load_attackers && rays_settled) || load_pieces || next_piece) begin
+      ray_wait <= SLIDE_LATENCY[2:0];
+    end else if (!rays_settled) begin
+      ray_wait <= ray_wait - 3'd1;
+    end
   end
 
-  assign load_pieces = start_moves;
+  assign load_pieces = start_moves | next_pass;
   genvar i;
   generate
     for (i=0; i<16; i=i+1)
     begin: item
       movegen_piece_stack #(.POSITION(i)) movegen_piece_white (
         .clk(clk),
-        .clear(in_pos_valid & in_pos_sop & (i > 0 || !in_pos_white)),
+        .clear(board_load & in_pos_sop & (i > 0 || !in_pos_white)),
         .in_data(stack_interconnect_white[i*10 +: 10]),
         .out_data(stack_interconnect_white[(i+1)*10 +: 10]),
-        .load(in_pos_white & stack_interconnect_white[i*10+9])
+        .load(push_white & stack_interconnect_white[i*10+9]),
+        .in_set_data(set_entry_white[i*10 +: 10]),
+        .set(set_white[i]),
+        .in_pull_data(stack_above_white[i*10 +: 10]),
+        .pull(pull_white[i])
         );
 
       movegen_piece_stack #(.POSITION(i)) movegen_piece_black (
         .clk(clk),
-        .clear(in_pos_valid & in_pos_sop && (i > 0 || !in_pos_black)),
+        .clear(board_load & in_pos_sop && (i > 0 || !in_pos_black)),
         .in_data(stack_interconnect_black[i*10 +: 10]),
         .out_data(stack_interconnect_black[(i+1)*10 +: 10]),
-        .load(in_pos_black & stack_interconnect_black[i*10+9])
+        .load(push_black & stack_interconnect_black[i*10+9]),
+        .in_set_data(set_entry_black[i*10 +: 10]),
+        .set(set_black[i]),
+        .in_pull_data(stack_above_black[i*10 +: 10]),
+        .pull(pull_black[i])
         );
 
       movegen_piece_stack #(.POSITION(i)) movegen_move_stack (
@@ -133,7 +650,11 @@ module psudolegal_board(
         .clear(1'b0),
         .in_data(stack_interconnect_to_play[i*10 +: 10]),
         .out_data(stack_interconnect_to_play_o[i*10 +: 10]),
-        .load(load_pieces | next_piece)
+        .load(load_pieces | next_piece),
+        .in_set_data(10'b0),
+        .set(1'b0),
+        .in_pull_data(10'b0),
+        .pull(1'b0)
       );
     end
   endgenerate
@@ -158,7 +679,8 @@ module psudolegal_board(
   // Empty squares emit incoming moves as a valid destination by setting their square_to bit.
   // Squares occupied by self (wtp) will block and not emit. opponent squares will emit.
   // slider signals will be blocked by occupied pieces otherwise passed
-  // combinatorially to the next square (worst case ripple 8).
+  // combinatorially to the next square (worst case ripple 8), or through a
+  // register every SLIDE_SEGMENT squares.
   //
   // square_from signals this occupied square to outputing its moves
   // any square with an incoming ray outputs its target_square signal.
@@ -182,9 +704,112 @@ module psudolegal_board(
     .out(square_from)
   );
 
-  // serial pos interconnect
-  wire [(65*4)-1:0]pos_interconnect; // 64 squares plus unused final square output
-  assign pos_interconnect[3:0] = in_pos_data;
+  // queenside castling also needs the b-file square empty, which the king's
+  // castle_w signal never reaches since it terminates at c1/c8. Mask out the
+  // queenside rights here rather than route the b-file back into c-file squares.
+  wire b1_occupied = |pos_interconnect[(0*8+(7-1)+1)*4 +: 3];
+  wire b8_occupied = |pos_interconnect[(7*8+(7-1)+1)*4 +: 3];
+  wire [3:0] castle_rights = pos_castle & ~{1'b0, b1_occupied, 1'b0, b8_occupied};
+
+  // legal move mode. During load_checkers our king fires its rays back out
+  // along every line, which latches in each square whether it gives check,
+  // which of the king's rays reached it and whether it is pinned. From these:
+  //  - checkers, and the rays of the king they sit on, select the squares a
+  //    non-king move must land on to answer a check (none in double check)
+  //  - the pin axes of the square we are moving from limit its destinations
+  //    to that line
+  //  - king moves are held off attacked squares, which opponent slider rays
+  //    reach through our own king
+  wire [63:0] checkers;
+  wire [64*8-1:0] checker_rays_sq;
+  wire [64*4-1:0] pin_axes_sq;
+  reg  [7:0]  checker_rays;
+  integer sq;
+  always_comb begin
+    checker_rays = 0;
+    for (sq = 0; sq < 64; sq = sq + 1)
+      checker_rays = checker_rays | checker_rays_sq[sq*8 +: 8];
+  end
+  wire in_check = |checkers;
+  wire double_check = |(checkers & (checkers - 64'd1));
+  wire [3:0] move_pin_axes = pin_axes_sq[{uci_move_from_r, uci_move_from_f}*4 +: 4];
+  wire [3:0] move_allow = (in_legal && |move_pin_axes) ? move_pin_axes : 4'hF;
+
+  // a pawn taking en passant also answers a check from the pawn it takes,
+  // which sits next to rather than on its destination
+  wire [63:0] ep_checkers = {16'b0, checkers[39:32], 16'b0, checkers[31:24], 16'b0};
+
+  // true if, with the squares at files gone_a and gone_b emptied, our king
+  // and an opponent rook or queen are next to each other along the rank
+  function automatic logic ep_exposes_king(
+      input logic [31:0] rank_pos, input logic wtp, input logic [3:0] gone_a, input logic [3:0] gone_b);
+    logic [3:0] last, p;
+    logic king, slider, last_king, last_slider;
+    ep_exposes_king = 0;
+    last = 0;
+    for (int k = 0; k < 8; k = k + 1) begin
+      p = (k[3:0] == gone_a || k[3:0] == gone_b) ? 4'h0 : rank_pos[k*4 +: 4];
+      if (|p[2:0]) begin
+        king = p == {wtp, 3'h1};
+        slider = p[3] != wtp && (p[2:0] == 3'h2 || p[2:0] == 3'h3);
+        last_king = last == {wtp, 3'h1};
+        last_slider = |last[2:0] && last[3] != wtp && (last[2:0] == 3'h2 || last[2:0] == 3'h3);
+        ep_exposes_king = ep_exposes_king | (king & last_slider) | (slider & last_king);
+        last = p;
+      end
+    end
+  endfunction
+
+  // en passant takes two pawns off the capture rank at once, which can open
+  // that rank between our king and a rook or queen. The per-square pins
+  // only see one piece in the way, so scan the rank for each of the pawns
+  // that could capture, from the west [0] and the east [1] of the ep file.
+  wire [2:0] ep_f = pos_ep[2:0] - 3'd1;
+  wire [2:0] ep_rank = pos_wtp ? 3'd4 : 3'd3;
+  wire [31:0] ep_rank_pos;
+  genvar ef;
+  generate
+    for (ef=0; ef<8; ef=ef+1)
+    begin: ep_rank_file
+      assign ep_rank_pos[ef*4 +: 4] = pos_wtp ? pos_interconnect[(4*8+(7-ef)+1)*4 +: 4]
+                                             : pos_interconnect[(3*8+(7-ef)+1)*4 +: 4];
+    end
+  endgenerate
+  wire [1:0] ep_exposed = {
+    ep_exposes_king(ep_rank_pos, pos_wtp, {1'b0, ep_f}, {1'b0, ep_f} + 4'd1),
+    ep_exposes_king(ep_rank_pos, pos_wtp, {1'b0, ep_f}, {1'b0, ep_f} - 4'd1)};
+  wire ep_illegal = in_legal && |pos_ep && uci_move_piece == 3'h6 && uci_move_from_r == ep_rank &&
+                    ((ep_exposed[0] && uci_move_from_f == ep_f - 3'd1) ||
+                     (ep_exposed[1] && uci_move_from_f == ep_f + 3'd1));
+  wire [63:0] ep_target = 64'd1 << {pos_wtp ? 3'd5 : 3'd2, ep_f};
+
+  // the ep file only counts, as for Polyglot, with a pawn beside it to take
+  wire ep_hashed = |pos_ep &&
+      ((ep_f != 3'd0 && ep_rank_pos[(ep_f - 3'd1)*4 +: 4] == {pos_wtp, 3'h6}) ||
+       (ep_f != 3'd7 && ep_rank_pos[(ep_f + 3'd1)*4 +: 4] == {pos_wtp, 3'h6}));
+  wire [63:0] castle_key [0:3];
+  wire [63:0] ep_key, wtp_key;
+  genvar ck;
+  generate
+    for (ck=0; ck<4; ck=ck+1)
+    begin: zobrist_castle
+      movegen_zobrist_key zobrist_key(.index(10'd768 + ck[9:0]), .key(castle_key[ck]));
+    end
+  endgenerate
+  movegen_zobrist_key zobrist_ep(.index(10'd772 + {7'd0, ep_f}), .key(ep_key));
+  movegen_zobrist_key zobrist_wtp(.index(10'd780), .key(wtp_key));
+  wire [63:0] hash_state = (pos_castle[3] ? castle_key[0] : 64'd0) ^ (pos_castle[2] ? castle_key[1] : 64'd0) ^
+                           (pos_castle[1] ? castle_key[2] : 64'd0) ^ (pos_castle[0] ? castle_key[3] : 64'd0) ^
+                           (ep_hashed ? ep_key : 64'd0) ^ (pos_wtp ? wtp_key : 64'd0);
+
+  always_ff @(posedge clk) begin
+    if (start_moves) begin
+      o_in_check <= in_check;
+      o_eval <= pos_wtp ? eval_white : -eval_white;
+      o_hash <= hash_pieces ^ hash_state;
+    end
+  end
+
 
   // board move interconnect, each following the name of the driving pins
 
@@ -198,6 +823,21 @@ module psudolegal_board(
   wire [10*10-1:0] w_kn, w_kne, w_ke, w_kse, w_ks, w_ksw, w_kw, w_knw;
   wire [10*10-1:0] w_castle_e, w_castle_w;
 
+  // slider rays crossing into a new segment of SLIDE_SEGMENT ranks, or files
+  // for east and west, come from the ray registered the cycle before
+  wire [10*10-1:0] q_sn, q_sne, q_se, q_sse, q_ss, q_ssw, q_sw, q_snw;
+  generate
+    if (SLIDE_SEGMENT < 8) begin: slide_reg
+      reg [8*10*10-1:0] q = 0;
+      always_ff @(posedge clk) begin
+        q <= {w_sn, w_sne, w_se, w_sse, w_ss, w_ssw, w_sw, w_snw};
+      end
+      assign {q_sn, q_sne, q_se, q_sse, q_ss, q_ssw, q_sw, q_snw} = q;
+    end else begin: slide_comb
+      assign {q_sn, q_sne, q_se, q_sse, q_ss, q_ssw, q_sw, q_snw} = {w_sn, w_sne, w_se, w_sse, w_ss, w_ssw, w_sw, w_snw};
+    end
+  endgenerate
+
   // for knight wiring center 8x8 board within a 12x12, ie. with 2 padding all round
   wire [12*12-1:0] w_nnne, w_nnnw, w_nsse, w_nssw, w_neen, w_nees, w_nwwn, w_nwws;
 
@@ -211,17 +851,37 @@ module psudolegal_board(
         // nr = r + 2;
         // nf = f + 2;
 
+        // rays arriving from the rank or file to the south, north, west or
+        // east cross a segment boundary
+        localparam cross_s = r % SLIDE_SEGMENT == 0;
+        localparam cross_n = (r + 1) % SLIDE_SEGMENT == 0;
+        localparam cross_w = f % SLIDE_SEGMENT == 0;
+        localparam cross_e = (f + 1) % SLIDE_SEGMENT == 0;
+
         movegen_square #(.RANK(r+1), .FILE(f+1)) movegen_square (
           .clk(clk),
-          .in_pos_valid(in_pos_valid),
+          .in_pos_valid(board_load),
           .in_pos_data( pos_interconnect[(r*8+(7-f)+0)*4 +: 4]),
           .out_pos_data(pos_interconnect[(r*8+(7-f)+1)*4 +: 4]),
+          .i_set(set_sq[r*8+f]),
+          .i_set_data(set_data_sq[(r*8+f)*4 +: 4]),
 
           // trigger for this square to emit, and signalling
           // a valid destination
-          .emit_move( !load_attackers & square_from[r*8+f] ),
+          .emit_move( !load_attackers & !load_checkers & square_from[r*8+f] ),
           .target_square( square_to[r*8+f]),
           .load_attackers( load_attackers ),
+          .load_checkers( load_checkers ),
+
+          .legal(in_legal),
+          .i_allow(move_allow),
+          .i_in_check(in_check),
+          .i_double_check(double_check),
+          .i_checker_rays(checker_rays),
+          .i_ep_checker(ep_checkers[r*8+f]),
+          .o_checker(checkers[r*8+f]),
+          .o_checker_rays(checker_rays_sq[(r*8+f)*8 +: 8]),
+          .o_pin_axes(pin_axes_sq[(r*8+f)*4 +: 4]),
           // interconnect signals between squares
 
           // pawn moves signals are not shared with king because of
@@ -250,14 +910,14 @@ module psudolegal_board(
           .i_ep_file(ep_file[f]),
 
           // slide out rays (used by queen, rook, bishop), clockwise from N
-          .o_sn(  w_sn[ (r+1)*10 + f+1]),    .i_ss(  w_sn[ (r+1-1)*10 + f+1+0]),
-          .o_sne( w_sne[(r+1)*10 + f+1]),    .i_ssw( w_sne[(r+1-1)*10 + f+1-1]),
-          .o_se(  w_se[ (r+1)*10 + f+1]),    .i_sw(  w_se[ (r+1-0)*10 + f+1-1]),
-          .o_sse( w_sse[(r+1)*10 + f+1]),    .i_snw( w_sse[(r+1+1)*10 + f+1-1]),
-          .o_ss(  w_ss[ (r+1)*10 + f+1]),    .i_sn(  w_ss[ (r+1+1)*10 + f+1+0]),
-          .o_ssw( w_ssw[(r+1)*10 + f+1]),    .i_sne( w_ssw[(r+1+1)*10 + f+1+1]),
-          .o_sw(  w_sw[ (r+1)*10 + f+1]),    .i_se(  w_sw[ (r+1+0)*10 + f+1+1]),
-          .o_snw( w_snw[(r+1)*10 + f+1]),    .i_sse( w_snw[(r+1-1)*10 + f+1+1]),
+          .o_sn(  w_sn[ (r+1)*10 + f+1]),    .i_ss(  cross_s ? q_sn[(r+1-1)*10 + f+1+0] : w_sn[(r+1-1)*10 + f+1+0]),
+          .o_sne( w_sne[(r+1)*10 + f+1]),    .i_ssw( cross_s ? q_sne[(r+1-1)*10 + f+1-1] : w_sne[(r+1-1)*10 + f+1-1]),
+          .o_se(  w_se[ (r+1)*10 + f+1]),    .i_sw(  cross_w ? q_se[(r+1-0)*10 + f+1-1] : w_se[(r+1-0)*10 + f+1-1]),
+          .o_sse( w_sse[(r+1)*10 + f+1]),    .i_snw( cross_n ? q_sse[(r+1+1)*10 + f+1-1] : w_sse[(r+1+1)*10 + f+1-1]),
+          .o_ss(  w_ss[ (r+1)*10 + f+1]),    .i_sn(  cross_n ? q_ss[(r+1+1)*10 + f+1+0] : w_ss[(r+1+1)*10 + f+1+0]),
+          .o_ssw( w_ssw[(r+1)*10 + f+1]),    .i_sne( cross_n ? q_ssw[(r+1+1)*10 + f+1+1] : w_ssw[(r+1+1)*10 + f+1+1]),
+          .o_sw(  w_sw[ (r+1)*10 + f+1]),    .i_se(  cross_e ? q_sw[(r+1+0)*10 + f+1+1] : w_sw[(r+1+0)*10 + f+1+1]),
+          .o_snw( w_snw[(r+1)*10 + f+1]),    .i_sse( cross_s ? q_snw[(r+1-1)*10 + f+1+1] : w_snw[(r+1-1)*10 + f+1+1]),
 
           // knight L-moves, these skip the intermediate squares
           // r+2, f+2 translates us to the square on the 12x12 knight board
@@ -291,12 +951,12 @@ module psudolegal_board(
           // Rooks need not emit on the castle_e/w lines since they must be in
           // place or the casteling rights would be lost, and there are no
           // intermediate squares between them and the destination square.
-          .i_castle_rights(in_castle),
+          .i_castle_rights(castle_rights),
           .o_castle_e( w_castle_e[(r+1)*10 + f+1]), .i_castle_w(w_castle_e[(r+1-0)*10 + f+1-1]),
           .o_castle_w( w_castle_w[(r+1)*10 + f+1]), .i_castle_e(w_castle_w[(r+1+0)*10 + f+1+1]),
 
           // white to play
-          .wtp(in_wtp)
+          .wtp(pos_wtp)
         );
 
       end
@@ -396,90 +1056,355 @@ module psudolegal_board(
   endgenerate
 
 
-  // all possible destinations of a piece output simultaniously on square_to
-  // this request arbiter iterates through them using the usual bitscan
-  // technique on carry chains
-  // square_to_arb is then a one-hot destination square, and iterates every
-  // cycle until the 65th bit, get priority, which is a 'no-more moves' bit
-  // to pop to the next piece stack.
-  reg [64:0] square_base = 1;
-  wire square_done;
-  wire promotion_move;
-  reg [1:0] uci_move_promote_r = 0;
-  arbiter #(.WIDTH(65)) arbiter_target (
-    .base(square_base),
-    .req({{1'b1, square_to}}),
-    .grant({{square_done, square_to_arb}})
-  );
-  always @(posedge clk) begin
-    if (start_moves || square_done) begin
-      square_base <= 1;
-      uci_move_promote_r <= 0;
-    end else if (!promotion_move || uci_move_promote_r == 2'd3) begin
-      square_base <= square_to_arb << 1;
-      uci_move_promote_r <= 0;
+  // in_order runs the move stack once per pass, each pass limiting the
+  // destinations to one class of move: taking a queen, rook, bishop, knight,
+  // then a pawn (with en passant), then pawn pushes to the last rank, then
+  // the rest. The passes cover every move once. Those with nothing to take
+  // or promote are skipped, and without in_order the one pass takes all.
+  localparam [2:0] pass_pawns = 3'd4, pass_promote = 3'd5, pass_quiet = 3'd6;
+  reg [2:0]  order_pass = pass_quiet;
+  reg [63:0] victim_sq;   // opponent pieces taken in this pass
+  reg [63:0] capture_sq;  // opponent pieces other than the king
+  reg [6:0]  pass_present;
+  reg [3:0]  pass_pos;
+  integer ps;
+  always_comb begin
+    victim_sq = 0;
+    capture_sq = 0;
+    pass_present = 7'b1000000 | {2'b0, |pos_ep, 4'b0};
+    for (ps = 0; ps < 64; ps = ps + 1) begin
+      pass_pos = board_pos[{ps[5:3], ~ps[2:0], 2'b00} +: 4];
+      if (pass_pos[3] != pos_wtp && pass_pos[2:0] > 3'h1) begin
+        capture_sq[ps] = 1;
+        victim_sq[ps] = pass_pos[2:0] == order_pass + 3'd2;
+        pass_present[pass_pos[2:0] - 3'd2] = 1;
+      end
+      if (pass_pos == {pos_wtp, 3'h6} && ps[5:3] == (pos_wtp ? 3'd6 : 3'd1))
+        pass_present[pass_promote] = 1;
+    end
+  end
+
+  // the first pass from a given one with moves to make
+  function automatic logic [2:0] pass_from(input logic [6:0] present, input logic [2:0] from);
+    pass_from = pass_quiet;
+    for (int k = 6; k >= 0; k = k - 1)
+      if (present[k] && k[2:0] >= from) pass_from = k[2:0];
+  endfunction
+
+  always_ff @(posedge clk) begin
+    if (start_moves) begin
+      order_pass <= in_order ? pass_from(pass_present, 3'd0) : pass_quiet;
+    end else if (next_pass) begin
+      order_pass <= pass_from(pass_present, order_pass + 3'd1);
+    end
+  end
+
+  wire        pass_pawn = uci_move_piece == 3'h6;
+  wire [63:0] last_ranks = 64'hFF000000000000FF;
+  wire [63:0] pass_ep = (pass_pawn && |pos_ep) ? ep_target : 64'd0;
+  reg  [63:0] pass_target;
+  always_comb begin
+    if (!in_order) begin
+      pass_target = {64{1'b1}};
+    end else if (order_pass == pass_promote) begin
+      pass_target = pass_pawn ? last_ranks & ~capture_sq : 64'd0;
+    end else if (order_pass == pass_quiet) begin
+      pass_target = ~capture_sq & ~pass_ep & ~(pass_pawn ? last_ranks : 64'd0);
     end else begin
-      uci_move_promote_r <= uci_move_promote_r + 1;
+      pass_target = victim_sq | (order_pass == pass_pawns ? pass_ep : 64'd0);
     end
   end
 
+  // generation waits for the slider rays to settle and for room in the
+  // output FIFO
+  wire out_room;
+  wire gen_ready = rays_settled & out_room;
+
+  // all possible destinations of a piece output simultaniously on square_to.
+  // Each cycle the next LANES of them are picked off, lowest square first,
+  // by a chain of request arbiters using the usual bitscan technique on
+  // carry chains, each lane's arbiter seeing what the lanes before it left.
+  // A promotion is four moves, queen, rook, knight then bishop, and may run
+  // on from one cycle into the next. The piece is popped from the move stack
+  // in the cycle its last moves go out, or straight away with none to make.
+  reg  [63:0] square_sent = 0;    // destinations of this piece already emitted
+  reg  [1:0]  promote_next = 0;   // promotions of the lowest one left already emitted
+  // each lane feeds the next, which to Verilator looks like an array
+  // feeding itself
+  /* verilator lint_off UNOPTFLAT */
+  wire [63:0] lane_req [0:LANES];
+  wire [1:0]  lane_promote_from [0:LANES];
+  /* verilator lint_on UNOPTFLAT */
+  assign lane_req[0] = square_to & ~(ep_illegal ? ep_target : 64'd0) & pass_target & ~square_sent;
+  assign lane_promote_from[0] = promote_next;
+
   wire promotion_move_is_pawn = uci_move_piece == 3'h6;
+  wire [LANES-1:0]    lane_valid;
+  wire [LANES*21-1:0] o_uci_data_w;
+  wire [LANES*16-1:0] move_delta;
 
-  // convert one-hot square_to_arb to a 6-bit square rank/file
-  wire [5:0] square_to_rf;
-  onehot_to_bin #(.ONEHOT_WIDTH(64) ) oh2b_square_to (.onehot(square_to_arb), .bin(square_to_rf));
+  genvar ln;
+  generate
+    for (ln=0; ln<LANES; ln=ln+1)
+    begin: lane
+      wire [63:0] square_to_arb; // one-hot destination square
+      arbiter #(.WIDTH(64)) arbiter_target (
+        .base(64'd1),
+        .req(lane_req[ln]),
+        .grant(square_to_arb)
+      );
 
-  assign uci_move_to_r = square_to_rf[3 +: 3];
-  assign uci_move_to_f = square_to_rf[0 +: 3];
-  assign uci_move_promote = {promotion_move, uci_move_promote_r[1:0]};
-  assign uci_move_takes = 0;
+      // convert one-hot square_to_arb to a 6-bit square rank/file
+      wire [5:0] square_to_rf;
+      onehot_to_bin #(.ONEHOT_WIDTH(64) ) oh2b_square_to (.onehot(square_to_arb), .bin(square_to_rf));
+      wire [2:0] uci_move_to_r = square_to_rf[3 +: 3];
+      wire [2:0] uci_move_to_f = square_to_rf[0 +: 3];
 
-  assign promotion_move = promotion_move_is_pawn && (uci_move_to_r == 3'd0 || uci_move_to_r == 3'd7);
+      wire promotion_move = lane_valid[ln] && promotion_move_is_pawn && (uci_move_to_r == 3'd0 || uci_move_to_r == 3'd7);
+      wire [2:0] uci_move_promote = {promotion_move, promotion_move ? lane_promote_from[ln] : 2'd0};
+      // the destination is done with after any move but the first three promotions
+      wire finished = !promotion_move || lane_promote_from[ln] == 2'd3;
+      assign lane_valid[ln] = |lane_req[ln];
+      assign lane_req[ln+1] = finished ? lane_req[ln] & ~square_to_arb : lane_req[ln];
+      assign lane_promote_from[ln+1] = finished ? 2'd0 : lane_promote_from[ln] + 2'd1;
 
-  movegen_lookup_output movegen_lookup (
-    .clk(clk),
-    .in_pos_valid(in_pos_valid),
-    .in_pos_data(in_pos_data),
-    .in_pos_sop(in_pos_sop),
+      wire [3:0] to_piece;
+      movegen_lookup_output movegen_lookup (
+        .board_pos(board_pos),
+        .lookup_rankfile({uci_move_to_r, uci_move_to_f}),
+        .out_piece(to_piece)
+      );
+      // the piece on the destination square, or the pawn taken en passant
+      wire [2:0] uci_move_takes = |to_piece[2:0] ? to_piece[2:0] :
+                                  (promotion_move_is_pawn && uci_move_from_f != uci_move_to_f) ? 3'h6 : 3'h0;
 
-    .lookup_rankfile({uci_move_to_r, uci_move_to_f}),
-    .out_piece()
-  );
+      // score change for each move, which goes along with it to o_uci_delta
+      movegen_eval move_eval (
+        .white(pos_wtp),
+        .piece(uci_move_piece),
+        .from_rf({uci_move_from_r, uci_move_from_f}),
+        .to_rf({uci_move_to_r, uci_move_to_f}),
+        .takes(uci_move_takes),
+        .promote(uci_move_promote),
+        .ep(promotion_move_is_pawn && uci_move_from_f != uci_move_to_f && !(|to_piece[2:0])),
+        .delta(move_delta[ln*16 +: 16])
+      );
 
-  // assemble the final combinatorial move data together
-  wire [20:0] o_uci_data_w = {uci_move_promote, uci_move_piece, uci_move_from_f, uci_move_from_r, uci_move_takes, uci_move_to_f, uci_move_to_r};
-  wire        o_uci_data_valid = stack_interconnect_to_play_o[9] & ~square_done;
+      // assemble the final combinatorial move data together
+      assign o_uci_data_w[ln*21 +: 21] = {uci_move_promote, uci_move_piece, uci_move_from_f, uci_move_from_r, uci_move_takes, uci_move_to_f, uci_move_to_r};
+    end
+  endgenerate
+
+  // once the move stack has drained square_from falls back to a1, so an
+  // empty stack is done whatever a1 holds
+  wire piece_to_play = stack_interconnect_to_play_o[9];
+  assign square_done = (!piece_to_play || !(|lane_req[LANES])) && gen_ready;
+  always @(posedge clk) begin
+    if (start_moves || square_done) begin
+      square_sent <= 0;
+      promote_next <= 0;
+    end else if (gen_ready) begin
+      square_sent <= square_sent | (lane_req[0] & ~lane_req[LANES]);
+      promote_next <= lane_promote_from[LANES];
+    end
+  end
+
+  wire o_uci_data_valid = piece_to_play & lane_valid[0] & gen_ready;
 
   // the signal to know if this was the *last* valid move is not yet available
   // as it's impossible to know if the remaining pieces will generate any valid
   // moves. So we emit the generated moves 'one behind', by buffering
   // o_uci_data_w until we know there is one more or we've reached the last
-  // piece's last move, in which case we flush with EOP.
-  reg [20:0] o_uci_buffer_data = 0;
+  // piece's last move, in which case we flush with EOP. When the last piece's
+  // last moves are themselves what ends the list, the buffer goes out then
+  // and they follow with EOP a cycle later.
+  reg [LANES*21-1:0] o_uci_buffer_data = 0;
+  reg [LANES*16-1:0] o_uci_buffer_delta = 0;
+  reg [LANES-1:0]    o_uci_buffer_keep = 0;
   reg        o_uci_buffer_valid = 0;
   reg        o_uci_buffer_sop = 0;
+  reg        o_uci_buffer_eop = 0;
   reg        done_sop = 0;
 
-  wire last_piece_is_done = !stack_interconnect_to_play_o[10+9] & square_done;
+  // the move stream before the output FIFO
+  reg                      uci_valid = 0;
+  reg [LANES*21-1:0]       uci_data = 0;
+  reg [LANES-1:0]          uci_keep = 0;
+  reg                      uci_sop = 0;
+  reg                      uci_eop = 0;
+  reg signed [LANES*16-1:0] uci_delta = 0;
+
+  // the performance counters are read out one 16-bit half a cycle, low half
+  // first, into lane 0 of o_uci_data as {counter, half, value}, framed by
+  // o_uci_sop and o_uci_eop. They are snapshotted as the read is taken, and
+  // are sent as moves are, when the output FIFO has room
+  localparam PERF_COUNTERS = 9;
+  localparam PERF_WORDS = PERF_COUNTERS * 2;
+  wire [PERF_COUNTERS*32-1:0] perf_snapshot;
+  reg  [4:0] perf_word = 0;
+  reg        perf_reading = 0;
+  wire       perf_send = perf_reading & out_room;
+  wire       perf_last = perf_word == PERF_WORDS - 1;
+  always_ff @(posedge clk) begin
+    if (perf_read) begin
+      perf_reading <= 1;
+      perf_word <= 0;
+    end else if (perf_send) begin
+      perf_reading <= !perf_last;
+      perf_word <= perf_word + 5'd1;
+    end
+  end
+
+  reg [LANES*21-1:0] perf_data;
+  reg [LANES-1:0]    perf_keep;
+  always_comb begin
+    perf_data = 0;
+    perf_data[20:0] = {perf_word, perf_snapshot[{perf_word, 4'b0000} +: 16]};
+    perf_keep = 0;
+    perf_keep[0] = 1;
+  end
+
+  // once the move stack has drained it keeps re-signalling square_done.
+  // Only flag the end of the move list once per start so o_uci_eop is a
+  // single pulse, even for positions with no moves.
+  reg generating = 0;
+  wire pass_done = generating & !stack_interconnect_to_play_o[10+9] & square_done;
+  assign next_pass = pass_done & in_order & order_pass != pass_quiet;
+  wire last_piece_is_done = pass_done & !next_pass;
+  reg pos_busy = 0;
+  always_ff @(posedge clk) begin
+    if (start_moves) begin
+      generating <= 1;
+    end else if (last_piece_is_done) begin
+      generating <= 0;
+    end
+    if (start || perf_read) begin
+      pos_busy <= 1;
+    end else if (last_piece_is_done || (perf_send && perf_last)) begin
+      pos_busy <= 0;
+    end
+  end
+  assign o_pos_ready = !pos_busy;
+  assign o_shadow_ready = PING_PONG != 0 ? !shadow_full | start_q : o_pos_ready;
+
+  // performance counters, in readout order:
+  //   0 cycles
+  //   1 positions started
+  //   2 moves generated
+  //   3 idle cycles, with no position loading, generating or being read out
+  //   4 load cycles, a square a cycle on in_pos
+  //   5 setup cycles, latching attackers and checkers before the first move,
+  //     and with PING_PONG the cycle after start the shadow is swapped in
+  //   6 pieces left out of the move stack as they have no moves
+  //   7 cycles generation waited for the slider rays to settle
+  //   8 cycles generation stalled for room in the output FIFO
+  function automatic logic [4:0] count_ones(input logic [15:0] bits);
+    count_ones = 0;
+    for (int k = 0; k < 16; k = k + 1)
+      count_ones = count_ones + {4'd0, bits[k]};
+  endfunction
+
+  reg [15:0] lanes_moved;
+  always_comb begin
+    lanes_moved = 0;
+    lanes_moved[LANES-1:0] = lane_valid;
+  end
+  wire [4:0] perf_inc [0:PERF_COUNTERS-1];
+  assign perf_inc[0] = 5'd1;
+  assign perf_inc[1] = {4'd0, start};
+  assign perf_inc[2] = o_uci_data_valid ? count_ones(lanes_moved) : 5'd0;
+  assign perf_inc[3] = {4'd0, !pos_busy & !in_pos_valid & !editing};
+  assign perf_inc[4] = {4'd0, pos_load};
+  assign perf_inc[5] = {4'd0, (start_q & (PING_PONG != 0)) | load_attackers | load_checkers | start_moves};
+  assign perf_inc[6] = start_moves ? count_ones(stack_blocked) : 5'd0;
+  assign perf_inc[7] = {4'd0, generating & !rays_settled};
+  assign perf_inc[8] = {4'd0, generating & rays_settled & !out_room};
+
+  genvar pc;
+  generate
+    for (pc=0; pc<PERF_COUNTERS; pc=pc+1)
+    begin: perf_counter
+      reg  [31:0] count = 0;
+      reg  [31:0] snapshot = 0;
+      wire [31:0] count_next = count + {27'd0, perf_inc[pc]};
+      always_ff @(posedge clk) begin
+        count <= perf_clear ? 32'd0 : count_next;
+        if (perf_read) begin
+          snapshot <= count_next;
+        end
+      end
+      assign perf_snapshot[pc*32 +: 32] = snapshot;
+    end
+  endgenerate
+
   always_ff @(posedge clk) begin
 
     // clock generated data into buffer
     if (o_uci_data_valid) begin
       o_uci_buffer_data  <= o_uci_data_w;
+      o_uci_buffer_delta <= move_delta;
+      o_uci_buffer_keep  <= lane_valid;
       o_uci_buffer_sop <= o_uci_data_valid & !done_sop;
     end
-    if (o_uci_data_valid || last_piece_is_done) begin
+    if (o_uci_data_valid || last_piece_is_done || o_uci_buffer_eop) begin
       o_uci_buffer_valid <= o_uci_data_valid;
       done_sop <= (done_sop | o_uci_data_valid) & !last_piece_is_done;
     end
+    o_uci_buffer_eop <= o_uci_data_valid & last_piece_is_done;
 
     // in the cycle after o_uci_data_valid, a square_done signal
     // indicates the buffered move was the last for this piece, and if the
     // piece stack was also the last item, buffered item is last move.
-    o_uci_data <= o_uci_buffer_data;
-    o_uci_sop <= o_uci_buffer_sop;
-    o_uci_valid <= o_uci_buffer_valid && (o_uci_data_valid || last_piece_is_done);
-    o_uci_eop <= last_piece_is_done;
+    // A counter read goes out in place of the moves.
+    if (perf_reading) begin
+      uci_data <= perf_data;
+      uci_delta <= 0;
+      uci_keep <= perf_keep;
+      uci_sop <= perf_send && perf_word == 0;
+      uci_valid <= perf_send;
+      uci_eop <= perf_send && perf_last;
+    end else begin
+      uci_data <= o_uci_buffer_data;
+      uci_delta <= o_uci_buffer_delta;
+      uci_keep <= o_uci_buffer_keep;
+      uci_sop <= o_uci_buffer_sop;
+      uci_valid <= o_uci_buffer_valid && (o_uci_data_valid || last_piece_is_done || o_uci_buffer_eop);
+      uci_eop <= (last_piece_is_done & !o_uci_data_valid) | o_uci_buffer_eop;
+    end
   end
 
+  // The output FIFO queues each move, and each eop, as an entry. The board
+  // generates only while the FIFO has room for everything it could still
+  // write: the move being made now, the one held in the buffer, and what is
+  // in uci_* on its way in, or an eop flushed after it.
+  localparam OUT_FIFO_SLACK = 3;
+  localparam ENTRY_WIDTH = LANES*21 + LANES*16 + LANES + 3;
+  generate
+    if (OUT_FIFO_DEPTH_LOG2 > 0 && (1 << OUT_FIFO_DEPTH_LOG2) < OUT_FIFO_SLACK)
+    begin: out_fifo_depth_check
+      $error("psudolegal_board: OUT_FIFO_DEPTH_LOG2 must be 0 or at least 2, not %0d", OUT_FIFO_DEPTH_LOG2);
+    end
+    if (OUT_FIFO_DEPTH_LOG2 > 0) begin: out_fifo
+      wire [OUT_FIFO_DEPTH_LOG2:0] free;
+      wire                   entry_valid;
+      wire [ENTRY_WIDTH-1:0] entry;
+      stream_fifo #(.WIDTH(ENTRY_WIDTH), .DEPTH_LOG2(OUT_FIFO_DEPTH_LOG2)) fifo (
+        .clk(clk),
+        .in_valid(uci_valid | uci_eop),
+        .in_data({uci_sop, uci_eop, uci_valid, uci_keep, uci_delta, uci_data}),
+        .free(free),
+        .out_valid(entry_valid),
+        .out_data(entry),
+        .out_ready(in_uci_ready)
+      );
+      assign out_room = free >= OUT_FIFO_SLACK;
+      assign {o_uci_sop, o_uci_eop, o_uci_valid, o_uci_keep, o_uci_delta, o_uci_data} =
+        entry_valid ? entry : {ENTRY_WIDTH{1'b0}};
+    end else begin: out_direct
+      assign out_room = 1;
+      assign {o_uci_sop, o_uci_eop, o_uci_valid, o_uci_keep, o_uci_delta, o_uci_data} =
+        {uci_sop, uci_eop, uci_valid, uci_keep, uci_delta, uci_data};
+    end
+  endgenerate
+
 endmodule
@@ -0,0 +1,42 @@
+module stream_fifo #(
+        parameter WIDTH = 8,
+        parameter DEPTH_LOG2 = 4
+  ) (
+  input logic                 clk,
+
+  // write side has no backpressure, writers must watch `free`.
+  // Writes while full are dropped.
+  input logic                 in_valid,
+  input logic [WIDTH-1:0]     in_data,
+  output wire [DEPTH_LOG2:0]  free,
+
+  // first-word-fall-through read side, out_data is the oldest entry
+  // whenever out_valid, and is popped by out_ready
+  output wire                 out_valid,
+  output wire [WIDTH-1:0]     out_data,
+  input logic                 out_ready
+  );
+
+  reg [WIDTH-1:0] mem [0:(1<<DEPTH_LOG2)-1];
+
+  // pointers carry one extra bit so that full and empty differ
+  reg [DEPTH_LOG2:0] wr_ptr = 0;
+  reg [DEPTH_LOG2:0] rd_ptr = 0;
+  wire [DEPTH_LOG2:0] count = wr_ptr - rd_ptr;
+  wire full = count[DEPTH_LOG2];
+
+  assign free = {1'b1, {DEPTH_LOG2{1'b0}}} - count;
+  assign out_valid = count != 0;
+  assign out_data = mem[rd_ptr[DEPTH_LOG2-1:0]];
+
+  always @(posedge clk) begin
+    if (in_valid && !full) begin
+      mem[wr_ptr[DEPTH_LOG2-1:0]] <= in_data;
+      wr_ptr <= wr_ptr + 1;
+    end
+    if (out_valid && out_ready) begin
+      rd_ptr <= rd_ptr + 1;
+    end
+  end
+
+endmodule
@@ -0,0 +1,110 @@
+import json
+import os
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import FallingEdge, RisingEdge, Timer
+
+from cocotb_corpus import compare_moves
+from cocotb_psudolegal_board import (
+    KIWIPETE_FENS,
+    PETERELLISJONES_FENS,
+    BinaryBoardDriver,
+    MoveMaker,
+    StreamValueReceiver,
+    recv_moves,
+    test_fen_moves,
+)
+from drivers import RandomIdler, ReadyDriver, StrobeDriver
+from epd import read_epd
+from movegen_model import encode_fens, pseudo_legal_words
+
+# psudolegal_board with an output FIFO, streaming the corpus to a consumer
+# that is ready on a random fraction of cycles, run by
+# test_hw.test_backpressure. Each position is loaded as soon as o_pos_ready
+# shows the last is generated, while its moves drain from the FIFO. Every
+# move must come out once, in the order movegen_model gives, however often
+# the board stalls.
+#   BACKPRESSURE_CORPUS   EPD/perft file to read
+#   BACKPRESSURE_READY    fraction of cycles in_uci_ready is high
+#   BACKPRESSURE_REPORT   JSON file to write the results to
+
+
+async def feed(dut, positions, wtp, castle, ep):
+    await FallingEdge(dut.clk)
+    dut.in_legal.value = 0
+    dut.in_order.value = 0
+    for i in range(len(positions)):
+        while not dut.o_pos_ready.value:
+            await FallingEdge(dut.clk)
+        dut.in_wtp.value = int(wtp[i])
+        dut.in_castle.value = int(castle[i])
+        dut.in_ep.value = int(ep[i])
+        for s, square in enumerate(positions[i].tolist()):
+            dut.in_pos_valid.value = 1
+            dut.in_pos_data.value = square
+            dut.in_pos_sop.value = s == 0
+            dut.in_pos_eop.value = s == 63
+            dut.start.value = s == 63
+            await FallingEdge(dut.clk)
+        dut.in_pos_valid.value = 0
+        dut.in_pos_sop.value = 0
+        dut.in_pos_eop.value = 0
+        dut.start.value = 0
+
+
+@cocotb.test()
+async def test_backpressure(dut):
+    ready = float(os.environ.get("BACKPRESSURE_READY", "1.0"))
+    fens = [p.fen for p in read_epd(os.environ["BACKPRESSURE_CORPUS"])]
+    positions, wtp, castle, ep = encode_fens(fens)
+    words, offsets = pseudo_legal_words(positions, wtp, castle, ep)
+
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    dut.in_make.value = 0
+    dut.in_unmake.value = 0
+    ReadyDriver(dut.clk, dut.in_uci_ready, RandomIdler(ready, seed=1))
+    cocotb.start_soon(feed(dut, positions, wtp, castle, ep))
+
+    cycles = 0
+    moves = 0
+    for i, fen in enumerate(fens):
+        hw_words, n = await recv_moves(dut, int(4000 / ready), ready=True)
+        failure = compare_moves(
+            fen, hw_words, words[offsets[i] : offsets[i + 1]].tolist()
+        )
+        assert not failure, failure
+        cycles += n
+        moves += len(hw_words)
+
+    with open(os.environ["BACKPRESSURE_REPORT"], "w") as f:
+        json.dump(
+            {
+                "ready": ready,
+                "positions": len(fens),
+                "moves": moves,
+                "cycles": cycles,
+                "moves_per_cycle": moves / cycles,
+            },
+            f,
+            indent=2,
+        )
+
+
+@cocotb.test()
+async def test_receiver_backpressure(dut):
+    # the edge cases, one at a time, through a StreamReceiver taking a word
+    # on a random third of cycles
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    fd = BinaryBoardDriver(dut.clk, dut.in_pos_valid, dut.in_pos_data, dut.in_pos_sop, dut.in_pos_eop, None, None, dut.in_wtp, dut.in_castle, dut.in_ep, dut.in_legal)
+    rcv = StreamValueReceiver(
+        dut.clk, dut.o_uci_valid, dut.o_uci_data, dut.o_uci_sop, dut.o_uci_eop,
+        ready=dut.in_uci_ready, ready_idler=RandomIdler(0.3, seed=2),
+    )
+    start_strobe = StrobeDriver(dut.clk, dut.start)
+    MoveMaker(dut)
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    for fen in KIWIPETE_FENS + PETERELLISJONES_FENS:
+        await test_fen_moves(start_strobe, fd, rcv, fen)
@@ -0,0 +1,81 @@
+import json
+import os
+import time
+
+import cocotb
+from cocotb.clock import Clock
+
+from cocotb_psudolegal_board import MoveGenStreamer
+from epd import read_epd
+from movegen_model import encode_fens, pseudo_legal_words, uci_from_words
+
+# Corpus regression for psudolegal_board, checked against movegen_model.
+#
+# One simulator process runs one shard of the corpus, configured through
+# the environment by test_hw.test_corpus:
+#   CORPUS          EPD/perft file to read
+#   CORPUS_SHARD    index of this shard
+#   CORPUS_SHARDS   total number of shards, positions are dealt round-robin
+#   CORPUS_REPORT   JSON file to write this shard's results to
+
+
+def compare_moves(fen, hw_words, model_words):
+    if hw_words == model_words:
+        return None
+    hw = set(uci_from_words(hw_words))
+    model = set(uci_from_words(model_words))
+    return {
+        "fen": fen,
+        "missing": sorted(model - hw),
+        "extra": sorted(hw - model),
+        "order": hw == model,
+    }
+
+
+@cocotb.test()
+async def test_corpus(dut):
+    corpus = os.environ["CORPUS"]
+    shard = int(os.environ.get("CORPUS_SHARD", 0))
+    shards = int(os.environ.get("CORPUS_SHARDS", 1))
+    report = os.environ.get("CORPUS_REPORT")
+
+    fens = [p.fen for p in read_epd(corpus)[shard::shards]]
+    positions, wtp, castle, ep = encode_fens(fens)
+    words, offsets = pseudo_legal_words(positions, wtp, castle, ep)
+
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    streamer = MoveGenStreamer(dut)
+
+    failures = []
+    cycles = 0
+    moves = 0
+    start = time.perf_counter()
+    i = 0
+    async for hw_words, n in streamer.stream(positions, wtp, castle, ep):
+        failure = compare_moves(
+            fens[i], hw_words, words[offsets[i] : offsets[i + 1]].tolist()
+        )
+        if failure:
+            dut._log.error(f"mismatch {failure}")
+            failures.append(failure)
+        cycles += n
+        moves += len(hw_words)
+        i += 1
+    wall = time.perf_counter() - start
+
+    result = {
+        "shard": shard,
+        "positions": len(fens),
+        "passed": len(fens) - len(failures),
+        "failed": len(failures),
+        "cycles": cycles,
+        "moves": moves,
+        "wall_seconds": wall,
+        "positions_per_second": len(fens) / wall if wall else 0.0,
+        "failures": failures,
+    }
+    if report:
+        with open(report, "w") as f:
+            json.dump(result, f, indent=2)
+
+    assert not failures, f"{len(failures)} of {len(fens)} positions mismatched"
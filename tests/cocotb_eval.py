@@ -0,0 +1,76 @@
+import os
+
+import chess
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ReadOnly, RisingEdge, Timer
+
+from cocotb_perft import BoardMoveGenerator
+from cocotb_psudolegal_board import LEGAL_EP_FENS, MoveGenStreamer, recv_moves
+from epd import corpus_children, read_epd
+from eval_model import evaluate, move_delta
+from moveframe import decode_words, uci
+from movegen_model import encode_fens
+
+# psudolegal_board's o_eval and o_uci_delta checked against eval_model on
+# the corpus, run by test_hw.test_eval.
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus", "perft.epd")
+
+
+async def watch_deltas(dut, deltas):
+    # o_uci_delta of every move, in the order the moves come out
+    while True:
+        await RisingEdge(dut.clk)
+        await ReadOnly()
+        if dut.o_uci_valid.value:
+            deltas.append(dut.o_uci_delta.value.signed_integer)
+
+
+@cocotb.test()
+async def test_eval(dut):
+    # the score of every corpus position and every position one move on,
+    # and the change each of their pseudo-legal moves makes
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    await Timer(5, units="ns")
+
+    boards = [chess.Board(fen) for fen in LEGAL_EP_FENS] + corpus_children(CORPUS)
+    fens = [board.fen() for board in boards]
+
+    deltas = []
+    cocotb.start_soon(watch_deltas(dut, deltas))
+    streamer = MoveGenStreamer(dut)
+    i = 0
+    async for words, _ in streamer.stream(*encode_fens(fens)):
+        board = boards[i]
+        assert dut.o_eval.value.signed_integer == evaluate(board), fens[i]
+        moves = uci(decode_words(words))
+        got = dict(zip(moves, deltas[: len(words)]))
+        del deltas[: len(words)]
+        expected = {m: move_delta(board, chess.Move.from_uci(m)) for m in moves}
+        assert got == expected, f"{fens[i]}: {got} != {expected}"
+        i += 1
+    assert i == len(boards)
+
+
+@cocotb.test()
+async def test_eval_make(dut):
+    # make and unmake keep the score up to date
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    generate = BoardMoveGenerator(dut, legal_moves=True)
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    for position in read_epd(CORPUS):
+        board = chess.Board(position.fen)
+        words = await generate(board)
+        for word, move in zip(words, uci(decode_words(words))):
+            child = board.copy(stack=False)
+            child.push(chess.Move.from_uci(move))
+            await generate.maker.make(word, start=True)
+            await recv_moves(dut)
+            assert dut.o_eval.value.signed_integer == evaluate(child), child.fen()
+            await generate.maker.unmake(start=True)
+            await recv_moves(dut)
+            assert dut.o_eval.value.signed_integer == evaluate(board), board.fen()
+            await Timer(5, units="ns")
@@ -8,6 +8,7 @@ from cocotb.queue import Queue
 from cocotb.binary import BinaryValue
 
 from drivers import StreamDriver, StreamReceiver, IdleToggler
+from perf_counters import CLEAR, READ, decode_fen_decode, fen_decode_command, report
 
 
 class FENDriver(StreamDriver):
@@ -23,6 +24,10 @@ class FENDriver(StreamDriver):
         await super().send(bs, **kwargs)
         return board
 
+    async def command(self, command, **kwargs):
+        # a "?" line, read or clear the performance counters
+        await StreamDriver.send(self, fen_decode_command(command), **kwargs)
+
 TEXT_PIECE = " kqrbnp  KQRBNP"
 BINARY_PIECE = dict([(c,i) for i,c in enumerate(TEXT_PIECE) if c != ' '])
 
@@ -111,3 +116,128 @@ async def test_fen_opening(dut):
     bs = await rcv.recv()
     assert_board(bs, get_binary_board(board))
     await Timer(2000, units="ns")
+
+
+@cocotb.test()
+async def test_fen_castle_ep(dut):
+    # o_castle is {K, Q, k, q} and o_ep is 0 or 1 + file, as psudolegal_board
+    # takes them. The ep rank digit must not overwrite the file
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    fd = FENDriver(dut.clk, dut.in_valid, dut.in_data, dut.in_sop, dut.in_eop)
+    rcv = StreamReceiver(
+        dut.clk, dut.o_pos_valid, dut.o_pos_data, dut.o_pos_sop, dut.o_pos_eop
+    )
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    for fen, castle, ep in [
+        ("rnbqkbnr/pppp1ppp/8/8/3Pp3/8/PPP1PPPP/RNBQKBNR b KQkq d3 0 3", 0b1111, 4),
+        ("rnbqkbnr/ppppppp1/8/6Pp/8/8/PPPPPP1P/RNBQKBNR w Kq h6 0 3", 0b1001, 8),
+        ("rnbqkbnr/1ppppppp/8/pP6/8/8/P1PPPPPP/RNBQKBNR w Qk a6 0 3", 0b0110, 1),
+        ("4k3/8/8/8/8/8/8/4K3 w - - 0 1", 0, 0),
+    ]:
+        board = await fd.send(fen)
+        bs = await rcv.recv()
+        assert_board(bs, get_binary_board(board))
+        assert dut.o_castle.value == castle, fen
+        assert dut.o_ep.value == ep, fen
+        await Timer(2000, units="ns")
+
+
+class FENPortCounts:
+    """
+    fen_decode's counters as seen from its ports. It is idle from the end of
+    a line's output, a FEN's last square or the command passed on, until the
+    next line starts. Snapshotted on the last byte of each command line, the
+    cycle before fen_decode snapshots its counters.
+    """
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.counts = dict.fromkeys(("cycles", "bytes", "idle_cycles"), 0)
+        self.snapshots = []
+        cocotb.start_soon(self._run())
+
+    @staticmethod
+    def _high(handle):
+        value = handle.value
+        return value.is_resolvable and value.integer == 1
+
+    def since_last(self):
+        before, after = self.snapshots[-2:]
+        return {name: after[name] - before[name] for name in after}
+
+    async def _run(self):
+        dut = self.dut
+        busy = False
+        command = False
+        while True:
+            await RisingEdge(dut.clk)
+            await ReadOnly()
+            valid = self._high(dut.in_valid)
+            if valid and self._high(dut.in_sop):
+                busy = True
+                command = dut.in_data.value.integer == ord("?")
+            self.counts["cycles"] += 1
+            self.counts["bytes"] += valid
+            self.counts["idle_cycles"] += not valid and not busy
+            if valid and command and self._high(dut.in_eop):
+                self.snapshots.append(dict(self.counts))
+            if (
+                self._high(dut.o_pos_valid)
+                and self._high(dut.o_pos_eop)
+                and not self._high(dut.o_pos_perf)
+            ):
+                busy = False
+
+
+@cocotb.test()
+async def test_perf_counters(dut):
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    fd = FENDriver(dut.clk, dut.in_valid, dut.in_data, dut.in_sop, dut.in_eop)
+    rcv = StreamReceiver(
+        dut.clk, dut.o_pos_valid, dut.o_pos_data, dut.o_pos_sop, dut.o_pos_eop
+    )
+    ports = FENPortCounts(dut)
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    async def read_counters(command=READ | CLEAR):
+        # the counters, then the command passed on as a one beat packet
+        pending = cocotb.start_soon(rcv.recv())
+        await fd.command(command)
+        counters = decode_fen_decode(await pending)
+        assert await rcv.recv() == bytes([command])
+        await Timer(5, units="ns")
+        return counters
+
+    await read_counters()
+    fens = [
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "8/5k2/8/8/5q2/3B4/8/4K3 w - - 0 29",
+        "rnbqkbnr/pppp1ppp/8/8/3Pp3/8/PPP1PPPP/RNBQKBNR b KQkq d3 0 3",
+    ]
+    for fen in fens:
+        board = await fd.send(fen, idler=IdleToggler())
+        assert_board(await rcv.recv(), get_binary_board(board))
+        await Timer(2000, units="ns")
+    counters = await read_counters()
+    dut._log.info("\n" + report(counters))
+
+    assert counters["fens"] == len(fens)
+    for name, count in ports.since_last().items():
+        assert counters[name] == count, name
+    # the 64 squares, and the cycle before the first
+    assert counters["output_cycles"] == 65 * len(fens)
+
+    # a clear passes on its command alone, and a read leaves the counts
+    pending = cocotb.start_soon(rcv.recv())
+    await fd.command(CLEAR)
+    assert await pending == bytes([CLEAR])
+    await Timer(5, units="ns")
+    counters = await read_counters(READ)
+    assert counters["cycles"] == ports.since_last()["cycles"]
+    assert counters["fens"] == 0
+    # and FENs decode as before
+    board = await fd.send(fens[0])
+    assert_board(await rcv.recv(), get_binary_board(board))
@@ -0,0 +1,156 @@
+import json
+import os
+import random
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import FallingEdge, RisingEdge, Timer
+
+from cocotb_fen_decode import FENDriver
+from cocotb_psudolegal_board import LEGAL_EP_FENS
+from drivers import CycleMonitor, StreamReceiver
+from epd import corpus_children
+
+# fen_decode_wide checked against fen_decode, run by
+# test_hw.test_fen_decode_wide. test_record_fen_decode runs the single-byte
+# decoder over the FENs and writes what it decoded to FEN_DECODE_RECORD,
+# test_fen_decode_wide then sends the same FENs to the wide decoder, half
+# of them with random gaps in the byte enables, and compares.
+
+
+def corpus_fens():
+    # the corpus, every position one move on, and longer move counters
+    rng = random.Random(1)
+    corpus = os.path.join(os.path.dirname(__file__), "corpus", "perft.epd")
+    fens = list(LEGAL_EP_FENS)
+    for board in corpus_children(corpus):
+        board.halfmove_clock = rng.choice([0, 7, 49, 100])
+        board.fullmove_number = rng.choice([1, 9, 10, 347, 9999])
+        fens.append(board.fen())
+    return fens
+
+
+def decoded(dut, squares):
+    return {
+        "squares": [int(s) for s in squares],
+        "wtp": dut.o_wtp.value.integer,
+        "castle": dut.o_castle.value.integer,
+        "ep": dut.o_ep.value.integer,
+        "hmcount": dut.o_hmcount.value.integer,
+        "fmcount": dut.o_fmcount.value.integer,
+    }
+
+
+class WideFENDriver:
+    """Sends FEN text BYTES per word, with in_keep marking the lanes used."""
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.lanes = len(dut.in_keep)
+        dut.in_valid.value = 0
+        dut.in_sop.value = 0
+        dut.in_eop.value = 0
+
+    async def send(self, fen, rng=None):
+        # rng, if given, leaves random lanes and whole words empty
+        dut = self.dut
+        text = fen.encode()
+        first = True
+        await FallingEdge(dut.clk)
+        while text:
+            keep = [rng is None or rng.random() < 0.7 for _ in range(self.lanes)]
+            data = 0
+            mask = 0
+            for lane in range(self.lanes):
+                if keep[lane] and text:
+                    data |= text[0] << (8 * lane)
+                    mask |= 1 << lane
+                    text = text[1:]
+            dut.in_valid.value = 1
+            dut.in_data.value = data
+            dut.in_keep.value = mask
+            dut.in_sop.value = first
+            dut.in_eop.value = not text
+            first = False
+            await FallingEdge(dut.clk)
+        dut.in_valid.value = 0
+        dut.in_sop.value = 0
+        dut.in_eop.value = 0
+
+
+async def decode_all(dut, send, fens):
+    rcv = StreamReceiver(
+        dut.clk, dut.o_pos_valid, dut.o_pos_data, dut.o_pos_sop, dut.o_pos_eop
+    )
+    monitor = CycleMonitor(
+        dut.clk,
+        sop=[dut.in_valid, dut.in_sop],
+        eop=[dut.o_pos_valid, dut.o_pos_eop],
+    )
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    results = []
+    for i, fen in enumerate(fens):
+        # the decoded board can start before the driver returns
+        pending = cocotb.start_soon(rcv.recv())
+        await send(i, fen)
+        squares = await pending
+        await Timer(5, units="ns")
+        result = decoded(dut, squares)
+        result["cycles"] = monitor.cycles["eop"][-1] - monitor.cycles["sop"][-1]
+        results.append(result)
+    return results
+
+
+@cocotb.test()
+async def test_record_fen_decode(dut):
+    fens = corpus_fens()
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    fd = FENDriver(dut.clk, dut.in_valid, dut.in_data, dut.in_sop, dut.in_eop)
+
+    async def send(i, fen):
+        await fd.send(fen)
+
+    results = await decode_all(dut, send, fens)
+    with open(os.environ["FEN_DECODE_RECORD"], "w") as f:
+        json.dump({"fens": fens, "results": results}, f)
+
+
+@cocotb.test()
+async def test_fen_decode_wide(dut):
+    with open(os.environ["FEN_DECODE_RECORD"]) as f:
+        record = json.load(f)
+    fens = record["fens"]
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    fd = WideFENDriver(dut)
+    rng = random.Random(2)
+
+    async def send(i, fen):
+        await fd.send(fen, rng if i % 2 else None)
+
+    results = await decode_all(dut, send, fens)
+    for fen, narrow, wide in zip(fens, record["results"], results):
+        for key in ["squares", "wtp", "castle", "ep", "hmcount", "fmcount"]:
+            assert wide[key] == narrow[key], f"{key} differs for {fen}"
+
+    # cycles for the FENs sent with every lane in use
+    narrow = sum(r["cycles"] for r in record["results"][::2])
+    wide = sum(r["cycles"] for r in results[::2])
+    dut._log.info(
+        f"{fd.lanes} bytes/cycle: {wide / len(results[::2]):.1f} cycles/FEN, "
+        f"fen_decode {narrow / len(results[::2]):.1f}"
+    )
+    report = os.environ.get("FEN_DECODE_WIDE_REPORT")
+    if report:
+        with open(report, "w") as f:
+            json.dump(
+                {
+                    "bytes": fd.lanes,
+                    "fens": len(fens),
+                    "cycles_per_fen": wide / len(results[::2]),
+                    "fen_decode_cycles_per_fen": narrow / len(results[::2]),
+                },
+                f,
+                indent=2,
+            )
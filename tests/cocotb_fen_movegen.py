@@ -0,0 +1,109 @@
+import os
+
+import chess
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, Timer
+
+from cocotb_fen_decode import FENDriver
+from cocotb_psudolegal_board import (
+    LEGAL_EP_FENS,
+    encode_legal_moves,
+    encode_pseudo_legal_moves,
+    recv_moves,
+)
+from epd import corpus_children
+from moveframe import decode_words, uci
+from perf_counters import CLEAR, READ, decode_board, decode_fen_decode
+
+# FEN text in, moves out of fen_movegen, with no host round trip between
+# fen_decode and psudolegal_board. Checked against python-chess for the
+# corpus positions and every position one move on from them.
+
+
+def corpus_boards():
+    corpus = os.path.join(os.path.dirname(__file__), "corpus", "perft.epd")
+    boards = [chess.Board(fen) for fen in LEGAL_EP_FENS] + corpus_children(corpus)
+    return boards
+
+
+class FENMoveGenerator:
+    """Sends FEN text to fen_movegen and collects the move words."""
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.fd = FENDriver(dut.clk, dut.in_valid, dut.in_data, dut.in_sop, dut.in_eop)
+
+    async def __call__(self, fen, legal_moves=True):
+        # returns (words, cycles), cycles counted from the first FEN byte
+        self.dut.in_legal.value = legal_moves
+        # moves can begin before the driver returns
+        pending = cocotb.start_soon(recv_moves(self.dut))
+        await self.fd.send(fen)
+        words, cycles = await pending
+        await Timer(5, units="ns")
+        return words, cycles
+
+    async def read_counters(self, command=READ | CLEAR):
+        # fen_decode's counters, a nibble a word, then the board's
+        pending = cocotb.start_soon(recv_moves(self.dut))
+        await self.fd.command(command)
+        nibbles, _ = await pending
+        words, _ = await recv_moves(self.dut)
+        await Timer(5, units="ns")
+        return decode_fen_decode(nibbles), decode_board(words)
+
+
+@cocotb.test()
+async def test_fen_movegen(dut):
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    generate = FENMoveGenerator(dut)
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    for board in corpus_boards():
+        fen = board.fen()
+        words, _ = await generate(fen)
+        moves = set(uci(decode_words(words), piece_prefix=True))
+        expected = encode_legal_moves(board)
+        assert (
+            moves == expected
+        ), f"{fen}: missing {expected - moves}, extra {moves - expected}"
+        assert dut.o_in_check.value == board.is_check(), fen
+
+    # and pseudo-legal, for the positions as given in the corpus
+    for board in corpus_boards()[len(LEGAL_EP_FENS) :: 8]:
+        fen = board.fen()
+        words, _ = await generate(fen, legal_moves=False)
+        moves = set(uci(decode_words(words), piece_prefix=True))
+        expected = encode_pseudo_legal_moves(board)
+        assert (
+            moves == expected
+        ), f"{fen}: missing {expected - moves}, extra {moves - expected}"
+
+
+@cocotb.test()
+async def test_perf_counters(dut):
+    # both sets of counters over o_uci_data, from the one "?" line
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    generate = FENMoveGenerator(dut)
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    await generate.read_counters()
+    boards = corpus_boards()[:8]
+    moves = 0
+    for board in boards:
+        words, _ = await generate(board.fen())
+        moves += len(words)
+    decoder, board = await generate.read_counters()
+
+    assert decoder["fens"] == len(boards)
+    # and the "?3" of the read
+    assert decoder["bytes"] == sum(len(b.fen()) for b in boards) + 2
+    assert board["positions"] == len(boards)
+    assert board["moves"] == moves
+    assert board["load_cycles"] == 64 * len(boards)
+    # each read reaches the board the same few cycles after fen_decode
+    # takes it, so both count the cycles between the two reads
+    assert board["cycles"] == decoder["cycles"]
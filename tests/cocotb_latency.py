@@ -0,0 +1,145 @@
+import json
+import os
+
+import chess
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, Timer
+
+from cocotb_fen_decode import FENDriver, assert_board, get_binary_board
+from cocotb_fen_movegen import FENMoveGenerator
+from cocotb_psudolegal_board import (
+    BinaryBoardDriver,
+    MoveMaker,
+    StreamValueReceiver,
+    assert_moves_equal,
+    encode_pseudo_legal_moves,
+)
+from drivers import CycleMonitor, StreamReceiver, StrobeDriver
+from epd import read_epd
+from moveframe import decode_words, uci
+
+# Per-position cycle latency, run by test_hw.test_latency. Positions are
+# sent one at a time through the usual drivers, and a CycleMonitor stamps
+# the cycles the latency is measured between. The samples for every
+# position in LATENCY_CORPUS are written to LATENCY_REPORT.
+
+
+def write_samples(samples):
+    with open(os.environ["LATENCY_REPORT"], "w") as f:
+        json.dump(samples, f, indent=2)
+
+
+@cocotb.test()
+async def test_board_latency(dut):
+    # cycles from the start strobe being sampled to o_uci_eop
+    fens = [p.fen for p in read_epd(os.environ["LATENCY_CORPUS"])]
+
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    fd = BinaryBoardDriver(
+        dut.clk,
+        dut.in_pos_valid,
+        dut.in_pos_data,
+        dut.in_pos_sop,
+        dut.in_pos_eop,
+        None,
+        None,
+        dut.in_wtp,
+        dut.in_castle,
+        dut.in_ep,
+        dut.in_legal,
+    )
+    rcv = StreamValueReceiver(
+        dut.clk, dut.o_uci_valid, dut.o_uci_data, dut.o_uci_sop, dut.o_uci_eop
+    )
+    start_strobe = StrobeDriver(dut.clk, dut.start)
+    MoveMaker(dut)
+    monitor = CycleMonitor(
+        dut.clk, start=[dut.start], eop=[dut.o_uci_valid, dut.o_uci_eop]
+    )
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    samples = []
+    for fen in fens:
+        board = await fd.send(fen)
+        await start_strobe.strobe()
+        bs = await rcv.recv()
+        await Timer(5, units="ns")
+        assert_moves_equal(bs, board)
+        cycles = monitor.cycles["eop"][-1] - monitor.cycles["start"][-1]
+        samples.append(
+            {
+                "fen": fen,
+                "cycles": cycles,
+                "moves": len(bs),
+                "moves_per_cycle": len(bs) / cycles,
+            }
+        )
+    write_samples(samples)
+
+
+@cocotb.test()
+async def test_fen_decode_latency(dut):
+    # cycles from the in_sop byte being sampled to o_pos_eop
+    fens = [p.fen for p in read_epd(os.environ["LATENCY_CORPUS"])]
+
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    fd = FENDriver(dut.clk, dut.in_valid, dut.in_data, dut.in_sop, dut.in_eop)
+    rcv = StreamReceiver(
+        dut.clk, dut.o_pos_valid, dut.o_pos_data, dut.o_pos_sop, dut.o_pos_eop
+    )
+    monitor = CycleMonitor(
+        dut.clk,
+        sop=[dut.in_valid, dut.in_sop],
+        eop=[dut.o_pos_valid, dut.o_pos_eop],
+    )
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    samples = []
+    for fen in fens:
+        # the decoded board can start before the driver returns
+        pending = cocotb.start_soon(rcv.recv())
+        board = await fd.send(fen)
+        bs = await pending
+        await Timer(5, units="ns")
+        assert_board(bs, get_binary_board(board))
+        cycles = monitor.cycles["eop"][-1] - monitor.cycles["sop"][-1]
+        samples.append({"fen": fen, "cycles": cycles, "bytes": len(fen)})
+    write_samples(samples)
+
+
+@cocotb.test()
+async def test_fen_movegen_latency(dut):
+    # cycles from the in_sop byte being sampled to o_uci_eop, FEN text to
+    # the end of the move list with no host in between
+    fens = [p.fen for p in read_epd(os.environ["LATENCY_CORPUS"])]
+
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    generate = FENMoveGenerator(dut)
+    monitor = CycleMonitor(
+        dut.clk,
+        sop=[dut.in_valid, dut.in_sop],
+        eop=[dut.o_uci_eop],
+    )
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    samples = []
+    for fen in fens:
+        words, _ = await generate(fen, legal_moves=False)
+        assert set(
+            uci(decode_words(words), piece_prefix=True)
+        ) == encode_pseudo_legal_moves(chess.Board(fen)), fen
+        cycles = monitor.cycles["eop"][-1] - monitor.cycles["sop"][-1]
+        samples.append(
+            {
+                "fen": fen,
+                "cycles": cycles,
+                "bytes": len(fen),
+                "moves": len(words),
+                "moves_per_cycle": len(words) / cycles,
+            }
+        )
+    write_samples(samples)
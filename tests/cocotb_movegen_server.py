@@ -0,0 +1,110 @@
+import json
+import os
+import queue
+import socket
+import threading
+import time
+
+import chess
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, Timer
+from cocotb.utils import get_sim_time
+
+from cocotb_psudolegal_board import BinaryBoardDriver, MoveMaker, recv_moves
+from drivers import StrobeDriver
+from uci_bridge import encode_response
+
+# psudolegal_board kept up as a move generation server, started by
+# movegen_server.MovegenServer. Listens on the Unix socket in
+# MOVEGEN_SERVER_SOCKET and answers FEN lines from any number of clients in
+# the uci_bridge device protocol, so a DeviceClient can talk to it directly.
+# Each connection has a thread reading its lines into one queue, which the
+# simulation serves in arrival order. A "quit" line from any client stops
+# the server, and the time each request spent queued and simulated is
+# written to MOVEGEN_SERVER_REPORT.
+
+QUIT = "quit"
+
+
+def accept_clients(server, requests):
+    while True:
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            return  # the listening socket was closed
+        threading.Thread(
+            target=read_requests, args=(conn, requests), daemon=True
+        ).start()
+
+
+def read_requests(conn, requests):
+    # the connection is closed by the simulation after its last answer,
+    # queued as None
+    with conn.makefile("rb") as lines:
+        for line in lines:
+            requests.put((line.decode().strip(), conn, time.perf_counter()))
+            if line.strip() == QUIT.encode():
+                return
+    requests.put((None, conn, time.perf_counter()))
+
+
+@cocotb.test(skip="MOVEGEN_SERVER_SOCKET" not in os.environ)
+async def test_movegen_server(dut):
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    fd = BinaryBoardDriver(dut.clk, dut.in_pos_valid, dut.in_pos_data, dut.in_pos_sop, dut.in_pos_eop, None, None, dut.in_wtp, dut.in_castle, dut.in_ep, dut.in_legal)
+    start_strobe = StrobeDriver(dut.clk, dut.start)
+    MoveMaker(dut)
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    requests = queue.Queue()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(os.environ["MOVEGEN_SERVER_SOCKET"])
+    server.listen()
+    threading.Thread(target=accept_clients, args=(server, requests), daemon=True).start()
+
+    served = []
+    with server:
+        while True:
+            # blocks the simulator, which has nothing to do until a request
+            fen, conn, queued = requests.get()
+            if fen == QUIT:
+                break
+            if fen is None:
+                conn.close()
+                continue
+            start = time.perf_counter()
+            start_ns = get_sim_time(units="ns")
+            try:
+                board = chess.Board(fen)
+            except ValueError:
+                # answered, so the client's responses stay in order
+                dut._log.warning(f"bad FEN {fen!r}")
+                board = None
+            words = []
+            if board is not None:
+                await fd.send_board(board)
+                await start_strobe.strobe()
+                # recv_moves, as a board with no moves ends with o_uci_eop
+                # alone
+                words, _ = await recv_moves(dut)
+                await Timer(5, units="ns")
+            try:
+                conn.sendall(encode_response(words))
+            except OSError:
+                pass  # the client has gone
+            done = time.perf_counter()
+            served.append(
+                {
+                    "fen": fen,
+                    "moves": len(words),
+                    # one cycle a ns
+                    "cycles": round(get_sim_time(units="ns") - start_ns),
+                    "queue_ms": (start - queued) * 1000,
+                    "sim_ms": (done - start) * 1000,
+                }
+            )
+
+    with open(os.environ["MOVEGEN_SERVER_REPORT"], "w") as f:
+        json.dump(served, f, indent=2)
@@ -0,0 +1,128 @@
+import json
+import os
+import time
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import FallingEdge, ReadOnly, RisingEdge
+
+from cocotb_psudolegal_board import encode_binary_moves, encode_legal_moves
+from epd import corpus_children
+from movegen_model import encode_fens
+
+# Throughput of movegen_multicore, checked against python-chess legal moves.
+#
+# Positions are fed on the single input bus whenever o_pos_ready allows,
+# and the tagged move lists are matched back to their positions as they
+# come out, in whatever order the cores finish. Configured by
+# test_hw.test_multicore:
+#   MULTICORE_CORPUS   EPD/perft file, each root and its children are run
+#   MULTICORE_CORES    the CORES parameter the model was built with
+#   MULTICORE_REPORT   JSON file to write the results to
+
+
+async def feed(dut, boards, pending, tag_limit):
+    positions, wtp, castle, ep = encode_fens(b.fen() for b in boards)
+    await FallingEdge(dut.clk)
+    dut.in_legal.value = 1
+    for i in range(len(boards)):
+        while not dut.o_pos_ready.value:
+            await FallingEdge(dut.clk)
+        tag = i % tag_limit
+        assert tag not in pending, f"tag {tag} reused while in flight"
+        pending[tag] = i
+        dut.in_pos_tag.value = tag
+        dut.in_wtp.value = int(wtp[i])
+        dut.in_castle.value = int(castle[i])
+        dut.in_ep.value = int(ep[i])
+        for s, square in enumerate(positions[i].tolist()):
+            dut.in_pos_valid.value = 1
+            dut.in_pos_data.value = square
+            dut.in_pos_sop.value = s == 0
+            dut.in_pos_eop.value = s == 63
+            await FallingEdge(dut.clk)
+        dut.in_pos_valid.value = 0
+        dut.in_pos_sop.value = 0
+        dut.in_pos_eop.value = 0
+
+
+async def collect(dut, count, pending, timeout=4000):
+    # {position index: (words, in_check)} for count move lists
+    lists = {}
+    words = {}
+    idle = 0
+    cycles = 0
+    while len(lists) < count:
+        await RisingEdge(dut.clk)
+        await ReadOnly()
+        cycles += 1
+        idle += 1
+        tag = dut.o_uci_tag.value.integer
+        if dut.o_uci_valid.value:
+            words.setdefault(tag, []).append(dut.o_uci_data.value)
+            idle = 0
+        if dut.o_uci_eop.value:
+            i = pending.pop(tag)
+            lists[i] = (words.pop(tag, []), bool(dut.o_in_check.value))
+            idle = 0
+        if idle > timeout:
+            raise Exception(
+                f"no output for {timeout} cycles, {len(lists)}/{count} lists"
+            )
+    return lists, cycles
+
+
+@cocotb.test()
+async def test_multicore(dut):
+    corpus = os.environ["MULTICORE_CORPUS"]
+    cores = int(os.environ.get("MULTICORE_CORES", 2))
+    report = os.environ.get("MULTICORE_REPORT")
+
+    boards = corpus_children(corpus)
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    dut.in_pos_valid.value = 0
+    dut.in_pos_sop.value = 0
+    dut.in_pos_eop.value = 0
+
+    pending = {}
+    start = time.perf_counter()
+    await cocotb.start(feed(dut, boards, pending, 1 << len(dut.in_pos_tag)))
+    lists, cycles = await collect(dut, len(boards), pending)
+    wall = time.perf_counter() - start
+
+    moves = 0
+    failures = []
+    for i, board in enumerate(boards):
+        words, in_check = lists[i]
+        moves += len(words)
+        got = encode_binary_moves(words)
+        expected = encode_legal_moves(board)
+        if got != expected or in_check != board.is_check():
+            failures.append(
+                {
+                    "fen": board.fen(),
+                    "missing": sorted(expected - got),
+                    "extra": sorted(got - expected),
+                    "in_check": in_check,
+                }
+            )
+            dut._log.error(f"mismatch {failures[-1]}")
+
+    result = {
+        "cores": cores,
+        "positions": len(boards),
+        "moves": moves,
+        "cycles": cycles,
+        "moves_per_cycle": moves / cycles,
+        "cycles_per_position": cycles / len(boards),
+        "wall_seconds": wall,
+        "failures": failures,
+    }
+    if report:
+        with open(report, "w") as f:
+            json.dump(result, f, indent=2)
+    dut._log.info(
+        f"{cores} cores: {moves} moves in {cycles} cycles, "
+        f"{result['moves_per_cycle']:.3f} moves/cycle"
+    )
+    assert not failures, f"{len(failures)} of {len(boards)} positions mismatched"
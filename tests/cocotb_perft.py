@@ -0,0 +1,162 @@
+import json
+import os
+import time
+
+import chess
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, Timer
+
+from cocotb_psudolegal_board import BinaryBoardDriver, MoveMaker, recv_moves
+from drivers import StrobeDriver
+from epd import read_epd
+from perft import Perft
+
+# Perft with psudolegal_board as the move generator, run by
+# test_hw.test_perft and configured through the environment:
+#   PERFT_CORPUS   EPD/perft file, positions need a ;D<depth> count
+#   PERFT_DEPTH    depth to search each position to
+#   PERFT_DIVIDE   if set, log the divide of every root position
+#   PERFT_LEGAL    0 to run the board pseudo-legal, with the host dropping
+#                  moves into check, rather than in its legal move mode
+#   PERFT_REPORT   JSON file to write the results to
+#
+# test_perft_make walks the whole tree on the board instead, run by
+# test_hw.test_perft_make. Only the root is loaded, every other position is
+# reached by make and left by unmake, and leaves are counted from the length
+# of the legal move lists.
+
+
+class BoardMoveGenerator:
+    """Loads a board into psudolegal_board and collects its move words."""
+
+    def __init__(self, dut, legal_moves=False):
+        self.dut = dut
+        self.legal_moves = legal_moves
+        self.fd = BinaryBoardDriver(
+            dut.clk,
+            dut.in_pos_valid,
+            dut.in_pos_data,
+            dut.in_pos_sop,
+            dut.in_pos_eop,
+            None,
+            None,
+            dut.in_wtp,
+            dut.in_castle,
+            dut.in_ep,
+            dut.in_legal,
+        )
+        self.start_strobe = StrobeDriver(dut.clk, dut.start)
+        self.maker = MoveMaker(dut)
+
+    async def __call__(self, board):
+        await self.fd.send_board(board, legal_moves=self.legal_moves)
+        await self.start_strobe.strobe()
+        words, _ = await recv_moves(self.dut)
+        await Timer(5, units="ns")
+        return words
+
+
+class MakeMovePerft:
+    """Depth-first perft on psudolegal_board in legal mode, by make/unmake."""
+
+    def __init__(self, generate):
+        self.generate = generate
+        self.dut = generate.dut
+        self.maker = generate.maker
+        self.cycles = 0
+        self.calls = 0
+
+    async def moves(self, start):
+        # the start strobe has gone with a make, or been sent by the caller
+        words, cycles = await recv_moves(self.dut)
+        self.cycles += cycles + int(start)
+        self.calls += 1
+        return words
+
+    async def search(self, words, depth):
+        if depth == 1:
+            return len(words)
+        nodes = 0
+        for word in words:
+            await self.maker.make(word, start=True)
+            nodes += await self.search(await self.moves(True), depth - 1)
+            await self.maker.unmake()
+            self.cycles += 1
+        return nodes
+
+    async def run(self, fen, depth):
+        self.cycles = 0
+        self.calls = 0
+        start = time.perf_counter()
+        words = await self.generate(chess.Board(fen))
+        nodes = await self.search(words, depth)
+        seconds = time.perf_counter() - start
+        return {
+            "fen": fen,
+            "depth": depth,
+            "nodes": nodes,
+            "calls": self.calls,
+            "cycles": self.cycles,
+            "cycles_per_call": self.cycles / self.calls if self.calls else 0.0,
+            "seconds": seconds,
+        }
+
+
+@cocotb.test()
+async def test_perft(dut):
+    depth = int(os.environ.get("PERFT_DEPTH", 2))
+    legal = os.environ.get("PERFT_LEGAL", "1") != "0"
+    positions = [p for p in read_epd(os.environ["PERFT_CORPUS"]) if depth in p.perft]
+
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    perft = Perft(BoardMoveGenerator(dut, legal_moves=legal), legal=legal)
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    results = []
+    for position in positions:
+        result = await perft.run(position.fen, depth)
+        if os.environ.get("PERFT_DIVIDE"):
+            # answered from the move list cache the run above filled
+            counts = await perft.divide(chess.Board(position.fen), depth)
+            for move, nodes in sorted(counts.items()):
+                dut._log.info(f"{move}: {nodes}")
+        result["expected"] = position.perft[depth]
+        dut._log.info(
+            f"perft({depth}) {result['nodes']}/{result['expected']} "
+            f"{result['nodes_per_second']:.0f} nodes/s "
+            f"{result['calls_per_node']:.4f} calls/node {position.fen}"
+        )
+        results.append(result)
+
+    with open(os.environ["PERFT_REPORT"], "w") as f:
+        json.dump(results, f, indent=2)
+    failed = [r["fen"] for r in results if r["nodes"] != r["expected"]]
+    assert not failed, f"perft({depth}) mismatched on {failed}"
+
+
+@cocotb.test()
+async def test_perft_make(dut):
+    depth = int(os.environ.get("PERFT_DEPTH", 2))
+    positions = [p for p in read_epd(os.environ["PERFT_CORPUS"]) if depth in p.perft]
+
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    perft = MakeMovePerft(BoardMoveGenerator(dut, legal_moves=True))
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    results = []
+    for position in positions:
+        result = await perft.run(position.fen, depth)
+        result["expected"] = position.perft[depth]
+        dut._log.info(
+            f"perft({depth}) {result['nodes']}/{result['expected']} "
+            f"{result['cycles_per_call']:.1f} cycles/call {position.fen}"
+        )
+        results.append(result)
+
+    with open(os.environ["PERFT_REPORT"], "w") as f:
+        json.dump(results, f, indent=2)
+    failed = [r["fen"] for r in results if r["nodes"] != r["expected"]]
+    assert not failed, f"perft({depth}) mismatched on {failed}"
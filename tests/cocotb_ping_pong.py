@@ -0,0 +1,102 @@
+import json
+import os
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import FallingEdge
+
+from cocotb_corpus import compare_moves
+from cocotb_psudolegal_board import recv_moves
+from epd import read_epd
+from movegen_model import encode_fens, pseudo_legal_words
+
+# psudolegal_board streaming the corpus back to back, run by
+# test_hw.test_ping_pong with and without PING_PONG. Each position is
+# loaded as soon as the board can take it: with PING_PONG into the shadow
+# board once o_shadow_ready, while the last generates, and started once
+# o_pos_ready shows the last is done. Without, it loads once o_pos_ready
+# shows the last is done, and starts with its last square.
+# Every move must come out in the order movegen_model gives, and the
+# cycles to the last o_uci_eop are reported.
+#   PING_PONG_CORPUS   EPD/perft file to read
+#   PING_PONG_SHADOW   1 if the board was built with PING_PONG
+#   PING_PONG_REPORT   JSON file to write the results to
+
+
+async def load(dut, square_values, wtp, castle, ep, start):
+    # the 64 squares, with start along with the last if given
+    dut.in_wtp.value = int(wtp)
+    dut.in_castle.value = int(castle)
+    dut.in_ep.value = int(ep)
+    for s, square in enumerate(square_values):
+        dut.in_pos_valid.value = 1
+        dut.in_pos_data.value = square
+        dut.in_pos_sop.value = s == 0
+        dut.in_pos_eop.value = s == 63
+        dut.start.value = start and s == 63
+        await FallingEdge(dut.clk)
+    dut.in_pos_valid.value = 0
+    dut.in_pos_sop.value = 0
+    dut.in_pos_eop.value = 0
+    dut.start.value = 0
+
+
+async def feed(dut, positions, wtp, castle, ep, shadow):
+    await FallingEdge(dut.clk)
+    for i in range(len(positions)):
+        square_values = positions[i].tolist()
+        if shadow:
+            while not dut.o_shadow_ready.value:
+                await FallingEdge(dut.clk)
+            await load(dut, square_values, wtp[i], castle[i], ep[i], start=False)
+            while not dut.o_pos_ready.value:
+                await FallingEdge(dut.clk)
+            dut.start.value = 1
+            await FallingEdge(dut.clk)
+            dut.start.value = 0
+        else:
+            while not dut.o_pos_ready.value:
+                await FallingEdge(dut.clk)
+            await load(dut, square_values, wtp[i], castle[i], ep[i], start=True)
+
+
+@cocotb.test()
+async def test_ping_pong(dut):
+    shadow = os.environ.get("PING_PONG_SHADOW", "0") == "1"
+    fens = [p.fen for p in read_epd(os.environ["PING_PONG_CORPUS"])]
+    positions, wtp, castle, ep = encode_fens(fens)
+    words, offsets = pseudo_legal_words(positions, wtp, castle, ep)
+
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    dut.in_legal.value = 0
+    dut.in_order.value = 0
+    dut.in_make.value = 0
+    dut.in_unmake.value = 0
+    dut.in_uci_ready.value = 1
+    dut.start.value = 0
+    dut.in_pos_valid.value = 0
+    cocotb.start_soon(feed(dut, positions, wtp, castle, ep, shadow))
+
+    cycles = 0
+    moves = 0
+    for i, fen in enumerate(fens):
+        hw_words, n = await recv_moves(dut)
+        failure = compare_moves(
+            fen, hw_words, words[offsets[i] : offsets[i + 1]].tolist()
+        )
+        assert not failure, failure
+        cycles += n
+        moves += len(hw_words)
+
+    with open(os.environ["PING_PONG_REPORT"], "w") as f:
+        json.dump(
+            {
+                "ping_pong": shadow,
+                "positions": len(fens),
+                "moves": moves,
+                "cycles": cycles,
+                "cycles_per_position": cycles / len(fens),
+            },
+            f,
+            indent=2,
+        )
@@ -1,6 +1,8 @@
 import cocotb
 import chess
+import json
 import logging
+import os
 
 from cocotb.triggers import Timer, Event, RisingEdge, FallingEdge, ReadOnly
 from cocotb.clock import Clock
@@ -9,6 +11,10 @@ from cocotb.binary import BinaryValue
 
 from drivers import StreamDriver, StreamReceiver, IdleToggler, StrobeDriver
 from cocotb_fen_decode import get_binary_board, BINARY_PIECE, TEXT_PIECE
+from epd import corpus_children
+from moveframe import decode_words, uci
+from movegen_model import encode_fens, pseudo_legal_words
+from perf_counters import CLEAR, READ, decode_board, report
 
 def encode_casteling_bits(board):
     v = 0 | board.has_kingside_castling_rights(chess.WHITE) << 3
@@ -18,12 +24,13 @@ def encode_casteling_bits(board):
     return v
 
 class BinaryBoardDriver(StreamDriver):
-    def __init__(self, clock, valid, data, sop, eop, hmcount, fmcount, wtp, castle, ep):
+    def __init__(self, clock, valid, data, sop, eop, hmcount, fmcount, wtp, castle, ep, legal=None):
         self.hmcount = hmcount
         self.fmcount = fmcount
         self.wtp = wtp
         self.castle = castle
         self.ep = ep
+        self.legal = legal
         super().__init__(clock, valid, data, sop, eop)
 
     def _encode_ep_bits(self, board):
@@ -39,6 +46,10 @@ class BinaryBoardDriver(StreamDriver):
     async def send(self, fenstr: str, **kwargs):
         # validates or fires exception
         board = chess.Board(fenstr)
+        await self.send_board(board, **kwargs)
+        return board
+
+    async def send_board(self, board, legal_moves=False, **kwargs):
         binary_pieces = get_binary_board(board)
         assert(len(binary_pieces) == 64)
 
@@ -50,8 +61,121 @@ class BinaryBoardDriver(StreamDriver):
         self.wtp.value = board.turn == chess.WHITE
         self.castle.value = encode_casteling_bits(board)
         self.ep.value = self._encode_ep_bits(board)
+        if self.legal is not None:
+            self.legal.value = legal_moves
         await super().send(binary_pieces, **kwargs)
-        return board
+
+    async def command(self, command, **kwargs):
+        # a one beat packet, which the board takes as a command
+        await StreamDriver.send(self, bytes([command]), **kwargs)
+
+class MoveMaker:
+    """
+    Drives in_make/in_unmake, which step the loaded position a move forward
+    or back in place. Holds them low otherwise, along with in_order, so every
+    board testbench creates one. With start=True the start strobe goes with
+    the make or unmake, and the board's moves for the new position follow.
+    """
+
+    def __init__(self, dut):
+        self.dut = dut
+        dut.in_make.value = 0
+        dut.in_make_data.value = 0
+        dut.in_unmake.value = 0
+        dut.in_order.value = 0
+
+    async def _strobe(self, signal, start, word=0):
+        await FallingEdge(self.dut.clk)
+        self.dut.in_make_data.value = word
+        signal.value = 1
+        self.dut.start.value = start
+        await FallingEdge(self.dut.clk)
+        signal.value = 0
+        self.dut.start.value = 0
+
+    async def make(self, word, start=False):
+        await self._strobe(self.dut.in_make, start, word)
+
+    async def unmake(self, start=False):
+        await self._strobe(self.dut.in_unmake, start)
+
+
+class MoveGenStreamer:
+    """
+    Streams binary positions into psudolegal_board back to back, for corpus
+    runs. start is strobed alongside the last in_pos square, and the next
+    position's serial load begins the cycle after o_uci_eop, so the board
+    never sits idle between positions. Yields (words, cycles) per position.
+    """
+
+    def __init__(self, dut, timeout=2000, legal_moves=False, ordered=False):
+        self.dut = dut
+        self.timeout = timeout
+        self.legal_moves = legal_moves
+        self.ordered = ordered
+        MoveMaker(dut)
+
+    async def stream(self, positions, wtp, castle, ep):
+        dut = self.dut
+        await FallingEdge(dut.clk)
+        dut.in_legal.value = self.legal_moves
+        dut.in_order.value = self.ordered
+        for i in range(len(positions)):
+            dut.in_wtp.value = int(wtp[i])
+            dut.in_castle.value = int(castle[i])
+            dut.in_ep.value = int(ep[i])
+            for s, square in enumerate(positions[i].tolist()):
+                dut.in_pos_valid.value = 1
+                dut.in_pos_data.value = square
+                dut.in_pos_sop.value = s == 0
+                dut.in_pos_eop.value = s == 63
+                dut.start.value = s == 63
+                await FallingEdge(dut.clk)
+            dut.in_pos_valid.value = 0
+            dut.in_pos_sop.value = 0
+            dut.in_pos_eop.value = 0
+            dut.start.value = 0
+
+            try:
+                words, cycles = await recv_moves(dut, self.timeout)
+            except Exception as e:
+                raise Exception(f"MoveGenStreamer {e} on position {i}")
+            await FallingEdge(dut.clk)
+            yield words, 64 + cycles
+
+
+def uci_lanes(dut):
+    # the moves in the lanes of o_uci_data marked by o_uci_keep, lane 0
+    # first. fen_movegen has no o_uci_keep, and one lane
+    data = dut.o_uci_data.value.integer
+    if not hasattr(dut, "o_uci_keep"):
+        return [data]
+    keep = dut.o_uci_keep.value.integer
+    return [(data >> (21 * i)) & 0x1FFFFF for i in range(len(dut.o_uci_keep)) if keep >> i & 1]
+
+
+async def recv_moves(dut, timeout=2000, ready=False):
+    """
+    Collects o_uci_data words up to o_uci_eop, from the cycle after the
+    start strobe. Unlike StreamReceiver this copes with positions that have
+    no moves, where o_uci_eop comes without o_uci_valid (mate or stalemate
+    in legal mode). With ready, only cycles with in_uci_ready high count.
+    Returns (words, cycles).
+    """
+    words = []
+    cycles = 0
+    while True:
+        await RisingEdge(dut.clk)
+        await ReadOnly()
+        cycles += 1
+        taken = not ready or dut.in_uci_ready.value
+        if taken and dut.o_uci_valid.value:
+            words += uci_lanes(dut)
+        if taken and dut.o_uci_eop.value:
+            return words, cycles
+        if cycles > timeout:
+            raise Exception(f"hit timeout after {cycles} cycles")
+
 
 #  K Q R B N P
 #  1 2 3 4 5 6   +0 black (lower case)
@@ -65,6 +189,22 @@ class StreamValueReceiver(StreamReceiver):
         return results
 
 
+def loaded_stacks(dut):
+    # where in_pos loads the piece stacks: with PING_PONG the shadow stacks,
+    # which start swaps into the board
+    if hasattr(dut, "shadow_stack"):
+        return dut.shadow_stack
+    return dut
+
+
+def loaded_square(dut, rank, file):
+    # a square of the loaded position, as for loaded_stacks. The shadow
+    # board is held in the order of the serial chain, {rank, ~file}
+    if hasattr(dut, "shadow_stack"):
+        return dut.shadow_pos.value.integer >> (4 * (rank * 8 + 7 - file)) & 0xF
+    return dut.rank[rank].file[file].movegen_square.pos.value
+
+
 def decodeItem(value):
     v = value.out_data.value.integer
     file = "abcdefgh"[v & 7]
@@ -76,9 +216,15 @@ def decodeItem(value):
     return (p, f"{file}{rank}")
 
 def encode_pseudo_legal_moves(board):
+    return encode_moves(board, board.pseudo_legal_moves)
+
+def encode_legal_moves(board):
+    return encode_moves(board, board.legal_moves)
+
+def encode_moves(board, board_moves):
     # prom_encoded = {None: 0, chess.PieceType.QUEEN: 2, chess.PieceType.ROOK: 3, chess.PieceType.BISHOP: 4, chess.PieceType.KNIGHT: 5}
     moves = set()
-    for m in board.pseudo_legal_moves:
+    for m in board_moves:
         uci = m.uci()
         p = board.piece_at(m.from_square)
         if p is not None and p.piece_type is not chess.PAWN:
@@ -92,41 +238,40 @@ def encode_binary_moves(binary_moves):
     # format is "Qa3a4" or "a3a4" for a non-promoting pawn move.
     # add "x[PQNB]" etc for taking
     # castelling specified as the king move
-    moves = set()
-    files = "abcdefgh"
-    ranks = "12345678"
-    for m in binary_moves:
-        # bit order: rank,file
-        p = TEXT_PIECE[m[17:15].integer]
-        uci = f"{files[m[14:12].integer]}{ranks[m[11:9].integer]}{files[m[5:3].integer]}{ranks[m[2:0].integer]}"
-        if p != "p":
-            uci = f"{p}{uci}"
-        if m[20]:
-            promoted_to = "qrnb"[m[19:18]]
-            uci = f"{uci}{promoted_to}"
-        moves.add(uci)
-    return moves
-
-def assert_moves_equal(binary_stream, board):
+    moves = decode_words([m.integer for m in binary_moves])
+    return set(uci(moves, piece_prefix=True))
+
+def record_failure(fen, legal_moves=False):
+    # WAVE_FAILURES names a file of the positions that failed, one JSON
+    # object a line, which test_hw runs again one at a time with waves
+    failures = os.environ.get("WAVE_FAILURES")
+    if failures:
+        with open(failures, "a") as f:
+            f.write(json.dumps({"fen": fen, "legal": legal_moves}) + "\n")
+
+def assert_moves_equal(binary_stream, board, legal_moves=False):
     bin_moves = encode_binary_moves(binary_stream)
-    board_moves = encode_pseudo_legal_moves(board)
+    board_moves = encode_legal_moves(board) if legal_moves else encode_pseudo_legal_moves(board)
     missing = board_moves - bin_moves
     extra = bin_moves - board_moves
     if missing or extra:
         print(bin_moves)
         print(board_moves)
-        raise Exception(f"mismatch moves: missing {missing}, extra {extra}")
+        record_failure(board.fen(), legal_moves)
+        raise Exception(f"mismatch moves in {board.fen()}: missing {missing}, extra {extra}")
 
 
 @cocotb.test()
 async def test_psudo_legal_moves(dut):
 
     await cocotb.start(Clock(dut.clk, 1000).start())
-    fd = BinaryBoardDriver(dut.clk, dut.in_pos_valid, dut.in_pos_data, dut.in_pos_sop, dut.in_pos_eop, None, None, dut.in_wtp, dut.in_castle, dut.in_ep)
+    fd = BinaryBoardDriver(dut.clk, dut.in_pos_valid, dut.in_pos_data, dut.in_pos_sop, dut.in_pos_eop, None, None, dut.in_wtp, dut.in_castle, dut.in_ep, dut.in_legal)
     rcv = StreamValueReceiver(
         dut.clk, dut.o_uci_valid, dut.o_uci_data, dut.o_uci_sop, dut.o_uci_eop
     )
     start_strobe = StrobeDriver(dut.clk, dut.start)
+    MoveMaker(dut)
+    stacks = loaded_stacks(dut)
     await Timer(5, units="ns")
     await RisingEdge(dut.clk)  # wait for falling edge/"negedge"
 
@@ -134,36 +279,36 @@ async def test_psudo_legal_moves(dut):
         "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
     )
     # assert pos within board squares to ensure fen serial load ordering correct
-    assert dut.rank[0].file[0].movegen_square.pos.value == BINARY_PIECE['R'] # a1 = R
-    assert dut.rank[0].file[4].movegen_square.pos.value == BINARY_PIECE['K'] # e1 = K
-    assert dut.rank[7].file[4].movegen_square.pos.value == BINARY_PIECE['k'] # e8 = k
-    assert dut.rank[7].file[0].movegen_square.pos.value == BINARY_PIECE['r'] # a8 = r
+    assert loaded_square(dut, 0, 0) == BINARY_PIECE['R'] # a1 = R
+    assert loaded_square(dut, 0, 4) == BINARY_PIECE['K'] # e1 = K
+    assert loaded_square(dut, 7, 4) == BINARY_PIECE['k'] # e8 = k
+    assert loaded_square(dut, 7, 0) == BINARY_PIECE['r'] # a8 = r
 
     # assert black move stack (last piece is top)
-    assert decodeItem(dut.item[0].movegen_piece_black) == ('p', 'h7')
-    assert decodeItem(dut.item[1].movegen_piece_black) == ('p', 'g7')
-    assert decodeItem(dut.item[2].movegen_piece_black) == ('p', 'f7')
-    assert decodeItem(dut.item[3].movegen_piece_black) == ('p', 'e7')
-    assert decodeItem(dut.item[4].movegen_piece_black) == ('p', 'd7')
-    assert decodeItem(dut.item[5].movegen_piece_black) == ('p', 'c7')
-    assert decodeItem(dut.item[6].movegen_piece_black) == ('p', 'b7')
-    assert decodeItem(dut.item[7].movegen_piece_black) == ('p', 'a7')
-    assert decodeItem(dut.item[ 8].movegen_piece_black) == ('r', 'h8')
-    assert decodeItem(dut.item[ 9].movegen_piece_black) == ('n', 'g8')
-    assert decodeItem(dut.item[10].movegen_piece_black) == ('b', 'f8')
-    assert decodeItem(dut.item[11].movegen_piece_black) == ('k', 'e8')
-    assert decodeItem(dut.item[12].movegen_piece_black) == ('q', 'd8')
-    assert decodeItem(dut.item[13].movegen_piece_black) == ('b', 'c8')
-    assert decodeItem(dut.item[14].movegen_piece_black) == ('n', 'b8')
-    assert decodeItem(dut.item[15].movegen_piece_black) == ('r', 'a8')
+    assert decodeItem(stacks.item[0].movegen_piece_black) == ('p', 'h7')
+    assert decodeItem(stacks.item[1].movegen_piece_black) == ('p', 'g7')
+    assert decodeItem(stacks.item[2].movegen_piece_black) == ('p', 'f7')
+    assert decodeItem(stacks.item[3].movegen_piece_black) == ('p', 'e7')
+    assert decodeItem(stacks.item[4].movegen_piece_black) == ('p', 'd7')
+    assert decodeItem(stacks.item[5].movegen_piece_black) == ('p', 'c7')
+    assert decodeItem(stacks.item[6].movegen_piece_black) == ('p', 'b7')
+    assert decodeItem(stacks.item[7].movegen_piece_black) == ('p', 'a7')
+    assert decodeItem(stacks.item[ 8].movegen_piece_black) == ('r', 'h8')
+    assert decodeItem(stacks.item[ 9].movegen_piece_black) == ('n', 'g8')
+    assert decodeItem(stacks.item[10].movegen_piece_black) == ('b', 'f8')
+    assert decodeItem(stacks.item[11].movegen_piece_black) == ('k', 'e8')
+    assert decodeItem(stacks.item[12].movegen_piece_black) == ('q', 'd8')
+    assert decodeItem(stacks.item[13].movegen_piece_black) == ('b', 'c8')
+    assert decodeItem(stacks.item[14].movegen_piece_black) == ('n', 'b8')
+    assert decodeItem(stacks.item[15].movegen_piece_black) == ('r', 'a8')
 
     # white move stack (last piece is top)
-    assert decodeItem(dut.item[0].movegen_piece_white) == ('r', 'h1')
-    assert decodeItem(dut.item[1].movegen_piece_white) == ('n', 'g1')
-    assert decodeItem(dut.item[2].movegen_piece_white) == ('b', 'f1')
-    assert decodeItem(dut.item[3].movegen_piece_white) == ('k', 'e1')
-    assert decodeItem(dut.item[4].movegen_piece_white) == ('q', 'd1')
-    assert decodeItem(dut.item[15].movegen_piece_white) == ('p', 'a2')
+    assert decodeItem(stacks.item[0].movegen_piece_white) == ('r', 'h1')
+    assert decodeItem(stacks.item[1].movegen_piece_white) == ('n', 'g1')
+    assert decodeItem(stacks.item[2].movegen_piece_white) == ('b', 'f1')
+    assert decodeItem(stacks.item[3].movegen_piece_white) == ('k', 'e1')
+    assert decodeItem(stacks.item[4].movegen_piece_white) == ('q', 'd1')
+    assert decodeItem(stacks.item[15].movegen_piece_white) == ('p', 'a2')
 
     await start_strobe.strobe()
     bs = await rcv.recv()
@@ -177,30 +322,30 @@ async def test_psudo_legal_moves(dut):
     )
 
     # assert black move stack (last piece is top)
-    assert decodeItem(dut.item[0].movegen_piece_black) == ('p', 'h7')
-    assert decodeItem(dut.item[1].movegen_piece_black) == ('p', 'g7')
-    assert decodeItem(dut.item[2].movegen_piece_black) == ('p', 'f7')
-    assert decodeItem(dut.item[3].movegen_piece_black) == ('p', 'e7')
-    assert decodeItem(dut.item[4].movegen_piece_black) == ('p', 'd7')
-    assert decodeItem(dut.item[5].movegen_piece_black) == ('p', 'c7')
-    assert decodeItem(dut.item[6].movegen_piece_black) == ('p', 'b7')
-    assert decodeItem(dut.item[7].movegen_piece_black) == ('p', 'a7')
-    assert decodeItem(dut.item[ 8].movegen_piece_black) == ('r', 'h8')
-    assert decodeItem(dut.item[ 9].movegen_piece_black) == ('n', 'g8')
-    assert decodeItem(dut.item[10].movegen_piece_black) == ('b', 'f8')
-    assert decodeItem(dut.item[11].movegen_piece_black) == ('k', 'e8')
-    assert decodeItem(dut.item[12].movegen_piece_black) == ('q', 'd8')
-    assert decodeItem(dut.item[13].movegen_piece_black) == ('b', 'c8')
-    assert decodeItem(dut.item[14].movegen_piece_black) == ('n', 'b8')
-    assert decodeItem(dut.item[15].movegen_piece_black) == ('r', 'a8')
+    assert decodeItem(stacks.item[0].movegen_piece_black) == ('p', 'h7')
+    assert decodeItem(stacks.item[1].movegen_piece_black) == ('p', 'g7')
+    assert decodeItem(stacks.item[2].movegen_piece_black) == ('p', 'f7')
+    assert decodeItem(stacks.item[3].movegen_piece_black) == ('p', 'e7')
+    assert decodeItem(stacks.item[4].movegen_piece_black) == ('p', 'd7')
+    assert decodeItem(stacks.item[5].movegen_piece_black) == ('p', 'c7')
+    assert decodeItem(stacks.item[6].movegen_piece_black) == ('p', 'b7')
+    assert decodeItem(stacks.item[7].movegen_piece_black) == ('p', 'a7')
+    assert decodeItem(stacks.item[ 8].movegen_piece_black) == ('r', 'h8')
+    assert decodeItem(stacks.item[ 9].movegen_piece_black) == ('n', 'g8')
+    assert decodeItem(stacks.item[10].movegen_piece_black) == ('b', 'f8')
+    assert decodeItem(stacks.item[11].movegen_piece_black) == ('k', 'e8')
+    assert decodeItem(stacks.item[12].movegen_piece_black) == ('q', 'd8')
+    assert decodeItem(stacks.item[13].movegen_piece_black) == ('b', 'c8')
+    assert decodeItem(stacks.item[14].movegen_piece_black) == ('n', 'b8')
+    assert decodeItem(stacks.item[15].movegen_piece_black) == ('r', 'a8')
 
     # white move stack (last piece is top)
-    assert decodeItem(dut.item[0].movegen_piece_white) == ('r', 'h1')
-    assert decodeItem(dut.item[1].movegen_piece_white) == ('n', 'g1')
-    assert decodeItem(dut.item[2].movegen_piece_white) == ('b', 'f1')
-    assert decodeItem(dut.item[3].movegen_piece_white) == ('k', 'e1')
-    assert decodeItem(dut.item[4].movegen_piece_white) == ('q', 'd1')
-    assert decodeItem(dut.item[15].movegen_piece_white) == ('p', 'a2')
+    assert decodeItem(stacks.item[0].movegen_piece_white) == ('r', 'h1')
+    assert decodeItem(stacks.item[1].movegen_piece_white) == ('n', 'g1')
+    assert decodeItem(stacks.item[2].movegen_piece_white) == ('b', 'f1')
+    assert decodeItem(stacks.item[3].movegen_piece_white) == ('k', 'e1')
+    assert decodeItem(stacks.item[4].movegen_piece_white) == ('q', 'd1')
+    assert decodeItem(stacks.item[15].movegen_piece_white) == ('p', 'a2')
 
     await start_strobe.strobe()
     bs = await rcv.recv()
@@ -208,6 +353,47 @@ async def test_psudo_legal_moves(dut):
 
     assert_moves_equal(bs, board)
 
+
+# Kiwipete by Peter McKenzie, a well-known test position for takes/check
+# taken from https://www.chessprogramming.org/Perft_Results
+KIWIPETE_FENS = [
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1",
+]
+
+# Peter provides perft results to a given depth, only the moves from each
+# position are checked here.
+# https://gist.github.com/peterellisjones/8c46c28141c162d1d8a0f0badbc9cff9
+PETERELLISJONES_FENS = [
+    "r6r/1b2k1bq/8/8/7B/8/8/R3K2R b KQ - 3 2",
+    # ep test - c4d3 is ep capture
+    "8/8/8/2k5/2pP4/8/B7/4K3 b - d3 0 3",
+    "r1bqkbnr/pppppppp/n7/8/8/P7/1PPPPPPP/RNBQKBNR w KQkq - 2 2",
+    # cannot castle when in check
+    "r3k2r/p1pp1pb1/bn2Qnp1/2qPN3/1p2P3/2N5/PPPBBPPP/R3K2R b KQkq - 3 2",
+    "2kr3r/p1ppqpb1/bn2Qnp1/3PN3/1p2P3/2N5/PPPBBPPP/R3K2R b KQ - 3 2",
+    # tests promotion
+    "rnb2k1r/pp1Pbppp/2p5/q7/2B5/8/PPPQNnPP/RNB1K2R w KQ - 3 9",
+    "2r5/3pk3/8/2P5/8/2K5/8/8 w - - 5 4",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1",
+    "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1",
+    "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1",
+    "5k2/8/8/8/8/8/8/4K2R w K - 0 1",
+    "3k4/8/8/8/8/8/8/R3K3 w Q - 0 1",
+    "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1",
+    "r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1",
+    "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1",
+    "8/8/1P2K3/8/2n5/1q6/8/5k2 b - - 0 1",
+    "4k3/1P6/8/8/8/8/K7/8 w - - 0 1",
+    "8/P1k5/K7/8/8/8/8/8 w - - 0 1",
+    "K1k5/8/P7/8/8/8/8/8 w - - 0 1",
+    "8/k1P5/8/1K6/8/8/8/8 w - - 0 1",
+    "8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1",
+]
+
+
 async def test_fen_moves(start_strobe, fd, rcv, fenstr):
     board = await fd.send(fenstr)
     await start_strobe.strobe()
@@ -216,66 +402,320 @@ async def test_fen_moves(start_strobe, fd, rcv, fenstr):
     assert_moves_equal(bs, board)
 
 
+def blocked_pieces(board):
+    # pieces of the side to play that the board leaves out of its move
+    # stack: every square next to them along their lines, or a knight's move
+    # away, is off the board or holds one of ours. Pawns with the square
+    # ahead taken and nothing to capture, when there is no ep square
+    def own(r, f):
+        if not (0 <= r < 8 and 0 <= f < 8):
+            return True
+        piece = board.piece_at(chess.square(f, r))
+        return piece is not None and piece.color == board.turn
+
+    def opponent(r, f):
+        if not (0 <= r < 8 and 0 <= f < 8):
+            return False
+        piece = board.piece_at(chess.square(f, r))
+        return piece is not None and piece.color != board.turn
+
+    lines = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+    diagonals = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+    knight = [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (-1, 2), (1, -2), (-1, -2)]
+    steps = {
+        chess.KING: lines + diagonals,
+        chess.QUEEN: lines + diagonals,
+        chess.ROOK: lines,
+        chess.BISHOP: diagonals,
+        chess.KNIGHT: knight,
+    }
+    blocked = 0
+    for square, piece in board.piece_map().items():
+        if piece.color != board.turn:
+            continue
+        r, f = chess.square_rank(square), chess.square_file(square)
+        if piece.piece_type == chess.PAWN:
+            ahead = r + (1 if board.turn == chess.WHITE else -1)
+            blocked += (
+                board.ep_square is None
+                and (own(ahead, f) or opponent(ahead, f))
+                and not opponent(ahead, f - 1)
+                and not opponent(ahead, f + 1)
+            )
+        else:
+            blocked += all(own(r + dr, f + df) for dr, df in steps[piece.piece_type])
+    return blocked
+
+
+class PortCounts:
+    """
+    The board's cycle counters as seen from its ports: each cycle, loading a
+    square, and idle with o_pos_ready and nothing coming in. Snapshotted on
+    each command beat, as the board snapshots its counters.
+    """
+
+    def __init__(self, dut):
+        self.dut = dut
+        self.counts = dict.fromkeys(("cycles", "idle_cycles", "load_cycles"), 0)
+        self.snapshots = []
+        cocotb.start_soon(self._run())
+
+    @staticmethod
+    def _high(handle):
+        value = handle.value
+        return value.is_resolvable and value.integer == 1
+
+    def since_last(self):
+        # counts from the last command beat but one to the last
+        before, after = self.snapshots[-2:]
+        return {name: after[name] - before[name] for name in after}
+
+    async def _run(self):
+        dut = self.dut
+        while True:
+            await RisingEdge(dut.clk)
+            await ReadOnly()
+            valid = self._high(dut.in_pos_valid)
+            command = valid and self._high(dut.in_pos_sop) and self._high(dut.in_pos_eop)
+            editing = self._high(dut.in_make) or self._high(dut.in_unmake)
+            self.counts["cycles"] += 1
+            self.counts["load_cycles"] += valid and not command
+            self.counts["idle_cycles"] += (
+                self._high(dut.o_pos_ready) and not valid and not editing
+            )
+            if command:
+                self.snapshots.append(dict(self.counts))
+
+
+@cocotb.test(skip="WAVE_CAPTURE_FEN" not in os.environ)
+async def test_capture_position(dut):
+    # one failed position on its own, run by test_hw with waves on
+    fen = os.environ["WAVE_CAPTURE_FEN"]
+    legal_moves = os.environ.get("WAVE_CAPTURE_LEGAL") == "1"
+
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    fd = BinaryBoardDriver(dut.clk, dut.in_pos_valid, dut.in_pos_data, dut.in_pos_sop, dut.in_pos_eop, None, None, dut.in_wtp, dut.in_castle, dut.in_ep, dut.in_legal)
+    rcv = StreamValueReceiver(
+        dut.clk, dut.o_uci_valid, dut.o_uci_data, dut.o_uci_sop, dut.o_uci_eop
+    )
+    start_strobe = StrobeDriver(dut.clk, dut.start)
+    MoveMaker(dut)
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    board = await fd.send(fen, legal_moves=legal_moves)
+    await start_strobe.strobe()
+    bs = await rcv.recv()
+    await Timer(5, units="ns")
+    assert_moves_equal(bs, board, legal_moves)
+
+
 @cocotb.test()
 async def test_kiwipete_moves(dut):
-    # Kiwipete by Peter McKenzie, a well-known test
-    # position for takes/check taken from
-    # https://www.chessprogramming.org/Perft_Results
-
     await cocotb.start(Clock(dut.clk, 1000).start())
-    fd = BinaryBoardDriver(dut.clk, dut.in_pos_valid, dut.in_pos_data, dut.in_pos_sop, dut.in_pos_eop, None, None, dut.in_wtp, dut.in_castle, dut.in_ep)
+    fd = BinaryBoardDriver(dut.clk, dut.in_pos_valid, dut.in_pos_data, dut.in_pos_sop, dut.in_pos_eop, None, None, dut.in_wtp, dut.in_castle, dut.in_ep, dut.in_legal)
     rcv = StreamValueReceiver(
         dut.clk, dut.o_uci_valid, dut.o_uci_data, dut.o_uci_sop, dut.o_uci_eop
     )
     start_strobe = StrobeDriver(dut.clk, dut.start)
+    MoveMaker(dut)
     await Timer(5, units="ns")
     await RisingEdge(dut.clk)
 
-    # kiwipete
-    await test_fen_moves(start_strobe, fd, rcv, "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1")
+    for fen in KIWIPETE_FENS:
+        await test_fen_moves(start_strobe, fd, rcv, fen)
 
 
 @cocotb.test()
 async def test_peterellisjones_moves(dut):
-    # Peter provides perft results to a given depth. I am ignoring the node
-    # counts and depth here since I have no make/unmake move yet.
-    # https://gist.github.com/peterellisjones/8c46c28141c162d1d8a0f0badbc9cff9
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    fd = BinaryBoardDriver(dut.clk, dut.in_pos_valid, dut.in_pos_data, dut.in_pos_sop, dut.in_pos_eop, None, None, dut.in_wtp, dut.in_castle, dut.in_ep, dut.in_legal)
+    rcv = StreamValueReceiver(
+        dut.clk, dut.o_uci_valid, dut.o_uci_data, dut.o_uci_sop, dut.o_uci_eop
+    )
+    start_strobe = StrobeDriver(dut.clk, dut.start)
+    MoveMaker(dut)
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    for fen in PETERELLISJONES_FENS:
+        await test_fen_moves(start_strobe, fd, rcv, fen)
 
+
+@cocotb.test(skip="LANES_REPORT" not in os.environ)
+async def test_lanes(dut):
+    # cycles to generate each kiwipete and peterellisjones position, for
+    # test_hw.test_lanes to compare LANES settings. o_uci_data is read lane
+    # by lane, so this runs at any LANES
+    fens = KIWIPETE_FENS + PETERELLISJONES_FENS
+    positions, wtp, castle, ep = encode_fens(fens)
+    words, offsets = pseudo_legal_words(positions, wtp, castle, ep)
+
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    streamer = MoveGenStreamer(dut)
+    results = []
+    i = 0
+    async for hw_words, cycles in streamer.stream(positions, wtp, castle, ep):
+        model_words = words[offsets[i] : offsets[i + 1]].tolist()
+        assert hw_words == model_words, fens[i]
+        results.append({"fen": fens[i], "moves": len(hw_words), "cycles": cycles})
+        i += 1
+    with open(os.environ["LANES_REPORT"], "w") as f:
+        json.dump(results, f, indent=2)
+
+
+@cocotb.test()
+async def test_perf_counters(dut):
+    # the counters read over o_uci_data after the kiwipete and
+    # peterellisjones positions, against the testbench's own counts
     await cocotb.start(Clock(dut.clk, 1000).start())
-    fd = BinaryBoardDriver(dut.clk, dut.in_pos_valid, dut.in_pos_data, dut.in_pos_sop, dut.in_pos_eop, None, None, dut.in_wtp, dut.in_castle, dut.in_ep)
+    fd = BinaryBoardDriver(dut.clk, dut.in_pos_valid, dut.in_pos_data, dut.in_pos_sop, dut.in_pos_eop, None, None, dut.in_wtp, dut.in_castle, dut.in_ep, dut.in_legal)
     rcv = StreamValueReceiver(
         dut.clk, dut.o_uci_valid, dut.o_uci_data, dut.o_uci_sop, dut.o_uci_eop
     )
     start_strobe = StrobeDriver(dut.clk, dut.start)
+    MoveMaker(dut)
+    ports = PortCounts(dut)
     await Timer(5, units="ns")
     await RisingEdge(dut.clk)
 
-    await test_fen_moves(start_strobe, fd, rcv, "r6r/1b2k1bq/8/8/7B/8/8/R3K2R b KQ - 3 2")
-    # ep test - c4d3 is ep capture
-    await test_fen_moves(start_strobe, fd, rcv, "8/8/8/2k5/2pP4/8/B7/4K3 b - d3 0 3")
-    await test_fen_moves(start_strobe, fd, rcv, "r1bqkbnr/pppppppp/n7/8/8/P7/1PPPPPPP/RNBQKBNR w KQkq - 2 2")
-    # cannot castle when in check
-    await test_fen_moves(start_strobe, fd, rcv, "r3k2r/p1pp1pb1/bn2Qnp1/2qPN3/1p2P3/2N5/PPPBBPPP/R3K2R b KQkq - 3 2")
-    await test_fen_moves(start_strobe, fd, rcv, "2kr3r/p1ppqpb1/bn2Qnp1/3PN3/1p2P3/2N5/PPPBBPPP/R3K2R b KQ - 3 2")
-    # tests promotion
-    await test_fen_moves(start_strobe, fd, rcv, "rnb2k1r/pp1Pbppp/2p5/q7/2B5/8/PPPQNnPP/RNB1K2R w KQ - 3 9")
-    await test_fen_moves(start_strobe, fd, rcv, "2r5/3pk3/8/2P5/8/2K5/8/8 w - - 5 4")
-
-    await test_fen_moves(start_strobe, fd, rcv, "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8")
-    await test_fen_moves(start_strobe, fd, rcv, "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10")
-    await test_fen_moves(start_strobe, fd, rcv, "3k4/3p4/8/K1P4r/8/8/8/8 b - - 0 1")
-
-    await test_fen_moves(start_strobe, fd, rcv, "8/8/4k3/8/2p5/8/B2P2K1/8 w - - 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "5k2/8/8/8/8/8/8/4K2R w K - 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "3k4/8/8/8/8/8/8/R3K3 w Q - 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "8/8/1P2K3/8/2n5/1q6/8/5k2 b - - 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "4k3/1P6/8/8/8/8/K7/8 w - - 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "8/P1k5/K7/8/8/8/8/8 w - - 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "K1k5/8/P7/8/8/8/8/8 w - - 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "8/k1P5/8/1K6/8/8/8/8 w - - 0 1")
-    await test_fen_moves(start_strobe, fd, rcv, "8/8/2k5/5q2/5n2/8/5K2/8 b - - 0 1")
+    async def read_counters(command=READ | CLEAR):
+        # the read starts going out before the driver returns
+        pending = cocotb.start_soon(rcv.recv())
+        await fd.command(command)
+        words = [value.integer for value in await pending]
+        await Timer(5, units="ns")
+        return decode_board(words)
+
+    await read_counters()
+    fens = KIWIPETE_FENS + PETERELLISJONES_FENS
+    moves = 0
+    skipped = 0
+    for fen in fens:
+        board = await fd.send(fen)
+        await start_strobe.strobe()
+        moves += len(await rcv.recv())
+        await Timer(5, units="ns")
+        skipped += blocked_pieces(board)
+    counters = await read_counters()
+    dut._log.info("\n" + report(counters))
+
+    assert counters["positions"] == len(fens)
+    assert counters["moves"] == moves
+    assert counters["pieces_skipped"] == skipped
+    for name, count in ports.since_last().items():
+        assert counters[name] == count, name
+    assert counters["out_stall_cycles"] == 0
+
+    # CLEAR on its own sends nothing, and a READ leaves the counts running
+    await fd.command(CLEAR)
+    first = await read_counters(READ)
+    assert first["cycles"] == ports.since_last()["cycles"]
+    second = await read_counters(READ)
+    assert second["cycles"] == ports.snapshots[-1]["cycles"] - ports.snapshots[-3]["cycles"]
+    assert second["positions"] == 0
+
+
+# en passant edge cases for the legal move mode
+LEGAL_EP_FENS = [
+    # bxc6 would open the fifth rank between the king and rook
+    "8/8/8/KPp4r/8/8/8/7k w - c6 0 2",
+    "8/8/8/8/k2Pp2Q/8/8/3K4 b - d3 0 1",
+    # exd3 takes the pawn giving check
+    "8/8/8/2k5/3Pp3/8/8/4K3 b - d3 0 1",
+    # a pawn pinned on a diagonal can only take along it
+    "8/1k6/8/8/3Pp3/8/8/4K2Q b - d3 0 1",
+    "8/7k/8/8/3Pp3/8/8/1B2K3 b - d3 0 1",
+]
+
+@cocotb.test()
+async def test_legal_moves(dut):
+    # in legal mode the board's moves match python-chess's legal moves, for
+    # the corpus positions and every position one move on from them.
+    # MoveGenStreamer copes with mates and stalemates, where o_uci_eop comes
+    # with no moves at all
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    await Timer(5, units="ns")
+
+    corpus = os.path.join(os.path.dirname(__file__), "corpus", "perft.epd")
+    boards = [chess.Board(fen) for fen in LEGAL_EP_FENS] + corpus_children(corpus)
+
+    streamer = MoveGenStreamer(dut, legal_moves=True)
+    fens = [board.fen() for board in boards]
+    i = 0
+    async for words, _ in streamer.stream(*encode_fens(fens)):
+        board = boards[i]
+        moves = set(uci(decode_words(words), piece_prefix=True))
+        expected = encode_legal_moves(board)
+        if moves != expected:
+            record_failure(fens[i], legal_moves=True)
+        assert moves == expected, f"{fens[i]}: missing {expected - moves}, extra {moves - expected}"
+        assert dut.o_in_check.value == board.is_check(), fens[i]
+        i += 1
+    assert i == len(boards)
+
+
+def move_order_key(word):
+    # in_order emits captures by most valuable victim then least valuable
+    # attacker, then promotions, then the rest. Piece codes run from king 1
+    # to pawn 6, so a lower victim code is worth more, a higher attacker less
+    takes, piece, promote = (word >> 6) & 7, (word >> 15) & 7, word >> 18
+    if takes > 1:
+        return (0, takes, -piece)
+    return (1 if promote else 2, 0, 0)
+
+def expected_takes(board, move):
+    # python-chess numbers pieces pawn 1 to king 6, the board the other way
+    if board.is_en_passant(move):
+        return 7 - chess.PAWN
+    taken = board.piece_at(move.to_square)
+    return 7 - taken.piece_type if taken else 0
+
+@cocotb.test()
+async def test_move_order(dut):
+    # with in_order the legal moves come captures first, in MVV-LVA order,
+    # then promotions then quiet moves, with the takes field filled in.
+    # Every 8th board is also run pseudo-legal against the model's words,
+    # with and without in_order, to check nothing is gained or lost
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    await Timer(5, units="ns")
+
+    corpus = os.path.join(os.path.dirname(__file__), "corpus", "perft.epd")
+    boards = [chess.Board(fen) for fen in LEGAL_EP_FENS] + corpus_children(corpus)
+    fens = [board.fen() for board in boards]
+
+    streamer = MoveGenStreamer(dut, legal_moves=True, ordered=True)
+    i = 0
+    async for words, _ in streamer.stream(*encode_fens(fens)):
+        board = boards[i]
+        moves = decode_words(words)
+        expected = encode_legal_moves(board)
+        got = set(uci(moves, piece_prefix=True))
+        assert got == expected, f"{fens[i]}: missing {expected - got}, extra {got - expected}"
+        keys = [move_order_key(w) for w in words]
+        assert keys == sorted(keys), f"{fens[i]}: out of order {uci(moves)}"
+        for m, text in zip(moves, uci(moves)):
+            takes = expected_takes(board, chess.Move.from_uci(text))
+            assert m["takes"] == takes, f"{fens[i]}: {text} takes {m['takes']} not {takes}"
+        i += 1
+    assert i == len(boards)
+
+    sample = fens[::8]
+    positions = encode_fens(sample)
+    model, offsets = pseudo_legal_words(*positions)
+    cycles = {}
+    for ordered in [False, True]:
+        streamer = MoveGenStreamer(dut, ordered=ordered)
+        cycles[ordered] = 0
+        i = 0
+        async for words, n in streamer.stream(*positions):
+            expected = model[offsets[i] : offsets[i + 1]].tolist()
+            assert sorted(words) == sorted(expected), f"{sample[i]} ordered={ordered}"
+            if not ordered:
+                assert words == expected, f"{sample[i]} not in model order"
+            cycles[ordered] += n
+            i += 1
+    dut._log.info(
+        f"{len(sample)} positions, {cycles[False] / len(sample):.1f} cycles/position, "
+        f"{cycles[True] / len(sample):.1f} with in_order"
+    )
@@ -0,0 +1,34 @@
+import os
+import socket
+
+import chess
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, Timer
+
+from cocotb_perft import BoardMoveGenerator
+from uci_bridge import encode_response
+
+# psudolegal_board as the device behind uci_bridge, run by
+# test_hw.test_uci_bridge. Connects to the Unix socket in UCI_DEVICE_SOCKET
+# and answers FEN lines until the host closes the connection.
+
+
+@cocotb.test()
+async def test_uci_device(dut):
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    generate = BoardMoveGenerator(dut)
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(os.environ["UCI_DEVICE_SOCKET"])
+    with sock, sock.makefile("rwb") as stream:
+        while True:
+            # blocks the simulator, which has nothing to do until a request
+            line = stream.readline()
+            if not line:
+                break
+            words = await generate(chess.Board(line.decode().strip()))
+            stream.write(encode_response(words))
+            stream.flush()
@@ -0,0 +1,71 @@
+import os
+
+import chess
+import chess.polyglot
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, Timer
+
+from cocotb_perft import BoardMoveGenerator
+from cocotb_psudolegal_board import LEGAL_EP_FENS, MoveGenStreamer, recv_moves
+from epd import corpus_children, read_epd
+from moveframe import decode_words, uci
+from movegen_model import encode_fens
+from zobrist import zobrist_hashes
+
+# psudolegal_board's o_hash checked against zobrist.py on the corpus, and
+# against python-chess through make/unmake, run by test_hw.test_zobrist.
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus", "perft.epd")
+
+
+@cocotb.test()
+async def test_zobrist(dut):
+    # every corpus position and every position one move on
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    await Timer(5, units="ns")
+
+    fens = list(LEGAL_EP_FENS) + [board.fen() for board in corpus_children(CORPUS)]
+    positions = encode_fens(fens)
+    expected = zobrist_hashes(*positions).tolist()
+
+    streamer = MoveGenStreamer(dut)
+    i = 0
+    async for _ in streamer.stream(*positions):
+        assert dut.o_hash.value.integer == expected[i], fens[i]
+        i += 1
+    assert i == len(fens)
+
+
+@cocotb.test()
+async def test_zobrist_make(dut):
+    # make and unmake update the hash in place, two moves deep from each root
+    await cocotb.start(Clock(dut.clk, 1000).start())
+    generate = BoardMoveGenerator(dut, legal_moves=True)
+    await Timer(5, units="ns")
+    await RisingEdge(dut.clk)
+
+    async def walk(board, words, depth):
+        for word, move in zip(words, uci(decode_words(words))):
+            child = board.copy(stack=False)
+            child.push(chess.Move.from_uci(move))
+            await generate.maker.make(word, start=True)
+            child_words, _ = await recv_moves(dut)
+            assert dut.o_hash.value.integer == chess.polyglot.zobrist_hash(
+                child
+            ), child.fen()
+            if depth > 1:
+                await Timer(5, units="ns")
+                await walk(child, child_words, depth - 1)
+            await generate.maker.unmake(start=True)
+            await recv_moves(dut)
+            assert dut.o_hash.value.integer == chess.polyglot.zobrist_hash(
+                board
+            ), board.fen()
+            await Timer(5, units="ns")
+
+    for i, position in enumerate(read_epd(CORPUS)):
+        board = chess.Board(position.fen)
+        words = await generate(board)
+        # the first few roots two deep, the rest one
+        await walk(board, words, 2 if i < 4 else 1)
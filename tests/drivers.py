@@ -1,10 +1,30 @@
 import cocotb
 import logging
+import os
 
-from cocotb.triggers import Timer, Event, RisingEdge, FallingEdge, ReadOnly
+from cocotb.triggers import (
+    Timer,
+    Event,
+    RisingEdge,
+    FallingEdge,
+    ReadOnly,
+    ClockCycles,
+    First,
+)
 from cocotb.queue import Queue
 from cocotb.binary import BinaryValue
+from cocotb.utils import get_sim_time
 import itertools
+import random
+
+# StreamDriver and StreamReceiver run in a bulk mode by default, cycle for
+# cycle the same as stepping every clock edge but with less Python per cycle:
+# the driver draws its idle schedule up front and only writes signals that
+# change, the receiver sleeps until valid rises instead of sampling idle
+# cycles. STREAM_BULK=0 steps every edge as before, STREAM_LOG=1 logs every
+# word the receivers accept.
+BULK = os.environ.get("STREAM_BULK", "1") != "0"
+LOG_WORDS = os.environ.get("STREAM_LOG", "0") != "0"
 
 
 def IdleToggler():
@@ -13,6 +33,37 @@ def IdleToggler():
         yield False
 
 
+def RandomIdler(probability, seed=None):
+    """True on a random `probability` of cycles, as a valid or ready pattern."""
+    rng = random.Random(seed)
+    while True:
+        yield rng.random() < probability
+
+
+class ReadyDriver:
+    """
+    Drives a ready signal from an idler, one value per cycle. Like a driver's
+    valid it changes just after the rising edge, so a receiver sampling in
+    ReadOnly sees the word and the ready that the next edge will take it with.
+    """
+
+    def __init__(self, clock, ready, idler=itertools.repeat(True)):
+        self.clock = clock
+        self.ready = ready
+        self.idler = idler
+        cocotb.start_soon(self._run())
+
+    async def _run(self):
+        edge = RisingEdge(self.clock)
+        last = None
+        while True:
+            ready = next(self.idler)
+            if ready != last:
+                self.ready.value = ready
+                last = ready
+            await edge
+
+
 class StreamDriver:
     """Basic 8-bit data with sop/eop markers and valid bits."""
 
@@ -32,34 +83,82 @@ class StreamDriver:
         await self.queue.put((bs, idler))
         await self.results.get()
 
+    def _idle(self):
+        self.valid.value = 0
+        self.eop.value = BinaryValue("x")
+        self.data.value = BinaryValue("x" * self.data_width)
+        self.sop.value = BinaryValue("x")
+
     async def _run(self):
         try:
-            self.valid.value = 0
-            while True:
-                bs, idler = await self.queue.get()
-                for i, b in enumerate(bs):
+            if BULK:
+                await self._run_bulk()
+            else:
+                await self._run_cycles()
+        except Exception:
+            self.log.exception("ohno")
+
+    async def _run_cycles(self):
+        self.valid.value = 0
+        while True:
+            bs, idler = await self.queue.get()
+            for i, b in enumerate(bs):
+                await RisingEdge(self.clock)
+                while not next(idler):
+                    self._idle()
                     await RisingEdge(self.clock)
-                    while not next(idler):
-                        self.valid.value = 0
-                        self.eop.value = BinaryValue("x")
-                        self.data.value = BinaryValue("x" * self.data_width)
-                        self.sop.value = BinaryValue("x")
-                        await RisingEdge(self.clock)
-                    # self.log.info(f"Write byte 0x{b:02x}")
+                # self.log.info(f"Write byte 0x{b:02x}")
+                self.valid.value = 1
+                self.data.value = b
+                self.sop.value = i == 0
+                self.eop.value = i == len(bs) - 1
+
+            await RisingEdge(self.clock)
+            self._idle()
+            await RisingEdge(self.clock)
+            await self.results.put(True)
+
+    @staticmethod
+    def schedule(bs, idler):
+        # idle cycles ahead of each byte, drawn from the idler up front
+        gaps = []
+        for _ in bs:
+            gap = 0
+            while not next(idler):
+                gap += 1
+            gaps.append(gap)
+        return gaps
+
+    async def _run_bulk(self):
+        edge = RisingEdge(self.clock)
+        self.valid.value = 0
+        while True:
+            bs, idler = await self.queue.get()
+            last = len(bs) - 1
+            markers = None  # (sop, eop) as last written, None when idle
+            for i, (b, gap) in enumerate(zip(bs, self.schedule(bs, idler))):
+                await edge
+                if gap:
+                    self._idle()
+                    markers = None
+                    await ClockCycles(self.clock, gap)
+                sop, eop = i == 0, i == last
+                if markers is None:
                     self.valid.value = 1
-                    self.data.value = b
-                    self.sop.value = i == 0
-                    self.eop.value = i == len(bs) - 1
+                    self.sop.value = sop
+                    self.eop.value = eop
+                else:
+                    if markers[0] != sop:
+                        self.sop.value = sop
+                    if markers[1] != eop:
+                        self.eop.value = eop
+                markers = (sop, eop)
+                self.data.value = b
 
-                await RisingEdge(self.clock)
-                self.valid.value = 0
-                self.eop.value = BinaryValue("x")
-                self.data.value = BinaryValue("x" * self.data_width)
-                self.sop.value = BinaryValue("x")
-                await RisingEdge(self.clock)
-                await self.results.put(True)
-        except Exception:
-            self.log.exception("ohno")
+            await edge
+            self._idle()
+            await edge
+            await self.results.put(True)
 
 
 class StrobeDriver:
@@ -94,13 +193,23 @@ class StrobeDriver:
             self.log.exception("ohno")
 
 class StreamReceiver:
-    def __init__(self, clock, valid, data, sop, eop):
+    """
+    Collects words from valid up to eop. Given a ready signal, words are only
+    taken in cycles it is high, and it is driven from ready_idler, such as
+    RandomIdler for random backpressure.
+    """
+
+    def __init__(self, clock, valid, data, sop, eop, log_words=LOG_WORDS, ready=None, ready_idler=itertools.repeat(True)):
         self.log = logging.getLogger(f"cocotb.{data._path}")
         self.clock = clock
         self.valid = valid
         self.data = data
         self.sop = sop
         self.eop = eop
+        self.log_words = log_words
+        self.ready = ready
+        if ready is not None:
+            ReadyDriver(clock, ready, ready_idler)
         self.results = Queue()
         self.timeout_queue = Queue()
         self.bursts = []
@@ -113,10 +222,38 @@ class StreamReceiver:
     def extract(self, value):
         return value.integer.to_bytes(1, "little")
 
+    def _accepted(self):
+        # called in ReadOnly after an edge, True if a word was taken
+        return bool(self.valid.value) and (self.ready is None or bool(self.ready.value))
+
     def compact(self, burst):
         return b"".join(burst)
 
+    def _sample(self, burst):
+        # called in ReadOnly after an edge with valid high, True on eop
+        if self.log_words:
+            self.log.info(f"Read byte valid={self.valid.value} data={self.data.value} sop={self.sop.value} eop={self.eop.value}")
+
+        if not burst and self.sop.value == False:
+            raise Exception("start of burst no sop")
+        burst.append(self.extract(self.data.value))
+        return bool(self.eop.value)
+
+    def _timeout(self, timeout, burst):
+        value = self.compact(burst)
+        e = Exception(
+            f"StreamReciever hit timeout after {timeout} cycles. Pending data: {value}"
+        )
+        e.value = value
+        return e
+
     async def _run(self):
+        if BULK:
+            await self._run_bulk()
+        else:
+            await self._run_cycles()
+
+    async def _run_cycles(self):
         while True:
             burst = []
             timeout = await self.timeout_queue.get()
@@ -125,19 +262,72 @@ class StreamReceiver:
                 await RisingEdge(self.clock)
                 await ReadOnly()
                 cycle = cycle + 1
-                if self.valid.value:
-                    self.log.info(f"Read byte valid={self.valid.value} data={self.data.value} sop={self.sop.value} eop={self.eop.value}")
+                if self._accepted():
+                    if self._sample(burst):
+                        await self.results.put(self.compact(burst))
+                        break
+                if cycle > timeout:
+                    raise self._timeout(timeout, burst)
 
-                    if not burst and self.sop.value == False:
-                        raise Exception("start of burst no sop")
-                    burst.append(self.extract(self.data.value))
-                    if self.eop.value:
+    async def _run_bulk(self):
+        edge = RisingEdge(self.clock)
+        valid_rise = RisingEdge(self.valid)
+        period = None
+        while True:
+            burst = []
+            timeout = await self.timeout_queue.get()
+            cycle = 0
+            last_edge = None  # time of the last clock edge sampled
+            while True:
+                if period and last_edge is not None and not self.valid.value:
+                    # valid is low, sleep until it is driven high after a
+                    # clock edge, or until the edge the timeout falls on
+                    wait = (timeout + 1 - cycle) * period
+                    await First(valid_rise, Timer(wait, units="step"))
+                    await ReadOnly()
+                    now = get_sim_time()
+                    cycle += round((now - last_edge) / period)
+                    last_edge = now
+                else:
+                    await edge
+                    await ReadOnly()
+                    now = get_sim_time()
+                    if last_edge is not None:
+                        period = now - last_edge
+                    last_edge = now
+                    cycle = cycle + 1
+                if self._accepted():
+                    if self._sample(burst):
                         await self.results.put(self.compact(burst))
                         break
                 if cycle > timeout:
-                    value = self.compact(burst)
-                    e = Exception(
-                        f"StreamReciever hit timeout after {timeout} cycles. Pending data: {value}"
-                    )
-                    e.value = value
-                    raise e
+                    raise self._timeout(timeout, burst)
+
+
+class CycleMonitor:
+    """
+    Counts rising clock edges and records the cycle numbers on which each
+    named condition was sampled true. A condition is a list of 1-bit
+    handles that must all be high, e.g. [in_valid, in_sop].
+    """
+
+    def __init__(self, clock, **conditions):
+        self.clock = clock
+        self.conditions = conditions
+        self.cycle = 0
+        self.cycles = {name: [] for name in conditions}
+        cocotb.start_soon(self._run())
+
+    @staticmethod
+    def _high(handle):
+        value = handle.value
+        return value.is_resolvable and value.integer == 1
+
+    async def _run(self):
+        while True:
+            await RisingEdge(self.clock)
+            await ReadOnly()
+            self.cycle += 1
+            for name, handles in self.conditions.items():
+                if all(self._high(h) for h in handles):
+                    self.cycles[name].append(self.cycle)
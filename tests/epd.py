@@ -0,0 +1,67 @@
+import collections
+
+import chess
+
+# EPD/perft suite reader.
+#
+# Handles the line formats used by the suites listed in the README:
+#
+#   <fen> ;D1 20 ;D2 400 ;D3 8902          perft suites
+#   <fen4> bm Nf3; id "position 1";        EPD test suites
+#
+# Blank lines and lines starting with '#' are ignored. Positions with only
+# the four EPD fields get "0 1" move counters so they parse as full FENs.
+
+EPDPosition = collections.namedtuple("EPDPosition", ["fen", "perft", "ops"])
+
+
+def parse_epd_line(line):
+    fields = line.strip()
+    if not fields or fields.startswith("#"):
+        return None
+    head, *rest = fields.split(";")
+    tokens = head.split()
+    if len(tokens) < 4:
+        raise ValueError(f"not an EPD/FEN line: {line!r}")
+    fen = tokens[:4]
+    extra = tokens[4:]
+    if len(extra) >= 2 and extra[0].isdigit() and extra[1].isdigit():
+        fen += extra[:2]
+        extra = extra[2:]
+    else:
+        fen += ["0", "1"]
+
+    perft = {}
+    ops = {}
+    if extra:
+        # EPD opcodes begin straight after the position fields
+        rest = [" ".join(extra)] + rest
+    for op in rest:
+        op = op.strip()
+        if not op:
+            continue
+        name, _, value = op.partition(" ")
+        if name[:1] == "D" and name[1:].isdigit():
+            perft[int(name[1:])] = int(value)
+        else:
+            ops[name] = value.strip().strip('"')
+    return EPDPosition(" ".join(fen), perft, ops)
+
+
+def read_epd(path):
+    with open(path) as f:
+        return [p for p in map(parse_epd_line, f) if p is not None]
+
+
+def corpus_children(path):
+    # a chess.Board for each position in path, each followed by every
+    # position one legal move on from it
+    boards = []
+    for position in read_epd(path):
+        board = chess.Board(position.fen)
+        boards.append(board)
+        for move in board.legal_moves:
+            child = board.copy(stack=False)
+            child.push(move)
+            boards.append(child)
+    return boards
@@ -0,0 +1,76 @@
+import numpy as np
+
+# Cycle-latency statistics for the latency benchmark.
+#
+# cocotb_latency records one sample per position for each measurement:
+#   board       start strobe to o_uci_eop of psudolegal_board
+#   fen_decode  in_sop to o_pos_eop of fen_decode
+#   fen_movegen in_sop to o_uci_eop of fen_movegen, FEN text to moves
+# test_hw.test_latency summarises them here and fails when the p50 or worst
+# case of a measurement is higher than in the committed baseline.
+
+BASELINE = "tests/baseline/latency.json"
+PERCENTILES = [50, 90, 99]
+GATED = ["p50", "max"]
+HISTOGRAM_BINS = 16
+
+
+def summarize(cycles):
+    cycles = np.asarray(cycles)
+    summary = {
+        "count": int(len(cycles)),
+        "min": int(cycles.min()),
+        "mean": float(cycles.mean()),
+        "max": int(cycles.max()),
+    }
+    for q in PERCENTILES:
+        # report a cycle count that was actually observed
+        summary[f"p{q}"] = int(np.percentile(cycles, q, method="higher"))
+    return summary
+
+
+def histogram(cycles, bins=HISTOGRAM_BINS):
+    cycles = np.asarray(cycles)
+    # integer-aligned buckets, so no bucket splits a cycle count
+    width = max(1, -(-(int(cycles.max()) + 1 - int(cycles.min())) // bins))
+    edges = np.arange(int(cycles.min()), int(cycles.max()) + width + 1, width)
+    counts, edges = np.histogram(cycles, bins=edges)
+    return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+
+def measurement(samples):
+    cycles = [s["cycles"] for s in samples]
+    result = {
+        "summary": summarize(cycles),
+        "histogram": histogram(cycles),
+        "samples": samples,
+    }
+    if all("moves" in s for s in samples):
+        moves = sum(s["moves"] for s in samples)
+        result["summary"]["moves"] = moves
+        result["summary"]["moves_per_cycle"] = moves / sum(cycles)
+    return result
+
+
+def regressions(report, baseline):
+    problems = []
+    for name, result in report["measurements"].items():
+        base = baseline["measurements"].get(name)
+        if base is None:
+            continue
+        for stat in GATED:
+            was, now = base["summary"][stat], result["summary"][stat]
+            if now > was:
+                problems.append(f"{name} {stat} latency {was} -> {now} cycles")
+    return problems
+
+
+def strip_samples(report):
+    # the committed baseline keeps summaries and histograms only
+    return {
+        "corpus": report["corpus"],
+        "measurements": {
+            name: {k: v for k, v in result.items() if k != "samples"}
+            for name, result in report["measurements"].items()
+        },
+    }
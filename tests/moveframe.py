@@ -0,0 +1,116 @@
+import numpy as np
+
+# Packed frames for the o_uci_data move stream, and a vectorised decoder.
+#
+# A frame carries the moves generated for one position as little-endian
+# 64-bit lanes: a header lane holding the move count, then the 21-bit words
+# packed three to a lane at bits 0, 21 and 42, the last lane zero padded.
+# Frames are concatenated back to back. A buffer of frames decodes with
+# NumPy in a single pass into MOVE_DTYPE records; UCI text is only built
+# when asked for, with uci().
+#
+# Squares are numbered rank * 8 + file as in python-chess, pieces and takes
+# use the board codes {none, king, queen, rook, bishop, knight, pawn} and
+# promote holds the piece promoted to in the same codes, 0 if none.
+
+WORD_BITS = 21
+WORDS_PER_LANE = 3
+WORD_MASK = (1 << WORD_BITS) - 1
+
+MOVE_DTYPE = np.dtype(
+    [
+        ("word", "<u4"),
+        ("piece", "u1"),
+        ("from_square", "u1"),
+        ("to_square", "u1"),
+        ("takes", "u1"),
+        ("promote", "u1"),
+    ]
+)
+
+# o_uci_data promote codes 4-7 name the piece in "qrnb" order
+PROMOTE_PIECE = np.array([0, 0, 0, 0, 2, 3, 5, 4], dtype=np.uint8)
+
+SQUARE_NAMES = np.array([f + r for r in "12345678" for f in "abcdefgh"])
+PIECE_PREFIX = np.array(["", "k", "q", "r", "b", "n", "", ""])
+PROMOTE_SUFFIX = np.array(["", "", "q", "r", "b", "n", "", ""])
+
+
+def _lane_index(counts):
+    # (lane, shift) of every word, for frames of the given move counts
+    counts = np.asarray(counts, dtype=np.int64)
+    lanes = 1 + -(-counts // WORDS_PER_LANE)
+    first_lane = np.concatenate([[0], np.cumsum(lanes)[:-1]]) + 1
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    k = np.arange(offsets[-1]) - np.repeat(offsets[:-1], counts)
+    lane = np.repeat(first_lane, counts) + k // WORDS_PER_LANE
+    shift = (k % WORDS_PER_LANE * WORD_BITS).astype(np.uint64)
+    return lane, shift, lanes, offsets
+
+
+def pack_frames(words, offsets):
+    # frames for words[offsets[i]:offsets[i + 1]], as from pseudo_legal_words
+    words = np.asarray(words, dtype=np.uint64)
+    counts = np.diff(np.asarray(offsets, dtype=np.int64))
+    lane, shift, lanes, _ = _lane_index(counts)
+    out = np.zeros(int(lanes.sum()), dtype="<u8")
+    out[np.cumsum(lanes) - lanes] = counts
+    np.bitwise_or.at(out, lane, (words & WORD_MASK) << shift)
+    return out.tobytes()
+
+
+def pack_frame(words):
+    return pack_frames(words, [0, len(words)])
+
+
+def frame_size(header):
+    # bytes in a frame, from its first 8 bytes
+    count = int.from_bytes(header[:8], "little")
+    return 8 * (1 + -(-count // WORDS_PER_LANE))
+
+
+def unpack_frames(buf):
+    # (words, offsets) of every frame in buf
+    lanes = np.frombuffer(buf, dtype="<u8")
+    if not len(lanes):
+        return np.zeros(0, dtype=np.uint32), np.zeros(1, dtype=np.int64)
+    counts = []
+    i = 0
+    while i < len(lanes):
+        counts.append(int(lanes[i]))
+        i += 1 + -(-counts[-1] // WORDS_PER_LANE)
+    if i != len(lanes):
+        raise ValueError("truncated move frame")
+    lane, shift, _, offsets = _lane_index(counts)
+    words = ((lanes[lane] >> shift) & WORD_MASK).astype(np.uint32)
+    return words, offsets
+
+
+def decode_words(words):
+    w = np.asarray(words, dtype=np.uint32)
+    moves = np.empty(len(w), dtype=MOVE_DTYPE)
+    moves["word"] = w
+    moves["piece"] = (w >> 15) & 7
+    moves["from_square"] = ((w >> 9) & 7) * 8 + ((w >> 12) & 7)
+    moves["to_square"] = (w & 7) * 8 + ((w >> 3) & 7)
+    moves["takes"] = (w >> 6) & 7
+    moves["promote"] = PROMOTE_PIECE[(w >> 18) & 7]
+    return moves
+
+
+def decode_frames(buf):
+    # (moves, offsets) of every frame in buf, moves as MOVE_DTYPE records
+    words, offsets = unpack_frames(buf)
+    return decode_words(words), offsets
+
+
+def uci(moves, piece_prefix=False):
+    # UCI text for decoded moves, with the board's piece letter in front of
+    # non-pawn moves if piece_prefix, e.g. "ke1g1", "a7a8q"
+    text = np.char.add(
+        SQUARE_NAMES[moves["from_square"]], SQUARE_NAMES[moves["to_square"]]
+    )
+    text = np.char.add(text, PROMOTE_SUFFIX[moves["promote"]])
+    if piece_prefix:
+        text = np.char.add(PIECE_PREFIX[moves["piece"]], text)
+    return text.tolist()
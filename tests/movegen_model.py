@@ -0,0 +1,271 @@
+import numpy as np
+
+from moveframe import decode_words, uci
+
+# Vectorised reference model of psudolegal_board.
+#
+# Positions come in as rows of 64 4-bit squares in serial load order
+# (a8,b8,..,h8,a7,..,h1), exactly as get_binary_board produces them, together
+# with the in_wtp, in_castle and in_ep values the board is given. The model
+# returns the 21-bit o_uci_data words the board should emit, in the order it
+# should emit them, as one flat array plus per-position offsets:
+#
+#   words[offsets[i]:offsets[i+1]] are the moves of position i
+#
+# Internally squares are numbered rank*8 + file like the board's
+# square_from/square_to buses, and a batch is expanded into an (N, 64, 64)
+# from/to move matrix built from precomputed attack tables.
+
+#  K Q R B N P
+#  1 2 3 4 5 6   +0 black (lower case)
+#  9 A B C D E   +8 white (upper case)
+KING, QUEEN, ROOK, BISHOP, KNIGHT, PAWN = 1, 2, 3, 4, 5, 6
+WHITE = 8
+
+# in_castle bits, see encode_casteling_bits
+CASTLE_WHITE_K = 1 << 3
+CASTLE_WHITE_Q = 1 << 2
+CASTLE_BLACK_K = 1 << 1
+CASTLE_BLACK_Q = 1 << 0
+
+# promotion codes emitted by the board, decoded through "qrnb"
+PROMOTE_CODES = np.array([4, 5, 6, 7], dtype=np.uint32)
+
+SQUARE_RANK = np.arange(64) // 8
+SQUARE_FILE = np.arange(64) % 8
+
+# serial load position of each square, a8 arrives first
+SQUARE_TO_SERIAL = (7 - SQUARE_RANK) * 8 + SQUARE_FILE
+
+# The move stack pops pieces in reverse load order (h1,g1,..,a1,h2,..), and
+# for each piece the arbiter grants destinations from the lowest square up.
+FROM_ORDER = np.argsort(-SQUARE_TO_SERIAL, kind="stable")
+
+# slider directions as (rank, file) steps, clockwise from N
+DIRECTIONS = [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)]
+ORTHOGONAL = np.array([dr == 0 or df == 0 for dr, df in DIRECTIONS])
+
+
+def _step_table(steps):
+    table = np.zeros((64, 64), dtype=bool)
+    for sq in range(64):
+        r, f = divmod(sq, 8)
+        for dr, df in steps:
+            if 0 <= r + dr < 8 and 0 <= f + df < 8:
+                table[sq, (r + dr) * 8 + f + df] = True
+    return table
+
+
+def _ray_table():
+    # squares along each ray in order of distance, padded with the dummy
+    # square 64 once the ray leaves the board
+    rays = np.full((len(DIRECTIONS), 64, 7), 64, dtype=np.intp)
+    for d, (dr, df) in enumerate(DIRECTIONS):
+        for sq in range(64):
+            r, f = divmod(sq, 8)
+            for k in range(7):
+                r, f = r + dr, f + df
+                if not (0 <= r < 8 and 0 <= f < 8):
+                    break
+                rays[d, sq, k] = r * 8 + f
+    return rays
+
+
+KNIGHT_ATTACKS = _step_table(
+    [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
+)
+KING_ATTACKS = _step_table(DIRECTIONS)
+WHITE_PAWN_ATTACKS = _step_table([(1, 1), (1, -1)])
+BLACK_PAWN_ATTACKS = _step_table([(-1, 1), (-1, -1)])
+RAYS = _ray_table()
+
+
+def _slider_attacks(occupied, ortho, diag):
+    # Each square casts a ray in every direction that stops on (and
+    # includes) the first occupied square, as the o_s*/i_s* interconnect does.
+    n = occupied.shape[0]
+    padded = np.concatenate([occupied, np.ones((n, 1), dtype=bool)], axis=1)
+    blockers = padded[:, RAYS]  # (N, 8, 64, 7)
+    seen = np.logical_or.accumulate(blockers, axis=-1)
+    reach = np.ones_like(blockers)
+    reach[..., 1:] = ~seen[..., :-1]
+    reach &= RAYS[None] != 64
+    moving = np.where(ORTHOGONAL[None, :, None], ortho[:, None, :], diag[:, None, :])
+    reach &= moving[..., None]
+
+    attacks = np.zeros((n, 64, 65), dtype=bool)
+    pn, pd, psq, pk = np.nonzero(reach)
+    attacks[pn, psq, RAYS[pd, psq, pk]] = True
+    return attacks[:, :, :64]
+
+
+def _attacks(piece, white, occupied):
+    # (N, 64, 64) matrix of squares attacked by the piece on each square
+    attacks = _slider_attacks(
+        occupied,
+        (piece == QUEEN) | (piece == ROOK),
+        (piece == QUEEN) | (piece == BISHOP),
+    )
+    attacks |= (piece == KNIGHT)[:, :, None] & KNIGHT_ATTACKS
+    attacks |= (piece == KING)[:, :, None] & KING_ATTACKS
+    pawn = piece == PAWN
+    attacks |= (pawn & white)[:, :, None] & WHITE_PAWN_ATTACKS
+    attacks |= (pawn & ~white)[:, :, None] & BLACK_PAWN_ATTACKS
+    return attacks
+
+
+def _castle_moves(moves, own_king, attacked, occupied, wtp, castle):
+    # (king square, rights bit, squares to be empty, squares not attacked, dest)
+    for rank, k_bit, q_bit, side in (
+        (0, CASTLE_WHITE_K, CASTLE_WHITE_Q, True),
+        (7, CASTLE_BLACK_K, CASTLE_BLACK_Q, False),
+    ):
+        e, b = rank * 8 + 4, rank * 8
+        for bit, empty, safe, dest in (
+            (k_bit, [e + 1, e + 2], [e, e + 1, e + 2], e + 2),
+            (q_bit, [b + 1, b + 2, b + 3], [e, e - 1, e - 2], e - 2),
+        ):
+            ok = (wtp == side) & ((castle & bit) != 0) & own_king[:, e]
+            ok &= ~occupied[:, empty].any(axis=1) & ~attacked[:, safe].any(axis=1)
+            moves[:, e, dest] |= ok
+
+
+def _chunk_moves(positions, wtp, castle, ep):
+    n = positions.shape[0]
+    board = positions[:, SQUARE_TO_SERIAL]
+    piece = board & 7
+    white = (board & WHITE) != 0
+    occupied = piece != 0
+    own = occupied & (white == wtp[:, None])
+    opponent = occupied & ~own
+    empty = ~occupied
+
+    attacks = _attacks(piece, white, occupied)
+    attacked = (attacks & opponent[:, :, None]).any(axis=1)
+
+    pawn = piece == PAWN
+    moves = attacks & (own & ~pawn)[:, :, None] & ~own[:, None, :]
+
+    # pawn captures, including en passant onto the empty square behind a
+    # double move. in_ep is 0 for none, otherwise 1 + file
+    ep_target = np.zeros((n, 64), dtype=bool)
+    has_ep = ep > 0
+    ep_rank = np.where(wtp, 5, 2)
+    ep_file = ep.astype(np.intp) - 1
+    ep_target[np.nonzero(has_ep)[0], (ep_rank * 8 + ep_file)[has_ep]] = True
+    ep_target &= empty
+    moves |= attacks & (own & pawn)[:, :, None] & (opponent | ep_target)[:, None, :]
+
+    # pawn pushes, with double moves from the second rank
+    forward = np.where(wtp, 8, -8)[:, None]
+    from_sq = np.broadcast_to(np.arange(64), (n, 64))
+    single_to = from_sq + forward
+    on_board = (single_to >= 0) & (single_to < 64)
+    rows = np.broadcast_to(np.arange(n)[:, None], (n, 64))
+    single = own & pawn & on_board
+    single[on_board] &= empty[rows[on_board], single_to[on_board]]
+    moves[rows[single], from_sq[single], single_to[single]] = True
+
+    start_rank = np.where(wtp, 1, 6)[:, None]
+    double = single & (SQUARE_RANK[None, :] == start_rank)
+    double_to = single_to + forward
+    double[double] &= empty[rows[double], double_to[double]]
+    moves[rows[double], from_sq[double], double_to[double]] = True
+
+    _castle_moves(moves, own & (piece == KING), attacked, occupied, wtp, castle)
+
+    # pack words in emission order
+    moves = moves[:, FROM_ORDER, :]
+    mn, mi, to = np.nonzero(moves)
+    frm = FROM_ORDER[mi]
+    mover = piece[mn, frm].astype(np.uint32)
+    takes = piece[mn, to].astype(np.uint32)
+    takes[(mover == PAWN) & ep_target[mn, to]] = PAWN
+    promote = (mover == PAWN) & ((SQUARE_RANK[to] == 0) | (SQUARE_RANK[to] == 7))
+
+    repeat = np.where(promote, 4, 1)
+    words = (
+        (mover << 15)
+        | (SQUARE_FILE[frm].astype(np.uint32) << 12)
+        | (SQUARE_RANK[frm].astype(np.uint32) << 9)
+        | (takes << 6)
+        | (SQUARE_FILE[to].astype(np.uint32) << 3)
+        | SQUARE_RANK[to].astype(np.uint32)
+    )
+    words = np.repeat(words, repeat)
+    promote = np.repeat(promote, repeat)
+    starts = np.repeat(np.cumsum(repeat) - repeat, repeat)
+    index = np.arange(len(words)) - starts
+    words[promote] |= PROMOTE_CODES[index[promote]] << 18
+
+    counts = np.bincount(np.repeat(mn, repeat), minlength=n)
+    return words, counts
+
+
+def pseudo_legal_words(positions, wtp, castle, ep, chunk=4096):
+    """
+    Generate the o_uci_data words for a batch of positions.
+
+    positions is an (N, 64) array of serial-order squares, wtp, castle and ep
+    are length N arrays of the in_wtp, in_castle and in_ep inputs. Returns
+    (words, offsets) with words as uint32 and offsets of length N+1.
+    """
+    positions = np.asarray(positions, dtype=np.uint8).reshape(-1, 64)
+    wtp = np.asarray(wtp, dtype=bool).reshape(-1)
+    castle = np.asarray(castle, dtype=np.uint8).reshape(-1)
+    ep = np.asarray(ep, dtype=np.uint8).reshape(-1)
+
+    all_words = []
+    counts = []
+    for i in range(0, positions.shape[0], chunk):
+        s = slice(i, i + chunk)
+        w, c = _chunk_moves(positions[s], wtp[s], castle[s], ep[s])
+        all_words.append(w)
+        counts.append(c)
+
+    words = np.concatenate(all_words) if all_words else np.zeros(0, np.uint32)
+    offsets = np.zeros(positions.shape[0] + 1, dtype=np.int64)
+    if counts:
+        np.cumsum(np.concatenate(counts), out=offsets[1:])
+    return words.astype(np.uint32), offsets
+
+
+FEN_PIECE = {c: i for i, c in enumerate(" kqrbnp  KQRBNP") if c != " "}
+
+
+def encode_fens(fens):
+    """
+    Convert FEN/EPD strings to the (positions, wtp, castle, ep) arrays taken by
+    pseudo_legal_words, without going through python-chess.
+    """
+    fens = list(fens)
+    positions = np.zeros((len(fens), 64), dtype=np.uint8)
+    wtp = np.zeros(len(fens), dtype=bool)
+    castle = np.zeros(len(fens), dtype=np.uint8)
+    ep = np.zeros(len(fens), dtype=np.uint8)
+    castle_bits = {
+        "K": CASTLE_WHITE_K,
+        "Q": CASTLE_WHITE_Q,
+        "k": CASTLE_BLACK_K,
+        "q": CASTLE_BLACK_Q,
+    }
+    for i, fen in enumerate(fens):
+        placement, turn, rights, ep_square = fen.split()[:4]
+        sq = 0
+        for c in placement:
+            if c.isdigit():
+                sq += int(c)
+            elif c != "/":
+                positions[i, sq] = FEN_PIECE[c]
+                sq += 1
+        if sq != 64:
+            raise ValueError(f"bad FEN placement {placement!r}")
+        wtp[i] = turn == "w"
+        castle[i] = sum(castle_bits[c] for c in rights if c in castle_bits)
+        ep[i] = 0 if ep_square == "-" else 1 + "abcdefgh".index(ep_square[0])
+    return positions, wtp, castle, ep
+
+
+def uci_from_words(words):
+    # same notation as encode_binary_moves, e.g. "Qa3a4", "a7a8q"
+    return uci(decode_words(words), piece_prefix=True)
@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from sim_cache import run
+from sources import PSUDOLEGAL_BOARD_SOURCES
+
+# Keeps one psudolegal_board simulation up as a server for move generation
+# requests (cocotb_movegen_server), so a query pays for a FEN load and the
+# moves rather than simulator startup, elaboration and reset. Clients speak
+# the uci_bridge device protocol over the Unix socket, FEN lines in and
+# moveframe frames out, and are served one request at a time in arrival
+# order. To serve from the repository root until a client sends "quit":
+#
+#   $ python tests/movegen_server.py /tmp/movegen.sock
+#   $ cd tests && python uci_bridge.py unix:/tmp/movegen.sock
+
+QUIT = b"quit\n"
+
+
+class MovegenServer:
+    """
+    Runs the server simulation in a thread. start() returns once the socket
+    takes connections, timing that as the startup cost, and stop() asks it
+    to quit and returns the per-request report it writes.
+    """
+
+    def __init__(self, path, verilog_sources, parameters=None, startup_timeout=600):
+        self.path = path
+        self.verilog_sources = verilog_sources
+        self.parameters = parameters
+        self.startup_timeout = startup_timeout
+        self.report = os.path.abspath(f"{path}.json")
+        self.startup_seconds = None
+        self.errors = []
+        self.thread = None
+
+    def _simulate(self):
+        try:
+            run(
+                verilog_sources=self.verilog_sources,
+                toplevel="psudolegal_board",
+                module="cocotb_movegen_server",
+                parameters=self.parameters,
+                extra_env={
+                    "MOVEGEN_SERVER_SOCKET": self.path,
+                    "MOVEGEN_SERVER_REPORT": self.report,
+                },
+            )
+        except BaseException as e:
+            self.errors.append(e)
+
+    def _connectable(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(self.path)
+            except OSError:
+                return False
+            return True
+
+    def start(self):
+        for stale in (self.path, self.report):
+            if os.path.exists(stale):
+                os.remove(stale)
+        begin = time.perf_counter()
+        self.thread = threading.Thread(target=self._simulate, daemon=True)
+        self.thread.start()
+        while not self._connectable():
+            if not self.thread.is_alive():
+                raise Exception(f"server simulation exited {self.errors}")
+            if time.perf_counter() - begin > self.startup_timeout:
+                raise Exception(f"server not up after {self.startup_timeout}s")
+            time.sleep(0.05)
+        self.startup_seconds = time.perf_counter() - begin
+        return self
+
+    def stop(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.path)
+            sock.sendall(QUIT)
+        self.thread.join()
+        if self.errors:
+            raise self.errors[0]
+        with open(self.report) as f:
+            return json.load(f)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        if self.thread.is_alive():
+            self.stop()
+
+
+def main(args):
+    server = MovegenServer(os.path.abspath(args.socket), PSUDOLEGAL_BOARD_SOURCES)
+    server.start()
+    print(f"serving on {args.socket}, up in {server.startup_seconds:.1f}s", flush=True)
+    server.thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="psudolegal_board simulation server")
+    parser.add_argument(
+        "socket",
+        nargs="?",
+        default=os.path.join(tempfile.gettempdir(), "movegen.sock"),
+        help="Unix socket to listen on",
+    )
+    main(parser.parse_args())
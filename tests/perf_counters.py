@@ -0,0 +1,89 @@
+# Performance counters of psudolegal_board and fen_decode, as read out over
+# their output streams, decoded into a report.
+#
+# A one beat in_pos packet is a command to psudolegal_board, and a line
+# starting "?" followed by the command digit is one to fen_decode, which
+# passes it on to a board behind it. READ sends the counters, CLEAR zeroes
+# them once read, so READ | CLEAR reads the counts since the last.
+#
+# The board sends each 32-bit counter as two 21-bit o_uci_data words,
+# {counter, half, value}, low half first. fen_decode sends each as 8
+# nibbles on o_pos_data, low nibble first, and fen_movegen passes those on
+# a nibble to an o_uci_data word.
+
+READ = 1
+CLEAR = 2
+
+BOARD_COUNTERS = (
+    "cycles",
+    "positions",
+    "moves",
+    "idle_cycles",
+    "load_cycles",
+    "setup_cycles",
+    "pieces_skipped",
+    "ray_wait_cycles",
+    "out_stall_cycles",
+)
+
+FEN_DECODE_COUNTERS = (
+    "cycles",
+    "fens",
+    "bytes",
+    "idle_cycles",
+    "output_cycles",
+)
+
+
+def fen_decode_command(command=READ | CLEAR):
+    return f"?{command}".encode()
+
+
+def decode_board(words):
+    # counters from the o_uci_data words of one board read
+    words = [int(w) for w in words]
+    if len(words) != 2 * len(BOARD_COUNTERS):
+        raise ValueError(f"expected {2 * len(BOARD_COUNTERS)} words, got {len(words)}")
+    counters = {}
+    for i, name in enumerate(BOARD_COUNTERS):
+        low, high = words[2 * i], words[2 * i + 1]
+        for half, word in enumerate((low, high)):
+            if word >> 16 != 2 * i + half:
+                raise ValueError(f"word {2 * i + half} is {word:#x}, out of order")
+        counters[name] = (high & 0xFFFF) << 16 | (low & 0xFFFF)
+    return counters
+
+
+def decode_fen_decode(nibbles):
+    # counters from the o_pos_data nibbles of one fen_decode read
+    nibbles = [int(n) for n in nibbles]
+    if len(nibbles) != 8 * len(FEN_DECODE_COUNTERS):
+        raise ValueError(
+            f"expected {8 * len(FEN_DECODE_COUNTERS)} nibbles, got {len(nibbles)}"
+        )
+    counters = {}
+    for i, name in enumerate(FEN_DECODE_COUNTERS):
+        value = 0
+        for k, nibble in enumerate(nibbles[8 * i : 8 * i + 8]):
+            if nibble > 0xF:
+                raise ValueError(f"nibble {8 * i + k} is {nibble:#x}")
+            value |= nibble << (4 * k)
+        counters[name] = value
+    return counters
+
+
+def report(counters):
+    # one line a counter, cycle counts with their share of all cycles
+    cycles = counters["cycles"]
+    lines = []
+    for name, value in counters.items():
+        line = f"{name:>18} {value:>12}"
+        if name.endswith("_cycles") and cycles:
+            line += f" {100 * value / cycles:6.1f}%"
+        lines.append(line)
+    positions = counters.get("positions", counters.get("fens"))
+    if positions:
+        lines.append(f"{'cycles/position':>18} {cycles / positions:12.1f}")
+    if counters.get("moves") and positions:
+        lines.append(f"{'moves/position':>18} {counters['moves'] / positions:12.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,147 @@
+import array
+import collections
+import time
+
+import chess
+import chess.polyglot
+
+from movegen_model import encode_fens, pseudo_legal_words
+
+# Host-side perft/divide over a pseudo-legal move generator.
+#
+# The generator is an async callable taking a chess.Board and returning the
+# 21-bit o_uci_data words for it: psudolegal_board behind the cocotb drivers
+# in cocotb_perft, or model_move_words for a software reference. The host
+# makes/unmakes moves with python-chess, drops moves that leave the king in
+# check unless the generator only gives legal moves, and recurses. Legal move
+# lists are kept in an LRU cache keyed by the position's Zobrist hash, so a
+# transposition never costs another hardware call.
+
+PERFT_STATS = ["nodes", "calls", "hits", "misses", "evictions"]
+
+
+def move_from_word(word):
+    from_sq = chess.square((word >> 12) & 7, (word >> 9) & 7)
+    to_sq = chess.square((word >> 3) & 7, word & 7)
+    promotion = None
+    if word >> 20 & 1:
+        promotion = chess.Piece.from_symbol("qrnb"[(word >> 18) & 3]).piece_type
+    return chess.Move(from_sq, to_sq, promotion)
+
+
+class MoveListCache:
+    """
+    LRU cache of legal move words per position. Memory is bounded by the
+    total number of words held, each stored as a 4-byte array item.
+    """
+
+    def __init__(self, max_words=1 << 20):
+        self.max_words = max_words
+        self.words = 0
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        words = self.entries.get(key)
+        if words is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return words
+
+    def put(self, key, words):
+        words = array.array("I", words)
+        self.entries[key] = words
+        self.words += len(words)
+        while self.words > self.max_words and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.words -= len(evicted)
+            self.evictions += 1
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class Perft:
+    def __init__(self, generate, cache=None, legal=False):
+        self.generate = generate
+        self.cache = cache if cache is not None else MoveListCache()
+        self.legal = legal
+        self.calls = 0
+
+    async def legal_moves(self, board):
+        key = chess.polyglot.zobrist_hash(board)
+        words = self.cache.get(key)
+        if words is None:
+            self.calls += 1
+            words = await self.generate(board)
+            if not self.legal:
+                words = [w for w in words if not board.is_into_check(move_from_word(w))]
+            self.cache.put(key, words)
+        return [move_from_word(w) for w in words]
+
+    async def perft(self, board, depth):
+        if depth == 0:
+            return 1
+        moves = await self.legal_moves(board)
+        if depth == 1:
+            return len(moves)
+        nodes = 0
+        for move in moves:
+            board.push(move)
+            nodes += await self.perft(board, depth - 1)
+            board.pop()
+        return nodes
+
+    async def divide(self, board, depth):
+        # node count below each root move, as printed by engines' divide
+        counts = {}
+        for move in await self.legal_moves(board):
+            board.push(move)
+            counts[move.uci()] = await self.perft(board, depth - 1)
+            board.pop()
+        return counts
+
+    async def run(self, fen, depth):
+        # perft of one position with the stats accrued by this run alone
+        before = self.stats()
+        start = time.perf_counter()
+        nodes = await self.perft(chess.Board(fen), depth)
+        seconds = time.perf_counter() - start
+        after = self.stats()
+        result = {"fen": fen, "depth": depth, "seconds": seconds}
+        result.update({k: after[k] - before[k] for k in PERFT_STATS})
+        result["nodes"] = nodes
+        return summarize(result)
+
+    def stats(self):
+        return {
+            "nodes": 0,
+            "calls": self.calls,
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+            "evictions": self.cache.evictions,
+        }
+
+
+def summarize(result):
+    lookups = result["hits"] + result["misses"]
+    result["nodes_per_second"] = (
+        result["nodes"] / result["seconds"] if result["seconds"] else 0.0
+    )
+    result["cache_hit_rate"] = result["hits"] / lookups if lookups else 0.0
+    result["calls_per_node"] = (
+        result["calls"] / result["nodes"] if result["nodes"] else 0.0
+    )
+    return result
+
+
+async def model_move_words(board):
+    # software stand-in for the hardware, with the same word format and order
+    words, _ = pseudo_legal_words(*encode_fens([board.fen()]))
+    return words.tolist()
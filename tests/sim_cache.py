@@ -0,0 +1,186 @@
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+
+import cocotb
+from cocotb_test import simulator
+
+# Content-hashed simulator build cache, a drop-in for cocotb_test's run().
+#
+# Each build lives in sim_build/cache/<config>-<content>/ where <config>
+# hashes the simulator, toplevel, parameters, defines and compile options
+# and <content> additionally hashes every source file. Runs with unchanged
+# inputs reuse the compiled model and only launch the simulation, so
+# parallel corpus shards share a single compile. When the sources of a
+# config change its older builds are evicted, and the cache as a whole keeps
+# at most SIM_CACHE_ENTRIES builds, least recently used first out.
+#
+# SIM_CACHE=0 falls back to an uncached build in the usual sim_build.
+#
+# SIM=verilator builds with Verilator instead of Icarus. VERILATOR_THREADS=N
+# builds a multithreaded model, which is a separate cache entry.
+
+CACHE_DIR = "sim_build/cache"
+CACHE_ENTRIES = int(os.environ.get("SIM_CACHE_ENTRIES", 16))
+COMPLETE = ".complete"
+
+SIMULATORS = {
+    "icarus": simulator.Icarus,
+    "verilator": simulator.Verilator,
+}
+
+# options that change what gets compiled, as opposed to how it is run
+BUILD_OPTIONS = [
+    "toplevel",
+    "toplevel_lang",
+    "includes",
+    "defines",
+    "parameters",
+    "compile_args",
+    "verilog_compile_args",
+    "extra_args",
+    "timescale",
+    "waves",
+    "make_args",
+]
+
+
+def _waves(kwargs):
+    return bool(kwargs.get("waves", int(os.getenv("WAVES", 0))))
+
+
+def build_keys(sim, kwargs):
+    config = {k: kwargs.get(k) for k in BUILD_OPTIONS}
+    config["waves"] = _waves(kwargs)
+    config["sim"] = sim
+    config["cocotb"] = cocotb.__version__
+    config["sources"] = list(kwargs.get("verilog_sources", []))
+    config_hash = hashlib.sha256(
+        json.dumps(config, sort_keys=True, default=str).encode()
+    )
+
+    content_hash = config_hash.copy()
+    for src in config["sources"]:
+        with open(src, "rb") as f:
+            content_hash.update(hashlib.sha256(f.read()).digest())
+    return config_hash.hexdigest()[:12], content_hash.hexdigest()[:12]
+
+
+def _try_lock(lock):
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _evict(config_key, keep):
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        if name == keep or not os.path.isdir(path):
+            continue
+        if name.startswith(config_key + "-"):
+            entries.append((0.0, path))  # built from older sources
+        elif os.path.exists(os.path.join(path, COMPLETE)):
+            entries.append((os.path.getmtime(os.path.join(path, COMPLETE)), path))
+    entries.sort()
+    stale = [p for t, p in entries if t == 0.0]
+    lru = [p for t, p in entries if t != 0.0]
+    stale += lru[: max(0, len(lru) + 1 - CACHE_ENTRIES)]
+    for path in stale:
+        # builds being compiled or simulated by another run hold their lock
+        with open(path + ".lock", "w") as lock:
+            if _try_lock(lock):
+                shutil.rmtree(path, ignore_errors=True)
+                os.remove(path + ".lock")
+
+
+def _run_only(cls):
+    class RunOnly(cls):
+        # the model is already compiled, keep only the simulation command
+        def build_command(self):
+            return super().build_command()[-1:]
+
+    return RunOnly
+
+
+def simulator_options(sim, kwargs):
+    kwargs = dict(kwargs)
+    if sim == "verilator":
+        # the model cannot use more threads than the process is allowed
+        threads = min(
+            int(os.getenv("VERILATOR_THREADS", 1)), len(os.sched_getaffinity(0))
+        )
+        if threads > 1:
+            kwargs["compile_args"] = list(kwargs.get("compile_args", [])) + [
+                "--threads",
+                str(threads),
+            ]
+        # compile the generated C++ in parallel
+        kwargs.setdefault("make_args", ["-j", str(os.cpu_count() or 1)])
+        if _waves(kwargs):
+            # the model is built to trace, but only does so when asked, and
+            # to the file Icarus would write
+            kwargs["plus_args"] = list(kwargs.get("plus_args", [])) + [
+                "--trace",
+                "--trace-file",
+                f"{kwargs['toplevel']}.fst",
+            ]
+    return kwargs
+
+
+@contextlib.contextmanager
+def shared_build(sim_build, build):
+    # holds a shared lock on sim_build while it is used, which keeps
+    # eviction away but lets any number of runs simulate from it at once.
+    # Only a missing build takes the lock exclusively, so one run compiles
+    # while any others wait, and checks again once it has the lock in case
+    # another run compiled it first.
+    complete = os.path.join(sim_build, COMPLETE)
+    with open(sim_build + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_SH)
+        while not os.path.exists(complete):
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if not os.path.exists(complete):
+                build()
+                open(complete, "w").close()
+            fcntl.flock(lock, fcntl.LOCK_SH)
+        os.utime(complete)
+        yield
+
+
+def run(**kwargs):
+    __tracebackhide__ = True  # Hide the traceback when using PyTest.
+
+    sim = os.getenv("SIM", "icarus")
+    kwargs = simulator_options(sim, kwargs)
+    if os.getenv("SIM_CACHE", "1") == "0" or sim not in SIMULATORS:
+        return simulator.run(**kwargs)
+    kwargs.pop("sim_build", None)
+
+    config_key, content_key = build_keys(sim, kwargs)
+    name = f"{config_key}-{content_key}"
+    sim_build = os.path.join(CACHE_DIR, name)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    def build():
+        _evict(config_key, keep=name)
+        os.makedirs(sim_build, exist_ok=True)
+        build_kwargs = dict(kwargs, compile_only=True, force_compile=True)
+        SIMULATORS[sim](sim_build=sim_build, **build_kwargs).run()
+
+    with shared_build(sim_build, build):
+        try:
+            return _run_only(SIMULATORS[sim])(sim_build=sim_build, **kwargs).run()
+        finally:
+            if _waves(kwargs):
+                # keep waves where the README says to find them, failed
+                # runs included
+                toplevel = kwargs["toplevel"]
+                waves = os.path.join(sim_build, f"{toplevel}.fst")
+                if os.path.exists(waves):
+                    shutil.copy(waves, os.path.join("sim_build", f"{toplevel}.fst"))
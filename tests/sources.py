@@ -0,0 +1,37 @@
+# Verilog sources of each simulated toplevel, relative to the repository
+# root, shared by test_hw and the long-lived movegen_server.
+
+PSUDOLEGAL_BOARD_SOURCES = [
+    "hw/onehot_to_bin.v",
+    "hw/onehot_from_bin.v",
+    "hw/psudolegal_board.sv",
+    "hw/movegen_square.sv",
+    "hw/movegen_lookup_output.sv",
+    "hw/movegen_pst.sv",
+    "hw/movegen_eval.sv",
+    "hw/movegen_zobrist_key.sv",
+    "hw/movegen_rankfile.sv",
+    "hw/movegen_piece_stack.sv",
+    "hw/arbiter.v",
+    "hw/stream_fifo.sv",
+]
+
+MULTICORE_SOURCES = PSUDOLEGAL_BOARD_SOURCES + [
+    "hw/movegen_multicore.sv",
+]
+
+FEN_DECODE_SOURCES = [
+    "hw/fen_decode.sv",
+    "hw/ascii_int_to_bin.sv",
+    "hw/onehot_to_bin.v",
+]
+
+FEN_DECODE_WIDE_SOURCES = [
+    "hw/fen_decode_wide.sv",
+]
+
+FEN_MOVEGEN_SOURCES = PSUDOLEGAL_BOARD_SOURCES + [
+    "hw/fen_decode.sv",
+    "hw/ascii_int_to_bin.sv",
+    "hw/fen_movegen.sv",
+]
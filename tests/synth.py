@@ -0,0 +1,119 @@
+import json
+import os
+import subprocess
+
+# Area and fmax tracking for the RTL, run by test_hw.test_synth.
+#
+# Each design is synthesised for each ECP5 target by yosys, without
+# flattening so cells can be counted per module, and then placed and routed
+# out of context by nextpnr, which reports the clock it closes at. The
+# results go in one report, which is checked against the committed baseline
+# so a change that costs area or frequency fails the test.
+#
+#   cells   cells of the whole design by type, from yosys stat
+#   modules cells per module definition. Parameterised modules, such as
+#           the 64 movegen_square, are summed over their variants
+#   fmax    achieved MHz per clock, from nextpnr
+
+BASELINE = "tests/baseline/synth.json"
+
+# the ECP5 fusesoc targets, as set up in fpgachess.core
+TARGETS = {
+    "ecp5_evn": ["--um5g-85k", "--package", "CABGA381"],
+    "orangecrab_r0.2": ["--25k", "--package", "CSFBGA285"],
+}
+
+# cells counted for the area gate, and how much either may move
+AREA_CELLS = ["LUT4", "TRELLIS_FF", "CCU2C", "DP16KD"]
+AREA_TOLERANCE = 0.02
+FMAX_TOLERANCE = 0.05
+
+
+def yosys_script(sources, top, netlist, stat, parameters=None):
+    reads = "\n".join(f"read_verilog -sv {source}" for source in sources)
+    chparams = "".join(
+        f"chparam -set {name} {value} {top}\n"
+        for name, value in (parameters or {}).items()
+    )
+    return (
+        f"{reads}\n"
+        f"{chparams}"
+        f"synth_ecp5 -top {top} -noflatten -json {netlist}\n"
+        f"tee -q -o {stat} stat -json\n"
+    )
+
+
+def run_yosys(sources, top, build_dir, parameters=None):
+    os.makedirs(build_dir, exist_ok=True)
+    netlist = os.path.join(build_dir, f"{top}.json")
+    stat = os.path.join(build_dir, f"{top}_stat.json")
+    script = os.path.join(build_dir, f"{top}.ys")
+    with open(script, "w") as f:
+        f.write(yosys_script(sources, top, netlist, stat, parameters))
+    with open(os.path.join(build_dir, "yosys.log"), "w") as log:
+        subprocess.run(
+            ["yosys", "-q", "-s", script], check=True, stdout=log, stderr=log
+        )
+    with open(stat) as f:
+        return netlist, json.load(f)
+
+
+def run_nextpnr(netlist, target, build_dir, freq=48, seed=1):
+    report = os.path.join(build_dir, "nextpnr_report.json")
+    command = ["nextpnr-ecp5", *TARGETS[target], "--json", netlist]
+    command += ["--out-of-context", "--freq", str(freq), "--seed", str(seed)]
+    command += ["--report", report]
+    with open(os.path.join(build_dir, "nextpnr.log"), "w") as log:
+        subprocess.run(command, check=True, stdout=log, stderr=log)
+    with open(report) as f:
+        return json.load(f)
+
+
+def module_name(name):
+    # \fen_decode, or $paramod\movegen_square\RANK=1\FILE=1 for a variant
+    parts = [p for p in name.split("\\") if p and not p.startswith("$")]
+    return parts[0] if parts else name
+
+
+def parse_stat(stat):
+    modules = {}
+    for name, module in stat["modules"].items():
+        base = modules.setdefault(module_name(name), {"variants": 0, "cells": 0})
+        base["variants"] += 1
+        base["cells"] += module["num_cells"]
+    return {
+        "cells": dict(stat["design"]["num_cells_by_type"]),
+        "modules": dict(sorted(modules.items())),
+    }
+
+
+def parse_nextpnr(report):
+    return {
+        "fmax": {
+            clock: round(timing["achieved"], 2)
+            for clock, timing in report.get("fmax", {}).items()
+        },
+        "utilisation": {
+            bel: usage["used"]
+            for bel, usage in report.get("utilisation", {}).items()
+            if usage["used"]
+        },
+    }
+
+
+def regressions(report, baseline):
+    problems = []
+    for name, result in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for cell in AREA_CELLS:
+            was = base["cells"].get(cell, 0)
+            now = result["cells"].get(cell, 0)
+            if now > was * (1 + AREA_TOLERANCE):
+                problems.append(f"{name} {cell} {was} -> {now}")
+        for clock, was in base["fmax"].items():
+            now = result["fmax"].get(clock, 0.0)
+            if now < was * (1 - FMAX_TOLERANCE):
+                problems.append(f"{name} {clock} fmax {was} -> {now} MHz")
+    return problems
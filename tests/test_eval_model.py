@@ -0,0 +1,31 @@
+import chess
+
+from eval_model import evaluate, move_delta
+
+
+def test_start_position_is_level():
+    assert evaluate(chess.Board()) == 0
+    board = chess.Board()
+    board.push_uci("e2e4")
+    assert evaluate(board) == -40
+
+
+def test_mirrored_position_scores_the_same():
+    board = chess.Board(
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+    )
+    assert evaluate(board) == evaluate(board.mirror())
+
+
+def test_move_delta_matches_evaluate():
+    # castling, en passant and promotion with capture among them
+    for fen in [
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "8/8/8/2k5/2pP4/8/B7/4K3 b - d3 0 3",
+        "rnb2k1r/pp1Pbppp/2p5/q7/2B5/8/PPPQNnPP/RNB1K2R w KQ - 1 8",
+    ]:
+        board = chess.Board(fen)
+        for move in board.pseudo_legal_moves:
+            after = board.copy(stack=False)
+            after.push(move)
+            assert move_delta(board, move) == -evaluate(after) - evaluate(board)
@@ -1,5 +1,33 @@
-from cocotb_test.simulator import run, Icarus
+from cocotb_test.simulator import Icarus
 from cocotb_test import simulator
+import asyncio
+import concurrent.futures
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+
+import chess
+import numpy as np
+import pytest
+
+from epd import read_epd
+import latency
+import synth
+from perft import summarize
+from sim_cache import run
+from sources import (
+    FEN_DECODE_SOURCES,
+    FEN_DECODE_WIDE_SOURCES,
+    FEN_MOVEGEN_SOURCES,
+    MULTICORE_SOURCES,
+    PSUDOLEGAL_BOARD_SOURCES,
+)
+from movegen_model import encode_fens, pseudo_legal_words
+from movegen_server import MovegenServer
+from uci_bridge import DeviceClient, UCIBridge, open_device
 
 
 class IcarusAutoTimescale(Icarus):
@@ -14,30 +42,751 @@ class IcarusAutoTimescale(Icarus):
 
 def test_fen_decode():
     run(
-        verilog_sources=[
-            "hw/fen_decode.sv",
-            "hw/ascii_int_to_bin.sv",
-            "hw/onehot_to_bin.v",
-        ],
+        verilog_sources=FEN_DECODE_SOURCES,
         toplevel="fen_decode",
         module="cocotb_fen_decode",
     )
 
+def test_fen_decode_wide():
+    # fen_decode_wide must decode the corpus exactly as fen_decode does
+    os.makedirs("sim_build/fen_decode_wide", exist_ok=True)
+    record = os.path.abspath("sim_build/fen_decode_wide/fen_decode.json")
+    run(
+        verilog_sources=FEN_DECODE_SOURCES,
+        toplevel="fen_decode",
+        module="cocotb_fen_decode_wide",
+        testcase="test_record_fen_decode",
+        extra_env={"FEN_DECODE_RECORD": record},
+    )
+    results = []
+    for n in [4, 8]:
+        report = os.path.abspath(f"sim_build/fen_decode_wide/bytes_{n}.json")
+        run(
+            verilog_sources=FEN_DECODE_WIDE_SOURCES,
+            toplevel="fen_decode_wide",
+            module="cocotb_fen_decode_wide",
+            testcase="test_fen_decode_wide",
+            parameters={"BYTES": n},
+            extra_env={"FEN_DECODE_RECORD": record, "FEN_DECODE_WIDE_REPORT": report},
+        )
+        with open(report) as f:
+            results.append(json.load(f))
+    for result in results:
+        print(
+            f"{result['bytes']} bytes/cycle: {result['cycles_per_fen']:.1f} cycles/FEN, "
+            f"fen_decode {result['fen_decode_cycles_per_fen']:.1f}"
+        )
+    with open("sim_build/fen_decode_wide_report.json", "w") as f:
+        json.dump(results, f, indent=2)
+
+def test_fen_movegen():
+    run(
+        verilog_sources=FEN_MOVEGEN_SOURCES,
+        toplevel="fen_movegen",
+        module="cocotb_fen_movegen",
+    )
+
+def wave_name(fen):
+    return fen.replace("/", "_").replace(" ", "_")
+
+
+def run_capturing_waves(**kwargs):
+    # runs without waves. Each position failing assert_moves_equal is then
+    # run again on its own with waves, to sim_build/waves/<fen>.fst
+    os.makedirs("sim_build/waves", exist_ok=True)
+    failures = os.path.abspath(f"sim_build/waves/{kwargs['module']}_failures.jsonl")
+    if os.path.exists(failures):
+        os.remove(failures)
+    extra_env = dict(kwargs.pop("extra_env", {}), WAVE_FAILURES=failures)
+    try:
+        run(**kwargs, extra_env=extra_env)
+    finally:
+        if os.path.exists(failures):
+            with open(failures) as f:
+                for line in f:
+                    capture_waves(json.loads(line), **kwargs)
+
+
+def capture_waves(failure, **kwargs):
+    waves = f"sim_build/{kwargs['toplevel']}.fst"
+    if os.path.exists(waves):
+        os.remove(waves)
+    try:
+        run(
+            **dict(kwargs, module="cocotb_psudolegal_board"),
+            testcase="test_capture_position",
+            waves=True,
+            extra_env={
+                "WAVE_CAPTURE_FEN": failure["fen"],
+                "WAVE_CAPTURE_LEGAL": "1" if failure["legal"] else "0",
+            },
+        )
+    except SystemExit:
+        pass  # the position fails again, as expected
+    if os.path.exists(waves):
+        shutil.move(waves, f"sim_build/waves/{wave_name(failure['fen'])}.fst")
+
+
 def test_psudo_legal_moves():
+    run_capturing_waves(
+        verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
+        toplevel="psudolegal_board",
+        module="cocotb_psudolegal_board",
+    )
+
+def test_eval():
     run(
-        verilog_sources=[
-            "hw/onehot_to_bin.v",
-            "hw/onehot_from_bin.v",
-            "hw/psudolegal_board.sv",
-            "hw/movegen_square.sv",
-            "hw/movegen_lookup_output.sv",
-            "hw/movegen_rankfile.sv",
-            "hw/movegen_piece_stack.sv",
-            "hw/arbiter.v",
+        verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
+        toplevel="psudolegal_board",
+        module="cocotb_eval",
+    )
+
+def test_zobrist():
+    run(
+        verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
+        toplevel="psudolegal_board",
+        module="cocotb_zobrist",
+    )
+
+
+def run_corpus_shard(corpus, shard, shards, parameters=None):
+    # shards share one cached build of the board, only reports are per shard
+    os.makedirs("sim_build/corpus", exist_ok=True)
+    tag = "".join(f"_{k}_{v}" for k, v in (parameters or {}).items())
+    report = os.path.abspath(f"sim_build/corpus/shard_{shard}{tag}.json")
+    if os.path.exists(report):
+        os.remove(report)
+    try:
+        run(
+            verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
+            toplevel="psudolegal_board",
+            module="cocotb_corpus",
+            parameters=parameters,
+            extra_env={
+                "CORPUS": os.path.abspath(corpus),
+                "CORPUS_SHARD": str(shard),
+                "CORPUS_SHARDS": str(shards),
+                "CORPUS_REPORT": report,
+            },
+        )
+    except SystemExit:
+        pass  # mismatches are recorded in the shard report
+    if not os.path.exists(report):
+        return {"shard": shard, "error": "simulation did not complete"}
+    with open(report) as f:
+        return json.load(f)
+
+
+def merge_corpus_reports(corpus, shard_results, wall):
+    totals = {"positions": 0, "passed": 0, "failed": 0, "cycles": 0, "moves": 0}
+    failures = []
+    sim = max((r.get("wall_seconds", 0.0) for r in shard_results), default=0.0)
+    for result in shard_results:
+        for key in totals:
+            totals[key] += result.get(key, 0)
+        failures += result.get("failures", [])
+    return {
+        "corpus": corpus,
+        "shards": len(shard_results),
+        **totals,
+        "errors": [r for r in shard_results if "error" in r],
+        "wall_seconds": wall,
+        "positions_per_second": totals["positions"] / wall if wall else 0.0,
+        # throughput of the simulation alone, excluding compile and startup
+        "sim_positions_per_second": totals["positions"] / sim if sim else 0.0,
+        "moves_per_cycle": totals["moves"] / totals["cycles"] if totals["cycles"] else 0.0,
+        "cycles_per_position": totals["cycles"] / totals["positions"] if totals["positions"] else 0.0,
+        "shard_results": [
+            {k: v for k, v in r.items() if k != "failures"} for r in shard_results
         ],
+        "failures": failures,
+    }
+
+
+def test_corpus():
+    # CORPUS=path/to/suite.epd CORPUS_SHARDS=16 pytest tests/test_hw.py::test_corpus
+    corpus = os.environ.get("CORPUS", "tests/corpus/perft.epd")
+    count = len(read_epd(corpus))
+    shards = int(os.environ.get("CORPUS_SHARDS", os.cpu_count() or 1))
+    shards = max(1, min(shards, count))
+
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(shards) as pool:
+        shard_results = list(
+            pool.map(run_corpus_shard, [corpus] * shards, range(shards), [shards] * shards)
+        )
+    report = merge_corpus_reports(corpus, shard_results, time.perf_counter() - start)
+
+    os.makedirs("sim_build", exist_ok=True)
+    with open("sim_build/corpus_report.json", "w") as f:
+        json.dump(report, f, indent=2)
+    print(
+        f"corpus {corpus}: {report['passed']}/{report['positions']} passed on "
+        f"{shards} shards, {report['sim_positions_per_second']:.1f} positions/s, "
+        f"{report['cycles_per_position']:.1f} cycles/position"
+    )
+    assert not report["errors"], report["errors"]
+    assert report["failed"] == 0, report["failures"]
+
+
+def test_multicore():
+    # MULTICORE_CORES=1,2,4,8 pytest -s tests/test_hw.py::test_multicore
+    corpus = os.environ.get("MULTICORE_CORPUS", "tests/corpus/perft.epd")
+    counts = [int(n) for n in os.environ.get("MULTICORE_CORES", "1,2,4").split(",")]
+    os.makedirs("sim_build/multicore", exist_ok=True)
+    results = []
+    for cores in counts:
+        report = os.path.abspath(f"sim_build/multicore/cores_{cores}.json")
+        run(
+            verilog_sources=MULTICORE_SOURCES,
+            toplevel="movegen_multicore",
+            module="cocotb_multicore",
+            parameters={"CORES": cores},
+            extra_env={
+                "MULTICORE_CORPUS": os.path.abspath(corpus),
+                "MULTICORE_CORES": str(cores),
+                "MULTICORE_REPORT": report,
+            },
+        )
+        with open(report) as f:
+            results.append(json.load(f))
+
+    base = results[0]["moves_per_cycle"]
+    for result in results:
+        result["speedup"] = result["moves_per_cycle"] / base
+        print(
+            f"{result['cores']:>2} cores: {result['moves_per_cycle']:.3f} moves/cycle "
+            f"{result['cycles_per_position']:.1f} cycles/position x{result['speedup']:.2f}"
+        )
+    with open("sim_build/multicore_report.json", "w") as f:
+        json.dump({"corpus": corpus, "results": results}, f, indent=2)
+    assert all(not r["failures"] for r in results)
+
+
+def test_slide_segment():
+    # SLIDE_SEGMENTS=8,4,2,1 pytest -s tests/test_hw.py::test_slide_segment
+    corpus = os.environ.get("CORPUS", "tests/corpus/perft.epd")
+    segments = [int(n) for n in os.environ.get("SLIDE_SEGMENTS", "8,4,1").split(",")]
+    results = []
+    for segment in segments:
+        result = run_corpus_shard(corpus, 0, 1, {"SLIDE_SEGMENT": segment})
+        assert "error" not in result, (segment, result)
+        assert result["failed"] == 0, (segment, result["failures"])
+        result["slide_segment"] = segment
+        result["cycles_per_position"] = result["cycles"] / result["positions"]
+        results.append(result)
+
+    base = results[0]["cycles_per_position"]
+    for result in results:
+        result["cycle_ratio"] = result["cycles_per_position"] / base
+        print(
+            f"SLIDE_SEGMENT {result['slide_segment']}: "
+            f"{result['cycles_per_position']:.1f} cycles/position x{result['cycle_ratio']:.2f}"
+        )
+    with open("sim_build/slide_segment_report.json", "w") as f:
+        json.dump({"corpus": corpus, "results": results}, f, indent=2)
+
+    # and the rest of the board's tests, legal moves included, with a
+    # register at every square
+    run_capturing_waves(
+        verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
         toplevel="psudolegal_board",
         module="cocotb_psudolegal_board",
-        waves=True,
+        parameters={"SLIDE_SEGMENT": 1},
     )
 
 
+def test_lanes():
+    # LANES=1,2,4 pytest -s tests/test_hw.py::test_lanes
+    corpus = os.environ.get("CORPUS", "tests/corpus/perft.epd")
+    lanes = [int(n) for n in os.environ.get("LANES", "1,2,4").split(",")]
+    os.makedirs("sim_build/lanes", exist_ok=True)
+    results = []
+    for n in lanes:
+        report = os.path.abspath(f"sim_build/lanes/lanes_{n}.json")
+        run(
+            verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
+            toplevel="psudolegal_board",
+            module="cocotb_psudolegal_board",
+            testcase="test_lanes",
+            parameters={"LANES": n},
+            extra_env={"LANES_REPORT": report},
+        )
+        with open(report) as f:
+            positions = json.load(f)
+        result = run_corpus_shard(corpus, 0, 1, {"LANES": n})
+        assert "error" not in result, (n, result)
+        assert result["failed"] == 0, (n, result["failures"])
+        results.append(
+            {
+                "lanes": n,
+                "positions": positions,
+                "cycles_per_position": sum(p["cycles"] for p in positions)
+                / len(positions),
+                # less the 64 cycles of the serial load
+                "generate_cycles_per_position": sum(p["cycles"] - 64 for p in positions)
+                / len(positions),
+                "corpus_cycles_per_position": result["cycles"] / result["positions"],
+            }
+        )
+
+    base = results[0]
+    for result in results:
+        result["cycle_ratio"] = result["cycles_per_position"] / base["cycles_per_position"]
+        print(
+            f"LANES {result['lanes']}: "
+            f"{result['cycles_per_position']:.1f} cycles/position x{result['cycle_ratio']:.2f}, "
+            f"{result['generate_cycles_per_position']:.1f} after the load, "
+            f"corpus {result['corpus_cycles_per_position']:.1f}"
+        )
+    with open("sim_build/lanes_report.json", "w") as f:
+        json.dump({"corpus": corpus, "results": results}, f, indent=2)
+
+
+def test_backpressure():
+    # OUT_FIFO_DEPTHS=2,4,6,8 READY_FRACTIONS=1.0,0.1,0.01 pytest -s tests/test_hw.py::test_backpressure
+    corpus = os.environ.get("CORPUS", "tests/corpus/perft.epd")
+    depths = [int(n) for n in os.environ.get("OUT_FIFO_DEPTHS", "2,4,6").split(",")]
+    readies = [float(p) for p in os.environ.get("READY_FRACTIONS", "1.0,0.5,0.1").split(",")]
+    os.makedirs("sim_build/backpressure", exist_ok=True)
+    results = []
+    for depth in depths:
+        for ready in readies:
+            report = os.path.abspath(f"sim_build/backpressure/depth_{depth}_ready_{ready}.json")
+            run(
+                verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
+                toplevel="psudolegal_board",
+                module="cocotb_backpressure",
+                parameters={"OUT_FIFO_DEPTH_LOG2": depth},
+                extra_env={
+                    "BACKPRESSURE_CORPUS": os.path.abspath(corpus),
+                    "BACKPRESSURE_READY": str(ready),
+                    "BACKPRESSURE_REPORT": report,
+                },
+            )
+            with open(report) as f:
+                result = json.load(f)
+            result["fifo_entries"] = 1 << depth
+            # moves per cycle the consumer could take
+            result["ready_used"] = result["moves_per_cycle"] / ready
+            results.append(result)
+            print(
+                f"FIFO {result['fifo_entries']} ready {ready}: "
+                f"{result['moves_per_cycle']:.3f} moves/cycle, {result['ready_used']:.0%} of ready cycles used"
+            )
+    with open("sim_build/backpressure_report.json", "w") as f:
+        json.dump({"corpus": corpus, "results": results}, f, indent=2)
+
+
+def test_ping_pong():
+    # CORPUS=tests/corpus/perft.epd pytest -s tests/test_hw.py::test_ping_pong
+    corpus = os.environ.get("CORPUS", "tests/corpus/perft.epd")
+    os.makedirs("sim_build/ping_pong", exist_ok=True)
+    results = []
+    for shadow in (0, 1):
+        report = os.path.abspath(f"sim_build/ping_pong/ping_pong_{shadow}.json")
+        run(
+            verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
+            toplevel="psudolegal_board",
+            module="cocotb_ping_pong",
+            parameters={"PING_PONG": shadow},
+            extra_env={
+                "PING_PONG_CORPUS": os.path.abspath(corpus),
+                "PING_PONG_SHADOW": str(shadow),
+                "PING_PONG_REPORT": report,
+            },
+        )
+        with open(report) as f:
+            results.append(json.load(f))
+
+    base, shadowed = results
+    # without the shadow board each position costs its 64 cycle serial load
+    # plus its generation, with it the longer of the two, as the load
+    # overlaps the last position's generation. A few cycles are allowed for
+    # the swap and the start handshake.
+    generate = base["cycles_per_position"] - 64
+    bound = max(64, generate)
+    shadowed["overlapped"] = base["cycles_per_position"] - shadowed["cycles_per_position"]
+    for result in results:
+        print(
+            f"PING_PONG {int(result['ping_pong'])}: "
+            f"{result['cycles_per_position']:.1f} cycles/position"
+        )
+    print(
+        f"{shadowed['overlapped']:.1f} cycles/position overlapped, "
+        f"bound max(64, {generate:.1f}) = {bound:.1f}"
+    )
+    assert shadowed["cycles_per_position"] < bound + 4, results
+    with open("sim_build/ping_pong_report.json", "w") as f:
+        json.dump({"corpus": corpus, "results": results}, f, indent=2)
+
+    # and the rest of the board's tests, with every position swapped in
+    # from the shadow board, its score and hash included
+    run_capturing_waves(
+        verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
+        toplevel="psudolegal_board",
+        module="cocotb_psudolegal_board",
+        parameters={"PING_PONG": 1},
+    )
+    for module in ("cocotb_eval", "cocotb_zobrist"):
+        run(
+            verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
+            toplevel="psudolegal_board",
+            module=module,
+            parameters={"PING_PONG": 1},
+        )
+
+
+def run_latency(toplevel, verilog_sources, testcase, corpus):
+    os.makedirs("sim_build/latency", exist_ok=True)
+    report = os.path.abspath(f"sim_build/latency/{toplevel}.json")
+    run(
+        verilog_sources=verilog_sources,
+        toplevel=toplevel,
+        module="cocotb_latency",
+        testcase=testcase,
+        extra_env={
+            "LATENCY_CORPUS": os.path.abspath(corpus),
+            "LATENCY_REPORT": report,
+        },
+    )
+    with open(report) as f:
+        return latency.measurement(json.load(f))
+
+
+def test_latency():
+    # LATENCY_UPDATE_BASELINE=1 pytest tests/test_hw.py::test_latency
+    corpus = os.environ.get("LATENCY_CORPUS", "tests/corpus/perft.epd")
+    report = {
+        "corpus": corpus,
+        "measurements": {
+            "board": run_latency(
+                "psudolegal_board",
+                PSUDOLEGAL_BOARD_SOURCES,
+                "test_board_latency",
+                corpus,
+            ),
+            "fen_decode": run_latency(
+                "fen_decode",
+                FEN_DECODE_SOURCES,
+                "test_fen_decode_latency",
+                corpus,
+            ),
+            "fen_movegen": run_latency(
+                "fen_movegen",
+                FEN_MOVEGEN_SOURCES,
+                "test_fen_movegen_latency",
+                corpus,
+            ),
+        },
+    }
+    with open("sim_build/latency_report.json", "w") as f:
+        json.dump(report, f, indent=2)
+    for name, result in report["measurements"].items():
+        summary = result["summary"]
+        print(
+            f"{name}: p50 {summary['p50']} p99 {summary['p99']} "
+            f"max {summary['max']} cycles over {summary['count']} positions"
+        )
+
+    if os.environ.get("LATENCY_UPDATE_BASELINE"):
+        os.makedirs(os.path.dirname(latency.BASELINE), exist_ok=True)
+        with open(latency.BASELINE, "w") as f:
+            json.dump(latency.strip_samples(report), f, indent=2)
+            f.write("\n")
+        return
+
+    with open(latency.BASELINE) as f:
+        baseline = json.load(f)
+    if baseline["corpus"] != corpus:
+        pytest.skip(f"baseline was recorded on {baseline['corpus']}")
+    problems = latency.regressions(report, baseline)
+    assert not problems, problems
+
+
+@pytest.mark.skipif(
+    not os.environ.get("SYNTH_BENCHMARK"), reason="set SYNTH_BENCHMARK=1 to run"
+)
+def test_synth():
+    # SYNTH_BENCHMARK=1 SYNTH_UPDATE_BASELINE=1 pytest -s tests/test_hw.py::test_synth
+    if not (shutil.which("yosys") and shutil.which("nextpnr-ecp5")):
+        pytest.skip("yosys and nextpnr-ecp5 are not installed")
+    designs = {
+        "board": ("psudolegal_board", PSUDOLEGAL_BOARD_SOURCES, {}),
+        "board_slide4": ("psudolegal_board", PSUDOLEGAL_BOARD_SOURCES, {"SLIDE_SEGMENT": 4}),
+        "fen_decode": ("fen_decode", FEN_DECODE_SOURCES, {}),
+    }
+    report = {"results": {}}
+    for name, (top, sources, parameters) in designs.items():
+        for target in synth.TARGETS:
+            build_dir = f"sim_build/synth/{name}/{target}"
+            netlist, stat = synth.run_yosys(sources, top, build_dir, parameters)
+            result = synth.parse_stat(stat)
+            pnr = synth.run_nextpnr(netlist, target, build_dir)
+            result.update(synth.parse_nextpnr(pnr))
+            report["results"][f"{name}/{target}"] = result
+            print(f"{name}/{target}: {result['cells']} fmax {result['fmax']}")
+    with open("sim_build/synth_report.json", "w") as f:
+        json.dump(report, f, indent=2)
+
+    if os.environ.get("SYNTH_UPDATE_BASELINE"):
+        os.makedirs(os.path.dirname(synth.BASELINE), exist_ok=True)
+        with open(synth.BASELINE, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        return
+
+    if not os.path.exists(synth.BASELINE):
+        pytest.skip("no baseline, record one with SYNTH_UPDATE_BASELINE=1")
+    with open(synth.BASELINE) as f:
+        baseline = json.load(f)
+    problems = synth.regressions(report, baseline)
+    assert not problems, problems
+
+
+def test_perft():
+    # PERFT_DEPTH=3 PERFT_DIVIDE=1 pytest -o log_cli=True tests/test_hw.py::test_perft
+    corpus = os.environ.get("PERFT_CORPUS", "tests/corpus/perft.epd")
+    depth = int(os.environ.get("PERFT_DEPTH", 2))
+    report = os.path.abspath("sim_build/perft_positions.json")
+    run(
+        verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
+        toplevel="psudolegal_board",
+        module="cocotb_perft",
+        testcase="test_perft",
+        extra_env={
+            "PERFT_CORPUS": os.path.abspath(corpus),
+            "PERFT_DEPTH": str(depth),
+            "PERFT_REPORT": report,
+        },
+    )
+    with open(report) as f:
+        positions = json.load(f)
+
+    totals = {"corpus": corpus, "depth": depth}
+    for key in ["nodes", "calls", "hits", "misses", "seconds"]:
+        totals[key] = sum(p[key] for p in positions)
+    totals = summarize(totals)
+    with open("sim_build/perft_report.json", "w") as f:
+        json.dump(dict(totals, positions=positions), f, indent=2)
+    print(
+        f"perft({depth}) {totals['nodes']} nodes, {totals['nodes_per_second']:.0f} nodes/s, "
+        f"cache hit rate {totals['cache_hit_rate']:.2f}, "
+        f"{totals['calls_per_node']:.4f} hardware calls/node"
+    )
+    assert all(p["nodes"] == p["expected"] for p in positions)
+
+
+def test_perft_make():
+    # the board walks the tree itself by make/unmake, from each loaded root
+    corpus = os.environ.get("PERFT_CORPUS", "tests/corpus/perft.epd")
+    depth = int(os.environ.get("PERFT_DEPTH", 2))
+    report = os.path.abspath("sim_build/perft_make_positions.json")
+    run(
+        verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
+        toplevel="psudolegal_board",
+        module="cocotb_perft",
+        testcase="test_perft_make",
+        extra_env={
+            "PERFT_CORPUS": os.path.abspath(corpus),
+            "PERFT_DEPTH": str(depth),
+            "PERFT_REPORT": report,
+        },
+    )
+    with open(report) as f:
+        positions = json.load(f)
+
+    totals = {"corpus": corpus, "depth": depth}
+    for key in ["nodes", "calls", "cycles", "seconds"]:
+        totals[key] = sum(p[key] for p in positions)
+    totals["cycles_per_call"] = totals["cycles"] / totals["calls"]
+    with open("sim_build/perft_make_report.json", "w") as f:
+        json.dump(dict(totals, positions=positions), f, indent=2)
+    print(
+        f"perft({depth}) {totals['nodes']} nodes by make/unmake, "
+        f"{totals['calls']} move lists at {totals['cycles_per_call']:.1f} cycles each"
+    )
+    assert all(p["nodes"] == p["expected"] for p in positions)
+
+
+async def uci_session(conn, commands):
+    reader, writer = await asyncio.open_connection(sock=conn)
+    device = DeviceClient(reader, writer)
+    bridge = UCIBridge(device)
+    output = []
+    for command in commands:
+        lines = await bridge.handle(command)
+        print("\n".join(lines))
+        output.append(lines)
+    await device.close()
+    return output
+
+
+def test_uci_bridge(tmp_path):
+    # the bridge runs here, the board in a simulator behind a Unix socket
+    path = str(tmp_path / "device.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    server.settimeout(600)
+
+    errors = []
+
+    def simulate():
+        try:
+            run(
+                verilog_sources=PSUDOLEGAL_BOARD_SOURCES,
+                toplevel="psudolegal_board",
+                module="cocotb_uci_device",
+                extra_env={"UCI_DEVICE_SOCKET": path},
+            )
+        except BaseException as e:
+            errors.append(e)
+
+    sim = threading.Thread(target=simulate)
+    sim.start()
+    with server:
+        conn, _ = server.accept()
+    output = asyncio.run(
+        uci_session(
+            conn,
+            [
+                "position startpos",
+                "go perft 2",
+                "position fen r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                "go perft 2",
+            ],
+        )
+    )
+    sim.join()
+    assert not errors, errors
+    assert "Nodes searched: 400" in output[1]
+    assert "Nodes searched: 2039" in output[3]
+
+
+async def movegen_client(path, fens, window=8):
+    reader, writer = await open_device(f"unix:{path}")
+    device = DeviceClient(reader, writer, window=window)
+    words = await asyncio.gather(*(device.generate(chess.Board(fen)) for fen in fens))
+    await device.close()
+    return words, device.latencies
+
+
+async def movegen_clients(path, fens, clients):
+    return await asyncio.gather(*(movegen_client(path, fens) for _ in range(clients)))
+
+
+def test_movegen_server(tmp_path):
+    # MOVEGEN_CLIENTS=8 pytest -s tests/test_hw.py::test_movegen_server
+    corpus = os.environ.get("CORPUS", "tests/corpus/perft.epd")
+    clients = int(os.environ.get("MOVEGEN_CLIENTS", 4))
+    fens = [p.fen for p in read_epd(corpus)]
+    words, offsets = pseudo_legal_words(*encode_fens(fens))
+    expected = [words[offsets[i] : offsets[i + 1]].tolist() for i in range(len(fens))]
+
+    path = str(tmp_path / "movegen.sock")
+    with MovegenServer(path, PSUDOLEGAL_BOARD_SOURCES) as server:
+        # one request at a time, then the clients all at once
+        alone_words, alone = asyncio.run(movegen_client(path, fens, window=1))
+        begin = time.perf_counter()
+        results = asyncio.run(movegen_clients(path, fens, clients))
+        wall = time.perf_counter() - begin
+        served = server.stop()
+
+    assert alone_words == expected
+    queued = []
+    for client_words, client_latencies in results:
+        assert client_words == expected
+        queued += client_latencies
+    alone = np.array(alone) * 1000
+    queued = np.array(queued) * 1000
+    report = {
+        "corpus": corpus,
+        "startup_seconds": server.startup_seconds,
+        "cycles_per_request": sum(r["cycles"] for r in served) / len(served),
+        "latency_ms": {"p50": np.percentile(alone, 50), "max": alone.max()},
+        "clients": clients,
+        "requests": len(queued),
+        "requests_per_second": len(queued) / wall,
+        # behind the other clients' requests
+        "queued_latency_ms": {"p50": np.percentile(queued, 50), "max": queued.max()},
+    }
+    print(
+        f"startup {report['startup_seconds']:.2f}s, then {report['latency_ms']['p50']:.1f}ms "
+        f"a request. {clients} clients at once get {report['requests_per_second']:.0f} requests/s, "
+        f"latency p50 {report['queued_latency_ms']['p50']:.1f}ms"
+    )
+    with open("sim_build/movegen_server_report.json", "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def test_movegen_server_no_moves(tmp_path):
+    # a board with no moves, here no pieces at all, is answered with an
+    # empty list, and the connection goes on to the next request
+    fens = ["8/8/8/8/8/8/8/8 w - - 0 1", chess.STARTING_FEN]
+    words, _ = pseudo_legal_words(*encode_fens(fens[1:]))
+    path = str(tmp_path / "movegen.sock")
+    with MovegenServer(path, PSUDOLEGAL_BOARD_SOURCES) as server:
+        results, _ = asyncio.run(movegen_client(path, fens, window=2))
+        server.stop()
+    assert results == [[], words.tolist()]
+
+
+def simulator_engines():
+    # (name, SIM, VERILATOR_THREADS) for every simulator found on the PATH
+    engines = []
+    if shutil.which("iverilog"):
+        engines.append(("icarus", "icarus", 1))
+    if shutil.which("verilator"):
+        cores = len(os.sched_getaffinity(0))
+        threads = os.environ.get("BENCH_THREADS", "1,2,4")
+        for n in sorted({int(t) for t in threads.split(",")}):
+            if n <= cores:
+                name = "verilator" if n == 1 else f"verilator-mt{n}"
+                engines.append((name, "verilator", n))
+    return engines
+
+
+@pytest.mark.skipif(
+    not os.environ.get("SIM_BENCHMARK"), reason="set SIM_BENCHMARK=1 to run"
+)
+def test_simulator_benchmark(monkeypatch):
+    # SIM_BENCHMARK=1 BENCH_THREADS=1,4 pytest -s tests/test_hw.py::test_simulator_benchmark
+    corpus = os.environ.get("CORPUS", "tests/corpus/perft.epd")
+    engines = simulator_engines()
+    if not engines:
+        pytest.skip("no simulator installed")
+
+    results = []
+    for name, sim, threads in engines:
+        monkeypatch.setenv("SIM", sim)
+        monkeypatch.setenv("VERILATOR_THREADS", str(threads))
+        # shard wall time is taken inside the testbench, so builds are not timed
+        result = run_corpus_shard(corpus, 0, 1)
+        assert "error" not in result, (name, result)
+        assert result["failed"] == 0, (name, result["failures"])
+        results.append(
+            {
+                "engine": name,
+                "simulator": sim,
+                "threads": threads,
+                "positions": result["positions"],
+                "cycles": result["cycles"],
+                "wall_seconds": result["wall_seconds"],
+                "cycles_per_second": result["cycles"] / result["wall_seconds"],
+                "positions_per_second": result["positions_per_second"],
+            }
+        )
+
+    base = results[0]["cycles_per_second"]
+    for result in results:
+        result["speedup"] = result["cycles_per_second"] / base
+        print(
+            f"{result['engine']:>14}: {result['cycles_per_second']:10.0f} cycles/s "
+            f"{result['positions_per_second']:8.1f} positions/s "
+            f"x{result['speedup']:.2f}"
+        )
+
+    os.makedirs("sim_build", exist_ok=True)
+    with open("sim_build/simulator_benchmark.json", "w") as f:
+        json.dump({"corpus": corpus, "engines": results}, f, indent=2)
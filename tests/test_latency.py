@@ -0,0 +1,32 @@
+from latency import histogram, measurement, regressions, summarize
+
+
+def test_summarize():
+    summary = summarize([10, 20, 30, 40])
+    assert summary["count"] == 4
+    assert summary["min"] == 10 and summary["max"] == 40
+    assert summary["p50"] == 30  # an observed cycle count, not 25
+    assert summary["mean"] == 25.0
+
+
+def test_histogram():
+    h = histogram([10, 11, 12, 40], bins=4)
+    assert sum(h["counts"]) == 4
+    assert all(isinstance(e, int) for e in h["edges"])
+    assert h["edges"][0] == 10 and h["edges"][-1] > 40
+
+
+def test_regressions():
+    samples = [{"cycles": c, "moves": 20} for c in (30, 40, 50)]
+    baseline = {"measurements": {"board": measurement(samples)}}
+    assert baseline["measurements"]["board"]["summary"]["moves_per_cycle"] == 0.5
+
+    faster = [{"cycles": c, "moves": 20} for c in (20, 40, 50)]
+    report = {"measurements": {"board": measurement(faster)}}
+    assert regressions(report, baseline) == []
+
+    slower = [{"cycles": c, "moves": 20} for c in (30, 40, 51)]
+    report = {
+        "measurements": {"board": measurement(slower), "new": measurement(slower)}
+    }
+    assert regressions(report, baseline) == ["board max latency 50 -> 51 cycles"]
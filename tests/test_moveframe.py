@@ -0,0 +1,82 @@
+import chess
+import numpy as np
+import pytest
+
+from epd import read_epd
+from moveframe import (
+    decode_frames,
+    decode_words,
+    pack_frame,
+    pack_frames,
+    uci,
+    unpack_frames,
+)
+from movegen_model import encode_fens, pseudo_legal_words
+from perft import move_from_word
+
+
+def corpus_words():
+    fens = [p.fen for p in read_epd("tests/corpus/perft.epd")]
+    return fens, *pseudo_legal_words(*encode_fens(fens))
+
+
+def test_frame_roundtrip():
+    rng = np.random.default_rng(1)
+    counts = [0, 1, 2, 3, 4, 7, 0, 218]
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    words = rng.integers(0, 1 << 21, offsets[-1], dtype=np.uint32)
+    buf = pack_frames(words, offsets)
+    # a header lane per frame, then three words to a lane
+    assert len(buf) == 8 * sum(1 + -(-n // 3) for n in counts)
+    got, got_offsets = unpack_frames(buf)
+    assert got.tolist() == words.tolist()
+    assert got_offsets.tolist() == offsets.tolist()
+    assert unpack_frames(pack_frame([]))[0].tolist() == []
+
+
+def test_no_frames():
+    words, offsets = unpack_frames(b"")
+    assert words.dtype == np.uint32 and words.tolist() == []
+    assert offsets.tolist() == [0]
+    moves, offsets = decode_frames(b"")
+    assert len(moves) == 0 and offsets.tolist() == [0]
+
+
+def test_truncated_frame():
+    with pytest.raises(ValueError):
+        unpack_frames(pack_frame([1, 2, 3, 4])[:-8])
+
+
+def test_decode_fields():
+    fens, words, offsets = corpus_words()
+    moves, got_offsets = decode_frames(pack_frames(words, offsets))
+    assert got_offsets.tolist() == offsets.tolist()
+    assert moves["word"].tolist() == words.tolist()
+    for fen, i, j in zip(fens, offsets[:-1], offsets[1:]):
+        board = chess.Board(fen)
+        for m in moves[i:j]:
+            move = move_from_word(int(m["word"]))
+            assert (m["from_square"], m["to_square"]) == (
+                move.from_square,
+                move.to_square,
+            )
+            # board piece codes, against python-chess piece letters
+            promote = move.promotion and chess.piece_symbol(move.promotion)
+            assert " kqrbnp"[m["promote"]].strip() == (promote or "")
+            piece = board.piece_at(move.from_square).symbol().lower()
+            assert " kqrbnp"[m["piece"]] == piece
+
+
+def test_uci():
+    fens, words, offsets = corpus_words()
+    moves = decode_words(words)
+    text = uci(moves)
+    for fen, i, j in zip(fens, offsets[:-1], offsets[1:]):
+        board = chess.Board(fen)
+        assert set(text[i:j]) == {m.uci() for m in board.pseudo_legal_moves}
+    # white king castling, and a pawn promoting to a knight
+    assert uci(decode_words([(1 << 15) | (4 << 12) | (6 << 3), 0x1B7C3F])) == [
+        "e1g1",
+        "h7h8n",
+    ]
+    assert uci(decode_words([(1 << 15) | (4 << 12) | (6 << 3)]), True) == ["ke1g1"]
@@ -0,0 +1,88 @@
+import random
+
+import chess
+import numpy as np
+
+from cocotb_fen_decode import get_binary_board
+from cocotb_psudolegal_board import encode_casteling_bits, encode_pseudo_legal_moves
+from movegen_model import encode_fens, pseudo_legal_words, uci_from_words
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1",
+    "r6r/1b2k1bq/8/8/7B/8/8/R3K2R b KQ - 3 2",
+    "8/8/8/2k5/2pP4/8/B7/4K3 b - d3 0 3",
+    "r3k2r/p1pp1pb1/bn2Qnp1/2qPN3/1p2P3/2N5/PPPBBPPP/R3K2R b KQkq - 3 2",
+    "rnb2k1r/pp1Pbppp/2p5/q7/2B5/8/PPPQNnPP/RNB1K2R w KQ - 3 9",
+    "8/8/1k6/2b5/2pP4/8/5K2/8 b - d3 0 1",
+    "r3k2r/1b4bq/8/8/8/8/7B/R3K2R w KQkq - 0 1",
+    "r3k2r/8/3Q4/8/8/5q2/8/R3K2R b KQkq - 0 1",
+    "2K2r2/4P3/8/8/8/8/8/3k4 w - - 0 1",
+    "rn2k2r/8/8/8/8/8/8/RN2K2R w KQkq - 0 1",
+]
+
+
+def random_positions(count, seed=1):
+    rng = random.Random(seed)
+    fens = []
+    board = chess.Board()
+    while len(fens) < count:
+        moves = list(board.legal_moves)
+        if not moves or board.fullmove_number > 80:
+            board = chess.Board()
+            continue
+        board.push(rng.choice(moves))
+        fens.append(board.fen())
+    return fens
+
+
+def test_encode_fens_matches_binary_board():
+    fens = FENS + random_positions(50)
+    positions, wtp, castle, ep = encode_fens(fens)
+    for i, fen in enumerate(fens):
+        board = chess.Board(fen)
+        assert positions[i].tobytes() == get_binary_board(board)
+        assert wtp[i] == (board.turn == chess.WHITE)
+        assert castle[i] == encode_casteling_bits(board)
+
+
+def test_model_matches_python_chess():
+    fens = FENS + random_positions(500)
+    words, offsets = pseudo_legal_words(*encode_fens(fens), chunk=64)
+    assert len(offsets) == len(fens) + 1
+    for i, fen in enumerate(fens):
+        moves = uci_from_words(words[offsets[i] : offsets[i + 1]])
+        assert len(moves) == len(set(moves))
+        assert set(moves) == encode_pseudo_legal_moves(chess.Board(fen)), fen
+
+
+def test_model_word_fields():
+    # kiwipete, black to play: b4c3 takes a knight, a1 rook is never moved
+    # and the g2 pawn can take h3
+    fen = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R b KQkq - 0 1"
+    words, offsets = pseudo_legal_words(*encode_fens([fen]))
+    by_uci = dict(zip(uci_from_words(words), words.tolist()))
+    assert by_uci["b4c3"] == (6 << 15) | (1 << 12) | (3 << 9) | (5 << 6) | (2 << 3) | 2
+    assert by_uci["ke8g8"] >> 6 & 7 == 0
+    assert by_uci["h3g2"] >> 6 & 7 == 6
+
+    # promotions are emitted as four consecutive words, q r n b
+    words, _ = pseudo_legal_words(*encode_fens(["8/P1k5/K7/8/8/8/8/8 w - - 0 1"]))
+    promotions = [w for w in words.tolist() if w >> 20]
+    assert [(w >> 18) & 7 for w in promotions] == [4, 5, 6, 7]
+
+
+def test_model_emission_order():
+    # pieces pop from the move stack in reverse load order (h1 first),
+    # destinations come out from the lowest square
+    words, _ = pseudo_legal_words(*encode_fens(["4k3/8/8/8/8/8/8/R3K3 w Q - 0 1"]))
+    moves = uci_from_words(words)
+    assert moves[:6] == ["ke1c1", "ke1d1", "ke1f1", "ke1d2", "ke1e2", "ke1f2"]
+    assert all(m.startswith("ra1") for m in moves[6:])
+
+
+def test_model_empty_batch():
+    words, offsets = pseudo_legal_words(np.zeros((0, 64)), [], [], [])
+    assert len(words) == 0
+    assert offsets.tolist() == [0]
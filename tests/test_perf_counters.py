@@ -0,0 +1,50 @@
+import pytest
+
+from perf_counters import (
+    BOARD_COUNTERS,
+    FEN_DECODE_COUNTERS,
+    decode_board,
+    decode_fen_decode,
+    fen_decode_command,
+    report,
+)
+
+
+def board_words(values):
+    words = []
+    for i, value in enumerate(values):
+        words += [(2 * i) << 16 | value & 0xFFFF, (2 * i + 1) << 16 | value >> 16]
+    return words
+
+
+def test_decode_board():
+    values = [0x12345678, 3, 0x10000, 0xFFFF, 192, 9, 0, 1, 0xFFFFFFFF]
+    counters = decode_board(board_words(values))
+    assert list(counters) == list(BOARD_COUNTERS)
+    assert list(counters.values()) == values
+
+    with pytest.raises(ValueError):
+        decode_board(board_words(values)[:-1])
+    swapped = board_words(values)
+    swapped[0], swapped[1] = swapped[1], swapped[0]
+    with pytest.raises(ValueError):
+        decode_board(swapped)
+
+
+def test_decode_fen_decode():
+    values = [0x89ABCDEF, 2, 170, 0, 130]
+    nibbles = [v >> (4 * k) & 0xF for v in values for k in range(8)]
+    counters = decode_fen_decode(nibbles)
+    assert list(counters) == list(FEN_DECODE_COUNTERS)
+    assert list(counters.values()) == values
+    with pytest.raises(ValueError):
+        decode_fen_decode(nibbles[:-8])
+    assert fen_decode_command() == b"?3"
+
+
+def test_report():
+    counters = dict(zip(BOARD_COUNTERS, [1000, 10, 300, 250, 640, 30, 5, 0, 0]))
+    lines = report(counters).splitlines()
+    assert lines[3].split() == ["idle_cycles", "250", "25.0%"]
+    assert lines[-2].split() == ["cycles/position", "100.0"]
+    assert lines[-1].split() == ["moves/position", "30.0"]
@@ -0,0 +1,76 @@
+import asyncio
+
+import chess
+
+from perft import MoveListCache, Perft, model_move_words, move_from_word
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+# https://www.chessprogramming.org/Perft_Results
+PERFT_RESULTS = [
+    (chess.STARTING_FEN, 3, 8902),
+    (KIWIPETE, 2, 2039),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", 3, 2812),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", 2, 264),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", 2, 1486),
+]
+
+
+def test_move_from_word():
+    # a7a8 promoting to a knight, then e1g1
+    word = (1 << 20) | (2 << 18) | (6 << 15) | (0 << 12) | (6 << 9) | (0 << 3) | 7
+    assert move_from_word(word) == chess.Move.from_uci("a7a8n")
+    word = (1 << 15) | (4 << 12) | (0 << 9) | (6 << 3) | 0
+    assert move_from_word(word) == chess.Move.from_uci("e1g1")
+
+
+def test_perft_results():
+    perft = Perft(model_move_words)
+    for fen, depth, nodes in PERFT_RESULTS:
+        result = asyncio.run(perft.run(fen, depth))
+        assert result["nodes"] == nodes, fen
+
+
+def test_legal_generator():
+    # a generator that already drops moves into check, like the board in
+    # its legal move mode, is trusted as is
+    async def legal_words(board):
+        words = await model_move_words(board)
+        return [w for w in words if board.is_legal(move_from_word(w))]
+
+    perft = Perft(legal_words, legal=True)
+    for fen, depth, nodes in PERFT_RESULTS:
+        assert asyncio.run(perft.run(fen, depth))["nodes"] == nodes, fen
+
+
+def test_divide():
+    perft = Perft(model_move_words)
+    counts = asyncio.run(perft.divide(chess.Board(KIWIPETE), 2))
+    assert len(counts) == 48
+    assert sum(counts.values()) == 2039
+    assert counts["e1g1"] == 43
+
+
+def test_transpositions_are_cached():
+    perft = Perft(model_move_words)
+    first = asyncio.run(perft.run(chess.STARTING_FEN, 3))
+    assert first["calls"] == 1 + 20 + 400
+    # 1. Nf3 Nf6 2. Nc3 and 1. Nc3 Nf6 2. Nf3 meet at ply 3, of the 8902
+    # positions there only 5362 are distinct
+    deeper = asyncio.run(perft.run(chess.STARTING_FEN, 4))
+    assert deeper["nodes"] == 197281
+    assert deeper["calls"] == 5362
+    assert deeper["cache_hit_rate"] > 0.0
+
+    again = asyncio.run(perft.run(chess.STARTING_FEN, 4))
+    assert again["calls"] == 0 and again["cache_hit_rate"] == 1.0
+
+
+def test_cache_is_bounded():
+    cache = MoveListCache(max_words=100)
+    for key in range(10):
+        cache.put(key, range(30))
+    assert cache.words <= 100
+    assert list(cache.entries) == [7, 8, 9]
+    assert cache.get(7) is not None and cache.get(0) is None
+    assert cache.evictions == 7
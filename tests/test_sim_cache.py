@@ -0,0 +1,46 @@
+import multiprocessing
+import os
+import time
+
+from sim_cache import build_keys, shared_build
+
+
+def test_build_keys(tmp_path):
+    src = tmp_path / "top.sv"
+    src.write_text("module top(); endmodule\n")
+    kwargs = {"verilog_sources": [str(src)], "toplevel": "top", "module": "a"}
+
+    config, content = build_keys("icarus", kwargs)
+    # the cocotb test module is picked at run time, builds are shared
+    assert build_keys("icarus", dict(kwargs, module="b")) == (config, content)
+
+    assert build_keys("verilator", kwargs)[0] != config
+    assert build_keys("icarus", dict(kwargs, parameters={"N": 2}))[0] != config
+
+    src.write_text("module top(); wire x; endmodule\n")
+    assert build_keys("icarus", kwargs) == (config, build_keys("icarus", kwargs)[1])
+    assert build_keys("icarus", kwargs)[1] != content
+
+
+def _hold_build(sim_build, seconds):
+    def build():
+        os.makedirs(sim_build, exist_ok=True)
+        with open(os.path.join(os.path.dirname(sim_build), "builds"), "a") as f:
+            f.write("build\n")
+        time.sleep(seconds)
+
+    with shared_build(sim_build, build):
+        start = time.monotonic()
+        time.sleep(seconds)
+        return start, time.monotonic()
+
+
+def test_shared_build(tmp_path):
+    # runs of one build compile it once, then simulate side by side
+    sim_build = str(tmp_path / "build")
+    with multiprocessing.Pool(4) as pool:
+        spans = pool.starmap(_hold_build, [(sim_build, 0.5)] * 4)
+    assert (tmp_path / "builds").read_text() == "build\n"
+    # every run was simulating at once, rather than one after another
+    starts, ends = zip(*spans)
+    assert max(starts) < min(ends), spans
@@ -0,0 +1,68 @@
+from synth import module_name, parse_nextpnr, parse_stat, regressions, yosys_script
+
+STAT = {
+    "modules": {
+        "\\fen_decode": {"num_cells": 120},
+        "$paramod\\movegen_square\\RANK=1\\FILE=1": {"num_cells": 40},
+        "$paramod\\movegen_square\\RANK=1\\FILE=2": {"num_cells": 42},
+    },
+    "design": {"num_cells": 202, "num_cells_by_type": {"LUT4": 150, "TRELLIS_FF": 52}},
+}
+
+NEXTPNR = {
+    "fmax": {"$glbnet$clk": {"achieved": 61.2345, "constraint": 48.0}},
+    "utilisation": {
+        "TRELLIS_SLICE": {"used": 80, "available": 12144},
+        "DP16KD": {"used": 0, "available": 56},
+    },
+}
+
+
+def result(luts, fmax):
+    return {"cells": {"LUT4": luts, "TRELLIS_FF": 52}, "fmax": {"clk": fmax}}
+
+
+def test_module_name():
+    assert module_name("\\fen_decode") == "fen_decode"
+    assert module_name("$paramod\\movegen_square\\RANK=1\\FILE=1") == "movegen_square"
+    assert module_name("$paramod$3b1f\\movegen_piece_stack") == "movegen_piece_stack"
+
+
+def test_parse_stat():
+    parsed = parse_stat(STAT)
+    assert parsed["cells"] == {"LUT4": 150, "TRELLIS_FF": 52}
+    assert parsed["modules"]["movegen_square"] == {"variants": 2, "cells": 82}
+    assert parsed["modules"]["fen_decode"] == {"variants": 1, "cells": 120}
+
+
+def test_parse_nextpnr():
+    parsed = parse_nextpnr(NEXTPNR)
+    assert parsed["fmax"] == {"$glbnet$clk": 61.23}
+    assert parsed["utilisation"] == {"TRELLIS_SLICE": 80}
+
+
+def test_yosys_script():
+    script = yosys_script(["hw/a.sv", "hw/b.v"], "top", "out.json", "stat.json")
+    assert "read_verilog -sv hw/b.v" in script
+    assert "synth_ecp5 -top top -noflatten -json out.json" in script
+    assert "chparam" not in script
+    script = yosys_script(["hw/a.sv"], "top", "out.json", "stat.json", {"N": 4})
+    assert "chparam -set N 4 top\nsynth_ecp5" in script
+
+
+def test_regressions():
+    baseline = {"results": {"board/ecp5_evn": result(1000, 50.0)}}
+    # within the tolerances, and a design the baseline does not have
+    report = {
+        "results": {
+            "board/ecp5_evn": result(1010, 48.0),
+            "new/ecp5_evn": result(5000, 1.0),
+        }
+    }
+    assert regressions(report, baseline) == []
+
+    report = {"results": {"board/ecp5_evn": result(1100, 40.0)}}
+    assert regressions(report, baseline) == [
+        "board/ecp5_evn LUT4 1000 -> 1100",
+        "board/ecp5_evn clk fmax 50.0 -> 40.0 MHz",
+    ]
@@ -0,0 +1,67 @@
+import asyncio
+
+from uci_bridge import (
+    DeviceClient,
+    UCIBridge,
+    encode_response,
+    model_device_connection,
+    read_response,
+)
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+async def session(commands, window=8):
+    reader, writer, server = await model_device_connection()
+    device = DeviceClient(reader, writer, window=window)
+    bridge = UCIBridge(device)
+    output = []
+    for command in commands:
+        output.append(await bridge.handle(command))
+    await device.close()
+    await server
+    return output
+
+
+def test_response_framing():
+    async def roundtrip(words):
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_response(words) + encode_response([]))
+        return await read_response(reader), await read_response(reader)
+
+    words = [0, 0x1FFFFF, 0x0FF00F, 0x1FFF00]
+    assert asyncio.run(roundtrip(words)) == (words, [])
+
+
+def test_handshake():
+    output = asyncio.run(session(["uci", "isready", "quit"]))
+    assert output == [["id name fpgachess", "uciok"], ["readyok"], None]
+
+
+def test_go_perft_pipelined():
+    output = asyncio.run(session(["position startpos", "go perft 3"]))
+    lines = output[1]
+    assert "Nodes searched: 8902" in lines
+    assert "e2e4: 600" in lines
+    info = lines[-1].split()
+    assert info[:2] == ["info", "string"]
+    assert int(info[info.index("requests") + 1]) == 1 + 20 + 400
+    assert int(info[info.index("max_in_flight") + 1]) == 8
+
+
+def test_position_moves():
+    output = asyncio.run(
+        session([f"position fen {KIWIPETE} moves e1g1 a6e2", "go perft 1"])
+    )
+    # white to play again after castling and black's bishop takes on e2
+    assert "Nodes searched: 45" in output[1]
+
+
+def test_go_perft_bad_depth():
+    # a missing or unreadable depth is reported, and the bridge keeps serving
+    output = asyncio.run(
+        session(["go perft", "go perft x", "go perft -1", "go perft 1"])
+    )
+    for command, lines in zip(["go perft", "go perft x", "go perft -1"], output):
+        assert lines == [f"info string go perft needs a depth: {command}"]
+    assert "Nodes searched: 20" in output[3]
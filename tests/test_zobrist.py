@@ -0,0 +1,32 @@
+import os
+import re
+
+import chess
+import chess.polyglot
+
+from movegen_model import encode_fens
+from test_movegen_model import FENS, random_positions
+from zobrist import zobrist_hashes
+
+EP_FENS = [
+    # a pawn beside the ep square, and one that could not legally take
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+    "8/8/8/KPp4r/8/8/8/7k w - c6 0 2",
+    # a double push with no pawn beside it
+    "rnbqkbnr/pppp1ppp/8/4p3/8/8/PPPPPPPP/RNBQKBNR w KQkq e6 0 2",
+]
+
+
+def test_hashes_match_python_chess():
+    fens = FENS + EP_FENS + random_positions(300)
+    hashes = zobrist_hashes(*encode_fens(fens))
+    for fen, h in zip(fens, hashes.tolist()):
+        assert h == chess.polyglot.zobrist_hash(chess.Board(fen)), fen
+
+
+def test_hardware_keys_are_polyglot_keys():
+    path = os.path.join(os.path.dirname(__file__), "..", "hw", "movegen_zobrist_key.sv")
+    with open(path) as f:
+        keys = re.findall(r"10'd(\d+): key = 64'h([0-9A-F]+);", f.read())
+    assert [int(i) for i, _ in keys] == list(range(781))
+    assert [int(k, 16) for _, k in keys] == chess.polyglot.POLYGLOT_RANDOM_ARRAY
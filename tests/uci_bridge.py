@@ -0,0 +1,259 @@
+import argparse
+import asyncio
+import collections
+import itertools
+import socket
+import sys
+import time
+
+import chess
+import chess.polyglot
+import numpy as np
+
+from movegen_model import encode_fens, pseudo_legal_words
+from moveframe import frame_size, pack_frame, unpack_frames
+from perft import MoveListCache, move_from_word
+
+# asyncio UCI front-end for a move generator device on a byte transport.
+#
+# Host to device, one request per position as a FEN line:
+#   <fen>\n
+# Device to host, one response per request and in request order, the
+# o_uci_data words as a moveframe packed frame:
+#   <count> <word0 word1 word2> ...
+#
+# Requests are pipelined: up to `window` positions are written before the
+# first answer is read back, and a reader task hands each response to the
+# oldest outstanding request. `go perft N` fans the search out over all
+# children at once, so the window stays full. Every command reports the
+# device round-trip latency of its requests as an `info string`.
+#
+# The device can be psudolegal_board in a simulator (cocotb_uci_device),
+# or serve_model_device for a software stand-in.
+
+ENGINE_NAME = "fpgachess"
+
+
+def encode_request(fen):
+    return fen.encode() + b"\n"
+
+
+def encode_response(words):
+    return pack_frame(words)
+
+
+async def read_response(reader):
+    header = await reader.readexactly(8)
+    body = await reader.readexactly(frame_size(header) - len(header))
+    words, _ = unpack_frames(header + body)
+    return words.tolist()
+
+
+class DeviceClient:
+    """Pipelined request/response client, responses arrive in request order."""
+
+    def __init__(self, reader, writer, window=8):
+        self.reader = reader
+        self.writer = writer
+        self.window = asyncio.Semaphore(window)
+        self.pending = collections.deque()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.latencies = []
+        self.reader_task = asyncio.ensure_future(self._read())
+
+    async def _read(self):
+        try:
+            while True:
+                words = await read_response(self.reader)
+                self.pending.popleft().set_result(words)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            while self.pending:
+                self.pending.popleft().set_exception(e)
+
+    async def generate(self, board):
+        async with self.window:
+            start = time.perf_counter()
+            response = asyncio.get_running_loop().create_future()
+            # queue and write with no await in between, so the order of
+            # self.pending is the order on the wire
+            self.pending.append(response)
+            self.writer.write(encode_request(board.fen()))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await self.writer.drain()
+                return await response
+            finally:
+                self.in_flight -= 1
+                self.latencies.append(time.perf_counter() - start)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self.reader_task
+
+
+class UCIBridge:
+    def __init__(self, device, cache=None):
+        self.device = device
+        self.cache = cache if cache is not None else MoveListCache()
+        self.board = chess.Board()
+
+    async def legal_moves(self, board):
+        key = chess.polyglot.zobrist_hash(board)
+        words = self.cache.get(key)
+        if words is None:
+            words = [
+                w
+                for w in await self.device.generate(board)
+                if not board.is_into_check(move_from_word(w))
+            ]
+            self.cache.put(key, words)
+        return [move_from_word(w) for w in words]
+
+    async def perft(self, board, depth):
+        if depth == 0:
+            return 1
+        moves = await self.legal_moves(board)
+        if depth == 1:
+            return len(moves)
+        children = []
+        for move in moves:
+            child = board.copy(stack=False)
+            child.push(move)
+            children.append(self.perft(child, depth - 1))
+        return sum(await asyncio.gather(*children))
+
+    async def divide(self, board, depth):
+        moves = await self.legal_moves(board)
+        children = []
+        for move in moves:
+            child = board.copy(stack=False)
+            child.push(move)
+            children.append(self.perft(child, depth - 1))
+        counts = await asyncio.gather(*children)
+        return dict(zip((m.uci() for m in moves), counts))
+
+    def position(self, args):
+        if args[:1] == ["startpos"]:
+            board, rest = chess.Board(), args[1:]
+        elif args[:1] == ["fen"]:
+            fen = list(itertools.takewhile(lambda t: t != "moves", args[1:]))
+            board, rest = chess.Board(" ".join(fen)), args[1 + len(fen) :]
+        else:
+            raise ValueError(f"bad position command {args}")
+        if rest[:1] == ["moves"]:
+            for uci in rest[1:]:
+                board.push_uci(uci)
+        self.board = board
+
+    def latency_info(self, command, first_request, start):
+        latencies = np.array(self.device.latencies[first_request:]) * 1000
+        info = (
+            f"info string {command} took {(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+        if len(latencies):
+            info += (
+                f" requests {len(latencies)}"
+                f" max_in_flight {self.device.max_in_flight}"
+                f" latency_ms p50 {np.percentile(latencies, 50):.2f}"
+                f" p99 {np.percentile(latencies, 99):.2f}"
+                f" max {latencies.max():.2f}"
+            )
+        return info
+
+    async def handle(self, line):
+        # returns the lines to print for one command, None on quit
+        tokens = line.split()
+        if not tokens:
+            return []
+        command, args = tokens[0], tokens[1:]
+        start = time.perf_counter()
+        first_request = len(self.device.latencies)
+        self.device.max_in_flight = 0
+
+        if command == "uci":
+            return [f"id name {ENGINE_NAME}", "uciok"]
+        if command == "isready":
+            return ["readyok"]
+        if command == "ucinewgame":
+            self.board = chess.Board()
+            return []
+        if command == "quit":
+            return None
+        if command == "position":
+            self.position(args)
+            return []
+        if command == "go" and args[:1] == ["perft"]:
+            if len(args) < 2 or not args[1].isdigit():
+                return [f"info string go perft needs a depth: {line.strip()}"]
+            counts = await self.divide(self.board.copy(), int(args[1]))
+            lines = [f"{move}: {nodes}" for move, nodes in counts.items()]
+            lines += ["", f"Nodes searched: {sum(counts.values())}", ""]
+            return lines + [self.latency_info(line.strip(), first_request, start)]
+        return [f"info string unsupported command: {line.strip()}"]
+
+
+async def serve_model_device(reader, writer):
+    # software device, answers each FEN line with the NumPy model's words
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            words, _ = pseudo_legal_words(*encode_fens([line.decode().strip()]))
+            writer.write(encode_response(words.tolist()))
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def open_device(address):
+    # unix:/path/to/socket or tcp:host:port
+    kind, _, where = address.partition(":")
+    if kind == "unix":
+        return await asyncio.open_unix_connection(where)
+    if kind == "tcp":
+        host, _, port = where.rpartition(":")
+        return await asyncio.open_connection(host, int(port))
+    raise ValueError(f"unknown device address {address}")
+
+
+async def model_device_connection():
+    # an in-process model device on one end of a socket pair
+    host, device = socket.socketpair()
+    server = asyncio.ensure_future(
+        serve_model_device(*await asyncio.open_connection(sock=device))
+    )
+    reader, writer = await asyncio.open_connection(sock=host)
+    return reader, writer, server
+
+
+async def main(args):
+    if args.device == "model":
+        reader, writer, _ = await model_device_connection()
+    else:
+        reader, writer = await open_device(args.device)
+    device = DeviceClient(reader, writer, window=args.window)
+    bridge = UCIBridge(device)
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
+        lines = await bridge.handle(line)
+        if lines is None:
+            break
+        for out in lines:
+            print(out, flush=True)
+    await device.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UCI front-end for fpgachess")
+    parser.add_argument(
+        "device", help="unix:/path, tcp:host:port or 'model' for the NumPy model"
+    )
+    parser.add_argument("--window", type=int, default=8, help="requests in flight")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,47 @@
+import chess.polyglot
+import numpy as np
+
+from movegen_model import PAWN, SQUARE_FILE, SQUARE_RANK, SQUARE_TO_SERIAL, WHITE
+
+# Reference for psudolegal_board's o_hash: Polyglot Zobrist hashes of a
+# batch of positions in the board's input format, as from encode_fens.
+#
+# The keys are python-chess's Polyglot keys, so these match
+# chess.polyglot.zobrist_hash(). The ep file only counts when a pawn of the
+# side to play stands beside the pawn that moved, whether or not it could
+# legally take.
+
+KEYS = np.array(chess.polyglot.POLYGLOT_RANDOM_ARRAY, dtype=np.uint64)
+
+
+def zobrist_hashes(positions, wtp, castle, ep):
+    positions = np.asarray(positions, dtype=np.int64)
+    wtp = np.asarray(wtp, dtype=bool)
+    castle = np.asarray(castle, dtype=np.int64)
+    ep = np.asarray(ep, dtype=np.int64)
+    n = len(positions)
+
+    # squares rank * 8 + file, Polyglot numbers pieces pawn 0 to king 5
+    board = positions[:, SQUARE_TO_SERIAL]
+    piece = board & 7
+    index = (6 - piece) * 128 + (board >> 3) * 64 + np.arange(64)
+    keys = np.where(piece > 0, KEYS[np.minimum(index, 767)], np.uint64(0))
+    hashes = np.bitwise_xor.reduce(keys, axis=1)
+
+    for bit, offset in [(3, 768), (2, 769), (1, 770), (0, 771)]:
+        hashes ^= np.where((castle >> bit) & 1 == 1, KEYS[offset], np.uint64(0))
+
+    file = ep - 1
+    rank = np.where(wtp, 4, 3)
+    pawn = np.where(wtp, WHITE | PAWN, PAWN)
+    rows = np.arange(n)
+    beside = np.zeros(n, dtype=bool)
+    for step in [-1, 1]:
+        f = file + step
+        on_board = (ep > 0) & (f >= 0) & (f < 8)
+        sq = np.clip(rank * 8 + f, 0, 63)
+        beside |= on_board & (board[rows, sq] == pawn)
+    hashes ^= np.where(beside, KEYS[772 + np.clip(file, 0, 7)], np.uint64(0))
+
+    hashes ^= np.where(wtp, KEYS[780], np.uint64(0))
+    return hashes